@@ -0,0 +1,83 @@
+"""
+爬虫结果的列式快照
+每次爬取的问题除了 JSON 结果文件，另存一份 Arrow IPC 文件（未压缩，可直接内存映射）：
+用户与站点按字典编码，标签为字典编码的列表列。分析历史爬取时只映射查询用到的列，不必解析整个 JSON。
+未安装 pyarrow 时不写快照，分析退回读取 JSON 结果文件
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # 未安装 pyarrow 时不写列式快照
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".arrow"
+
+# 问题记录中写入快照的字段及其类型；字典编码的列在写入时单独处理
+STRING_COLUMNS = ("id", "title", "user_link", "asked_time", "precise_time", "question_link", "crawled_at")
+INTEGER_COLUMNS = ("reputation", "views", "likes", "answers", "source_page")
+DICTIONARY_COLUMNS = ("user", "site")
+
+
+def available() -> bool:
+    """是否可以读写列式快照"""
+    return pa is not None
+
+
+def snapshot_path(json_file: str) -> str:
+    """结果文件对应的快照路径"""
+    return os.path.splitext(json_file)[0] + SNAPSHOT_SUFFIX
+
+
+def _tags_column(questions: List[Dict]):
+    """标签列：每个问题一个列表，列表中的标签按字典编码"""
+    offsets = [0]
+    values = []
+    for question in questions:
+        tags = question.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(',')]
+        values.extend(str(tag) for tag in tags)
+        offsets.append(len(values))
+    return pa.ListArray.from_arrays(
+        pa.array(offsets, type=pa.int32()), pa.array(values, type=pa.string()).dictionary_encode()
+    )
+
+
+def write_snapshot(path: str, questions: List[Dict]) -> Optional[str]:
+    """把问题列表写成 Arrow IPC 快照，返回路径；未安装 pyarrow 时返回 None"""
+    if pa is None:
+        return None
+
+    columns = {name: pa.array([q.get(name) for q in questions], type=pa.string()) for name in STRING_COLUMNS}
+    columns.update({name: pa.array([q.get(name) for q in questions], type=pa.int64()) for name in INTEGER_COLUMNS})
+    columns.update({
+        name: pa.array([q.get(name) for q in questions], type=pa.string()).dictionary_encode()
+        for name in DICTIONARY_COLUMNS
+    })
+    columns["tags"] = _tags_column(questions)
+    table = pa.table(columns)
+
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """内存映射读取快照中的指定列，数值列直接引用映射的内存，不复制"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns:
+        table = table.select([name for name in columns if name in table.column_names])
+    return table.to_pandas(split_blocks=True, self_destruct=True)
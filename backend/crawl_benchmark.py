@@ -0,0 +1,88 @@
+"""
+爬虫离线基准测试
+在本地替身服务器上按不同并发数爬取，输出抓取与解析的吞吐，不访问网络
+
+用法：
+    python crawl_benchmark.py --pages 200 --concurrency 1 4 8 16 --latency 0.05
+    python crawl_benchmark.py --pages 100 --concurrency 4 --error-rate 0.05 --source api
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from standin_server import StandInServer
+
+import main
+
+
+def benchmark_parse(server: StandInServer, pages: int, engine: str) -> float:
+    """只测解析：同一批合成列表页在当前进程中解析，返回每秒页数"""
+    parser = main.QuestionPageParser(server.url, engine)
+    htmls = [server.site.list_page(page) for page in range(1, pages + 1)]
+    started = time.perf_counter()
+    for page, html in enumerate(htmls, 1):
+        parser.parse(html, page)
+    return pages / (time.perf_counter() - started)
+
+
+async def benchmark_crawl(server: StandInServer, args, concurrency: int) -> dict:
+    """爬取一次全部页面，返回耗时与连接池统计"""
+    crawler = main.AnswerSiteCrawler(server.url, parser_engine=args.engine)
+    # 限速器与熔断器按主机共用，每轮重新设置，避免上一轮的降速影响本轮
+    crawler.rate_limiter.configure(args.rate, max(args.rate, concurrency))
+    crawler.circuit_breaker.record_success()
+    crawler.pool.configure(max(concurrency, 1), main.DEFAULT_CONNECT_TIMEOUT, 15.0, http2=True)
+
+    requests_before = server.status()["requests"]
+    started = time.perf_counter()
+    questions = await crawler.fetch_all_questions(
+        args.pages, concurrency=concurrency, source=args.source, parse_workers=args.parse_workers
+    )
+    elapsed = time.perf_counter() - started
+    pool = crawler.pool.status()
+    await crawler.pool.aclose()
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "questions": len(questions),
+        "requests": server.status()["requests"] - requests_before,
+        "new_connections": pool["new_connections"],
+        "pages_per_second": args.pages / elapsed
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="在本地替身服务器上测量爬虫吞吐")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--source", choices=["auto", "api", "html"], default="html")
+    parser.add_argument("--engine", choices=["auto", "lxml", "bs4"], default="auto")
+    parser.add_argument("--parse-workers", type=int, default=0, help="解析进程数，0 表示在线程池中解析（不使用进程池）")
+    parser.add_argument("--rate", type=float, default=1000.0, help="限速（每秒请求数）")
+    parser.add_argument("--latency", type=float, default=0.05, help="替身服务器每个请求的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with StandInServer(pages=args.pages, latency=args.latency, jitter=args.jitter,
+                       error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed) as server:
+        parser_engine = main.QuestionPageParser(server.url, args.engine).engine
+        print(f"替身服务器 {server.url}：{args.pages}页，延迟{args.latency}s±{args.jitter:.0%}，"
+              f"错误率{args.error_rate:.1%}，断开率{args.drop_rate:.1%}")
+        print(f"解析（{parser_engine}，单进程）：{benchmark_parse(server, args.pages, args.engine):.1f} 页/秒")
+        print(f"{'并发':>4} {'耗时(s)':>8} {'页/秒':>8} {'问题数':>6} {'请求数':>6} {'新建连接':>8}")
+        for concurrency in args.concurrency:
+            result = asyncio.run(benchmark_crawl(server, args, concurrency))
+            print(f"{result['concurrency']:>4} {result['seconds']:>8.2f} {result['pages_per_second']:>8.1f} "
+                  f"{result['questions']:>6} {result['requests']:>6} {result['new_connections']:>8}")
+        print(f"服务器统计：{server.status()}")
+    main.shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    main_cli()
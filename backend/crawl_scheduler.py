@@ -0,0 +1,230 @@
+"""
+全局爬取调度器
+限制同时执行的爬取总数与每个站点的爬取数量，其余按优先级排队；交互式请求优先于后台定时刷新
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_CRAWLS = 2  # 每个站点同时执行的爬取数
+MAX_TOTAL_CRAWLS = 4  # 所有站点合计同时执行的爬取数
+PRIORITY_INTERACTIVE = 0  # 用户发起的爬取、续爬与重试
+PRIORITY_BACKGROUND = 10  # 定时刷新等后台爬取
+
+DEFAULT_SECONDS_PER_PAGE = 2.0  # 还没有完成过爬取时估算 ETA 用的每页耗时
+EWMA_WEIGHT = 0.3  # 每页耗时的指数滑动平均中新样本的权重
+
+
+class CrawlScheduler:
+    """爬取调度器
+
+    每个站点（主机）各有 max_concurrent 个执行槽位，所有站点合计最多同时执行 max_total 个爬取，
+    未达到总数上限时同时爬取多个站点的总耗时取决于最慢的站点。爬取在执行前通过 slot() 申请槽位：
+    所在站点与全局都有空闲槽位且该站点没有人排队时立即执行，否则按 (优先级, 提交顺序) 进入该站点的优先队列；
+    槽位释放时，在站点还有空闲槽位的各队首中选 (优先级, 提交顺序) 最小的执行。
+    排队中被取消（任务被停止）的爬取直接出队。只在事件循环内使用，不需要加锁。
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_CRAWLS, max_total: int = MAX_TOTAL_CRAWLS):
+        self.max_concurrent = max_concurrent
+        self.max_total = max_total
+        self.running: Dict[str, Tuple[float, int, str]] = {}  # 任务ID -> (开始时间, 页数, 主机)
+        self.queues: Dict[str, List[List]] = {}  # 主机 -> 堆：[优先级, 提交序号, 任务ID]
+        self.waiters: Dict[str, Tuple[asyncio.Future, int, List, str]] = {}  # 任务ID -> (future, 页数, 堆条目, 主机)
+        self.seconds_per_page: Dict[str, float] = {}  # 主机 -> 每页耗时的估计
+        self.stats = {"started": 0, "completed": 0, "enqueued": 0, "cancelled_in_queue": 0}
+        self._counter = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, job_id: str, pages: int = 1, priority: int = PRIORITY_INTERACTIVE, host: str = ""):
+        """占用 host 的一个执行槽位（同时占用一个全局槽位），退出时释放并唤醒可以执行的排队爬取"""
+        await self._acquire(job_id, max(1, pages), priority, host)
+        started_at = self.running[job_id][0]
+        finished = False
+        try:
+            yield
+            finished = True
+        finally:
+            self._release(job_id, time.monotonic() - started_at if finished else None)
+
+    async def _acquire(self, job_id: str, pages: int, priority: int, host: str):
+        queue = self.queues.setdefault(host, [])
+        if self._can_start(host) and not queue:
+            self._start(job_id, pages, host)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._counter), job_id]
+        heapq.heappush(queue, entry)
+        self.waiters[job_id] = (future, pages, entry, host)
+        self.stats["enqueued"] += 1
+        logger.info(f"爬取排队: {job_id}，{host or '站点'}前面还有{self._position(job_id) - 1}个")
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if job_id in self.waiters:
+                self._remove_waiter(job_id)
+                self.stats["cancelled_in_queue"] += 1
+            else:
+                # 刚分配到槽位就被取消，归还槽位
+                self._release(job_id, None)
+            raise
+
+    def _running_on(self, host: str) -> int:
+        return sum(1 for _, _, running_host in self.running.values() if running_host == host)
+
+    def _can_start(self, host: str) -> bool:
+        """host 的站点槽位与全局槽位是否都有空闲"""
+        return len(self.running) < self.max_total and self._running_on(host) < self.max_concurrent
+
+    def _page_seconds(self, host: str) -> float:
+        return self.seconds_per_page.get(host, DEFAULT_SECONDS_PER_PAGE)
+
+    def _start(self, job_id: str, pages: int, host: str):
+        self.running[job_id] = (time.monotonic(), pages, host)
+        self.stats["started"] += 1
+
+    def _release(self, job_id: str, elapsed: Optional[float]):
+        """释放槽位；正常结束的爬取用于更新所在站点每页耗时的估计"""
+        if job_id not in self.running:
+            return
+        _, pages, host = self.running.pop(job_id)
+        if elapsed is not None:
+            self.stats["completed"] += 1
+            estimate = self._page_seconds(host)
+            self.seconds_per_page[host] = estimate + EWMA_WEIGHT * (elapsed / pages - estimate)
+        self._dispatch()
+
+    def _dispatch(self):
+        """把空闲槽位依次分配给站点还有空闲槽位的队首中 (优先级, 提交顺序) 最小的爬取"""
+        while len(self.running) < self.max_total:
+            heads = [(queue[0], host) for host, queue in self.queues.items()
+                     if queue and self._running_on(host) < self.max_concurrent]
+            if not heads:
+                return
+            _, host = min(heads)
+            _, _, job_id = heapq.heappop(self.queues[host])
+            future, pages, _, _ = self.waiters.pop(job_id)
+            if future.cancelled():
+                # 已被取消、还没来得及出队的爬取不占用槽位
+                self.stats["cancelled_in_queue"] += 1
+                continue
+            self._start(job_id, pages, host)
+            future.set_result(None)
+
+    def _remove_waiter(self, job_id: str):
+        _, _, entry, host = self.waiters.pop(job_id)
+        queue = self.queues[host]
+        queue.remove(entry)
+        heapq.heapify(queue)
+
+    def _position(self, job_id: str) -> int:
+        """在所在站点队列中的位置，从 1 开始"""
+        _, _, entry, host = self.waiters[job_id]
+        return sum(1 for other in self.queues[host] if other < entry) + 1
+
+    def promote(self, job_id: str, priority: int):
+        """提高排队中爬取的优先级（例如交互式请求复用了排队中的后台爬取）"""
+        if job_id in self.waiters:
+            _, _, entry, host = self.waiters[job_id]
+            if priority < entry[0]:
+                entry[0] = priority
+                heapq.heapify(self.queues[host])
+
+    def job_info(self, job_id: str) -> Optional[Dict]:
+        """爬取的调度信息：排队位置与预计开始时间，或执行中的预计剩余时间；不在调度器中时返回 None"""
+        now = time.monotonic()
+
+        if job_id in self.running:
+            started_at, pages, host = self.running[job_id]
+            return {
+                "state": "running",
+                "host": host,
+                "eta_seconds": round(max(0.0, started_at + pages * self._page_seconds(host) - now), 1)
+            }
+
+        if job_id not in self.waiters:
+            return None
+
+        _, pages, entry, host = self.waiters[job_id]
+        starts_in = self._simulate_start(job_id, now) - now
+        return {
+            "state": "queued",
+            "host": host,
+            "position": self._position(job_id),
+            "queue_length": len(self.queues[host]),
+            "starts_in_seconds": round(starts_in, 1),
+            "eta_seconds": round(starts_in + pages * self._page_seconds(host), 1)
+        }
+
+    def _simulate_start(self, job_id: str, now: float) -> float:
+        """按估计的每页耗时模拟调度，得到排队中的爬取开始执行的时刻"""
+        finishing = [(max(now, started_at + pages * self._page_seconds(host)), host)
+                     for started_at, pages, host in self.running.values()]
+        heapq.heapify(finishing)
+        running = {}
+        for _, host in finishing:
+            running[host] = running.get(host, 0) + 1
+        waiting = sorted((entry, host) for host, queue in self.queues.items() for entry in queue)
+
+        clock = now
+        while True:
+            # 与 _dispatch 相同：按 (优先级, 提交顺序) 把空闲槽位分给站点还有空闲槽位的爬取
+            for item in list(waiting):
+                if len(finishing) >= self.max_total:
+                    break
+                (_, _, waiting_id), host = item
+                if running.get(host, 0) >= self.max_concurrent:
+                    continue
+                if waiting_id == job_id:
+                    return clock
+                waiting.remove(item)
+                heapq.heappush(finishing, (clock + self.waiters[waiting_id][1] * self._page_seconds(host), host))
+                running[host] = running.get(host, 0) + 1
+            finished_at, host = heapq.heappop(finishing)
+            clock = max(clock, finished_at)
+            running[host] -= 1
+
+    def status(self) -> Dict:
+        """获取调度器状态，max_concurrent 为每个站点的槽位数，max_total 为全局槽位数"""
+        hosts = sorted({host for _, _, host in self.running.values()} | {h for h, q in self.queues.items() if q}
+                       | set(self.seconds_per_page))
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_total": self.max_total,
+            "running": len(self.running),
+            "queued": sum(len(queue) for queue in self.queues.values()),
+            "hosts": {
+                host: {
+                    "running": self._running_on(host),
+                    "queued": len(self.queues.get(host) or []),
+                    "seconds_per_page": round(self._page_seconds(host), 2)
+                }
+                for host in hosts
+            },
+            **self.stats
+        }
+
+
+def jittered(interval: float, jitter: float) -> float:
+    """在 interval 上下浮动 jitter 比例，避免多个实例同时发起定时爬取"""
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+
+async def run_periodically(interval: float, jitter: float, job: Callable[[], Awaitable]):
+    """每隔（带抖动的）interval 秒执行一次 job，job 出错不影响下一次"""
+    while True:
+        await asyncio.sleep(jittered(interval, jitter))
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"定时任务执行失败: {e}")
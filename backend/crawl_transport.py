@@ -0,0 +1,197 @@
+"""
+爬虫的可替换传输层
+live：直接访问站点；record：访问站点的同时把每个响应录制到夹具目录；
+replay：只从夹具目录回放，不访问网络，用于离线基准测试与 CI。
+通过环境变量 CRAWLER_TRANSPORT / CRAWLER_FIXTURE_DIR 选择
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from page_archive import PageArchive
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_MODES = ("live", "record", "replay")
+FIXTURE_KIND = "fixture"
+DEFAULT_CONTENT_TYPE = "text/html; charset=utf-8"
+
+# 响应体已经解码，回放时不能再带这些头
+HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def fixture_key(url: str) -> str:
+    """夹具按路径与查询串匹配，录制自真实站点的夹具可以在任意主机（例如本地替身服务器）上回放"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+class FixtureStore:
+    """录制的响应
+
+    响应体存入页面归档（按内容去重、压缩），索引中额外记录状态码与 Content-Type，
+    同一路径录制多次时回放最近一次。304 不录制（没有响应体可回放）。线程安全。
+    """
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        self.archive = PageArchive(fixture_dir)
+        self.entries: Dict[str, Dict] = {
+            fixture_key(url): entry for url, entry in self.archive.latest(FIXTURE_KIND).items()
+        }
+        self.stats = {"recorded": 0, "replayed": 0, "missing": 0}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, status_code: int, content_type: str, body: bytes):
+        """录制一个响应"""
+        if status_code == 304:
+            return
+        entry = self.archive.store(url, FIXTURE_KIND, body,
+                                   meta={"status": status_code, "content_type": content_type})
+        with self._lock:
+            self.entries[fixture_key(url)] = entry
+            self.stats["recorded"] += 1
+
+    def lookup(self, url: str) -> Optional[Tuple[int, str, bytes]]:
+        """查找录制的响应，返回 (状态码, Content-Type, 响应体)；没有录制时返回 None"""
+        with self._lock:
+            entry = self.entries.get(fixture_key(url))
+            self.stats["replayed" if entry else "missing"] += 1
+        if entry is None:
+            logger.warning(f"没有录制的响应: {url}")
+            return None
+        return entry.get('status', 200), entry.get('content_type') or DEFAULT_CONTENT_TYPE, self.archive.read(entry)
+
+    def status(self) -> Dict:
+        """获取夹具状态"""
+        with self._lock:
+            return {"fixture_dir": self.fixture_dir, "fixtures": len(self.entries), **self.stats}
+
+
+def replayed(store: FixtureStore, url: str) -> Tuple[int, Dict[str, str], bytes]:
+    """回放一个请求，没有录制时返回 404"""
+    status_code, content_type, body = store.lookup(url) or (404, "text/plain; charset=utf-8", b"")
+    return status_code, {"Content-Type": content_type, "Content-Length": str(len(body))}, body
+
+
+_AsyncBaseTransport = httpx.AsyncBaseTransport if httpx is not None else object
+
+
+class ReplayTransport(_AsyncBaseTransport):
+    """httpx 回放传输：从夹具返回响应，不建立任何连接"""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    async def handle_async_request(self, request):
+        status_code, headers, body = replayed(self.store, str(request.url))
+        return httpx.Response(status_code, headers=headers, content=body, request=request)
+
+
+class RecordingTransport(_AsyncBaseTransport):
+    """httpx 录制传输：请求照常发出，响应解码后录制"""
+
+    def __init__(self, store: FixtureStore, inner):
+        self.store = store
+        self.inner = inner
+
+    async def handle_async_request(self, request):
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        content_type = response.headers.get('Content-Type', '')
+        self.store.record(str(request.url), response.status_code, content_type, body)
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in HOP_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body,
+                              extensions=response.extensions, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests 回放适配器"""
+
+    def __init__(self, store: FixtureStore):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, **kwargs):
+        status_code, headers, body = replayed(self.store, request.url)
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """requests 录制适配器"""
+
+    def __init__(self, store: FixtureStore, **kwargs):
+        self.store = store
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.store.record(request.url, response.status_code, response.headers.get('Content-Type', ''),
+                          response.content)
+        return response
+
+
+class CrawlTransport:
+    """按模式创建 httpx 传输与 requests 适配器，连接池用它们建立客户端"""
+
+    def __init__(self, mode: str = "live", fixture_dir: Optional[str] = None):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"未知的传输模式: {mode}，可选 {', '.join(TRANSPORT_MODES)}")
+        if mode != "live" and not fixture_dir:
+            raise ValueError(f"{mode} 模式需要指定夹具目录")
+        self.mode = mode
+        self.store = FixtureStore(fixture_dir) if mode != "live" else None
+
+    def async_transport(self, limits, http2: bool):
+        """httpx 异步传输"""
+        if self.mode == "replay":
+            return ReplayTransport(self.store)
+        inner = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        return RecordingTransport(self.store, inner) if self.mode == "record" else inner
+
+    def sync_adapter(self, pool_size: int, hosts: int = 1) -> BaseAdapter:
+        """requests 适配器，为 hosts 个主机各保留一个大小为 pool_size 的连接池"""
+        if self.mode == "replay":
+            return ReplayAdapter(self.store)
+        if self.mode == "record":
+            return RecordingAdapter(self.store, pool_connections=hosts, pool_maxsize=pool_size)
+        return HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+
+    def status(self) -> Dict:
+        """获取传输状态"""
+        return {"mode": self.mode, **(self.store.status() if self.store else {})}
+
+
+def transport_from_env(default_fixture_dir: str) -> CrawlTransport:
+    """按环境变量 CRAWLER_TRANSPORT（live/record/replay）与 CRAWLER_FIXTURE_DIR 创建传输层"""
+    mode = os.environ.get('CRAWLER_TRANSPORT', 'live')
+    transport = CrawlTransport(mode, os.environ.get('CRAWLER_FIXTURE_DIR') or default_fixture_dir)
+    if mode != "live":
+        logger.info(f"爬虫传输模式: {mode}，夹具目录 {transport.store.fixture_dir}")
+    return transport
@@ -0,0 +1,403 @@
+"""
+爬虫结果的 SQLite 数据集
+每个站点最新一次爬取的问题、标签与用户按行存入 SQLite（WAL 模式），分析接口按索引只读取需要的行，
+不必每次找到并解析整个结果文件；每次导入在 snapshots 中记录一次爬取的概况。
+查询走内存中的只读副本，每次导入后整体换成新版本，请求处理不读磁盘
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,                 -- 任务ID
+    site TEXT NOT NULL,
+    base_url TEXT,
+    completed_at TEXT,
+    imported_at TEXT NOT NULL,
+    total_questions INTEGER NOT NULL,
+    failed_pages TEXT NOT NULL,          -- JSON 数组
+    current INTEGER NOT NULL DEFAULT 0   -- 是否为站点当前的数据
+);
+CREATE TABLE IF NOT EXISTS questions (
+    site TEXT NOT NULL,
+    position INTEGER NOT NULL,           -- 在爬取结果中的顺序（结果中可能有重复的问题ID）
+    id TEXT NOT NULL,
+    snapshot_id TEXT NOT NULL,
+    title TEXT,
+    user TEXT,
+    user_link TEXT,
+    reputation INTEGER,
+    views INTEGER,
+    likes INTEGER,
+    answers INTEGER,
+    asked_time TEXT,
+    precise_time TEXT,
+    question_link TEXT,
+    source_page INTEGER,
+    data TEXT NOT NULL,                  -- 完整的问题 JSON，原样返回
+    PRIMARY KEY (site, position)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS question_tags (
+    site TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL REFERENCES tags (id)
+);
+CREATE TABLE IF NOT EXISTS users (
+    site TEXT NOT NULL,
+    user TEXT NOT NULL,
+    user_link TEXT,                      -- 同名用户取第一个链接
+    reputation INTEGER,                  -- 问题列表中的最高声望
+    question_count INTEGER NOT NULL,
+    total_views INTEGER NOT NULL,
+    total_likes INTEGER NOT NULL,
+    total_answers INTEGER NOT NULL,
+    profile TEXT,                        -- 用户资料 JSON
+    PRIMARY KEY (site, user)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_views ON questions (views);
+CREATE INDEX IF NOT EXISTS idx_questions_likes ON questions (likes);
+CREATE INDEX IF NOT EXISTS idx_questions_answers ON questions (answers);
+CREATE INDEX IF NOT EXISTS idx_questions_precise_time ON questions (precise_time);
+CREATE INDEX IF NOT EXISTS idx_questions_user ON questions (user);
+CREATE INDEX IF NOT EXISTS idx_questions_id ON questions (site, id);
+CREATE INDEX IF NOT EXISTS idx_question_tags_tag ON question_tags (tag_id);
+CREATE INDEX IF NOT EXISTS idx_question_tags_question ON question_tags (site, position);
+CREATE INDEX IF NOT EXISTS idx_users_question_count ON users (question_count);
+CREATE INDEX IF NOT EXISTS idx_snapshots_site ON snapshots (site, current);
+"""
+
+# 问题列表可按这些列排序，其他字段按爬取结果中的顺序
+SORT_COLUMNS = ("views", "likes", "answers", "reputation", "precise_time", "asked_time",
+                "title", "user", "id", "source_page")
+
+# 趋势的周期：月、周（周一到周日，与 pandas 的 Period 表示一致）、日
+PERIOD_EXPRESSIONS = {
+    "monthly": "strftime('%Y-%m', precise_time)",
+    "weekly": "date(precise_time, 'weekday 0', '-6 days') || '/' || date(precise_time, 'weekday 0')",
+    "daily": "date(precise_time)",
+}
+
+
+def question_tags(question: Dict) -> List[str]:
+    """问题的标签列表，兼容逗号分隔的字符串"""
+    tags = question.get('tags') or []
+    if isinstance(tags, str):
+        return [tag.strip() for tag in tags.split(',')]
+    return list(tags) if isinstance(tags, list) else []
+
+
+def _open(database: str, uri: bool = False) -> sqlite3.Connection:
+    connection = sqlite3.connect(database, uri=uri, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    # 与 Python 的 str.lower 一致的大小写折叠，用于标题搜索
+    connection.create_function("py_lower", 1, lambda text: (text or '').lower(), deterministic=True)
+    return connection
+
+
+class DatasetStore:
+    """按站点保存最新爬虫结果的 SQLite 数据集
+
+    每个站点只保留当前一次爬取的问题行，导入新结果时在一个事务中整体替换；snapshots 保留每次导入的概况。
+    磁盘上的数据库只在导入时写入。查询使用内存中的只读副本：每次导入后把整个数据库复制到一个新的内存数据库，
+    再用一次赋值换成当前版本，进行中的查询继续使用旧版本，读者不会看到一半的数据。
+    每个线程使用自己的连接，写入串行。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.stats = {"imported": 0, "queries": 0}
+        self.version: Dict = {}
+        self._replica: Optional[Tuple[int, str, sqlite3.Connection]] = None
+        self._retired: Optional[sqlite3.Connection] = None
+        with self._write_lock:
+            self._connection().executescript(SCHEMA)
+            self._load_replica()
+
+    def _connection(self) -> sqlite3.Connection:
+        """当前线程写磁盘数据库的连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = _open(self.db_path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _load_replica(self):
+        """把磁盘上的数据集复制到新的内存数据库，作为下一个版本（调用方持有写锁）"""
+        number = self._replica[0] + 1 if self._replica else 1
+        uri = f"file:dataset-{id(self)}-{number}?mode=memory&cache=shared"
+        # 内存数据库在最后一个连接关闭时释放，这个连接让它在版本有效期间一直存在
+        anchor = _open(uri, uri=True)
+        self._connection().backup(anchor)
+        snapshots = {row["site"]: row["id"] for row in anchor.execute(
+            "SELECT site, id FROM snapshots WHERE current = 1 ORDER BY site"
+        )}
+
+        previous = self._replica
+        self._replica = (number, uri, anchor)
+        self.version = {"number": number, "snapshots": snapshots, "loaded_at": datetime.now().isoformat()}
+        # 上一个版本再保留一轮，刚取到旧版本地址的线程仍能连上；更早的版本在各线程换用新版本后释放
+        if self._retired is not None:
+            self._retired.close()
+        self._retired = previous[2] if previous else None
+
+    def _reader(self) -> sqlite3.Connection:
+        """当前线程读当前版本的连接，版本变化后换用新版本"""
+        number, uri, _ = self._replica
+        reader = getattr(self._local, 'reader', None)
+        if reader is None or reader[0] != number:
+            if reader is not None:
+                reader[1].close()
+            reader = (number, _open(uri, uri=True))
+            self._local.reader = reader
+        return reader[1]
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        self.stats["queries"] += 1
+        return self._reader().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _where(site: Optional[str], column: str = "site") -> Tuple[str, List]:
+        """只看一个站点时的过滤条件"""
+        return (f"WHERE {column} = ?", [site]) if site else ("", [])
+
+    def import_result(self, task_id: str, result: Dict, site: str):
+        """导入一次爬虫结果，替换站点当前的数据"""
+        questions = result.get('questions') or []
+        user_profiles = result.get('user_profiles') or {}
+
+        users: Dict[str, Dict] = {}
+        question_rows = []
+        tag_rows = []
+        for position, question in enumerate(questions):
+            question_rows.append((
+                site, position, str(question.get('id', '')), task_id, question.get('title'), question.get('user'),
+                question.get('user_link'), question.get('reputation'), question.get('views'), question.get('likes'),
+                question.get('answers'), question.get('asked_time'), question.get('precise_time'),
+                question.get('question_link'), question.get('source_page'),
+                json.dumps(question, ensure_ascii=False)
+            ))
+            tag_rows.extend((site, position, tag) for tag in question_tags(question) if tag is not None)
+
+            name = question.get('user')
+            if name is None:
+                continue
+            user = users.setdefault(name, {
+                "user_link": question.get('user_link'), "reputation": None,
+                "question_count": 0, "total_views": 0, "total_likes": 0, "total_answers": 0
+            })
+            if question.get('reputation') is not None:
+                user["reputation"] = max(user["reputation"] or 0, question['reputation'])
+            user["question_count"] += 1
+            user["total_views"] += question.get('views') or 0
+            user["total_likes"] += question.get('likes') or 0
+            user["total_answers"] += question.get('answers') or 0
+
+        user_rows = [
+            (site, name, user["user_link"], user["reputation"], user["question_count"], user["total_views"],
+             user["total_likes"], user["total_answers"],
+             json.dumps(user_profiles[user["user_link"]], ensure_ascii=False)
+             if user["user_link"] in user_profiles else None)
+            for name, user in users.items()
+        ]
+
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM questions WHERE site = ?", (site,))
+                connection.execute("DELETE FROM question_tags WHERE site = ?", (site,))
+                connection.execute("DELETE FROM users WHERE site = ?", (site,))
+                connection.execute("UPDATE snapshots SET current = 0 WHERE site = ?", (site,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+                    (task_id, site, result.get('base_url'), result.get('completed_at'), datetime.now().isoformat(),
+                     len(questions), json.dumps(result.get('failed_pages') or []))
+                )
+                connection.executemany(
+                    "INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", question_rows
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)", {(tag,) for _, _, tag in tag_rows}
+                )
+                connection.executemany(
+                    "INSERT INTO question_tags SELECT ?, ?, id FROM tags WHERE name = ?", tag_rows
+                )
+                connection.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", user_rows)
+            self._load_replica()
+            self.stats["imported"] += 1
+        logger.info(f"已导入爬虫结果到数据集: {task_id}（{site}），{len(questions)}个问题")
+
+    def current_snapshots(self, site: Optional[str] = None) -> List[Dict]:
+        """各站点当前数据对应的爬取概况"""
+        where, params = self._where(site)
+        rows = self._query(
+            f"SELECT * FROM snapshots {where} {'AND' if where else 'WHERE'} current = 1 ORDER BY site", params
+        )
+        return [{**dict(row), "failed_pages": json.loads(row["failed_pages"])} for row in rows]
+
+    def snapshot_history(self, site: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """最近导入的爬取，新的在前"""
+        where, params = self._where(site)
+        rows = self._query(f"SELECT * FROM snapshots {where} ORDER BY imported_at DESC LIMIT ?", params + [limit])
+        return [{**dict(row), "failed_pages": json.loads(row["failed_pages"])} for row in rows]
+
+    def has_data(self, site: Optional[str] = None) -> bool:
+        """站点（不指定时任一站点）是否已有数据"""
+        return bool(self.current_snapshots(site))
+
+    def basic_stats(self, site: Optional[str] = None) -> Dict:
+        """基础统计，与 DataAnalyzer.analyze_basic_stats 一致"""
+        where, params = self._where(site)
+        row = self._query(f"""
+            SELECT COUNT(*) AS total_questions, SUM(views) AS total_views, SUM(likes) AS total_likes,
+                   SUM(answers) AS total_answers, SUM(reputation) AS total_reputation,
+                   COUNT(DISTINCT user) AS total_users, AVG(views) AS avg_views, AVG(likes) AS avg_likes,
+                   AVG(answers) AS avg_answers, MAX(views) AS max_views, MIN(views) AS min_views
+            FROM questions {where}
+        """, params)[0]
+        if not row["total_questions"]:
+            return {}
+        stats = {key: int(row[key] or 0) for key in row.keys() if not key.startswith('avg_')}
+        stats.update({key: float(row[key] or 0) for key in ("avg_views", "avg_likes", "avg_answers")})
+        return stats
+
+    def top_questions(self, site: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """浏览最多的问题"""
+        where, params = self._where(site)
+        rows = self._query(f"""
+            SELECT id, title, views, likes, answers, asked_time, question_link, user FROM questions {where}
+            ORDER BY views DESC, site, position LIMIT ?
+        """, params + [limit])
+        return [dict(row) for row in rows]
+
+    def top_users(self, site: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """提问最多的用户，多个站点的同名用户合并统计"""
+        where, params = self._where(site)
+        rows = self._query(f"""
+            SELECT user, SUM(question_count) AS question_count, SUM(total_views) AS total_views,
+                   SUM(total_likes) AS total_likes, SUM(total_answers) AS total_answers,
+                   MAX(reputation) AS reputation, MIN(user_link) AS user_link, MAX(profile) AS profile
+            FROM users {where}
+            GROUP BY user ORDER BY question_count DESC, MIN(rowid) LIMIT ?
+        """, params + [limit])
+        return [dict(row) for row in rows]
+
+    def top_tags(self, site: Optional[str] = None, limit: Optional[int] = 15) -> Tuple[int, List[Dict]]:
+        """使用最多的标签，返回 (标签总数, 前 limit 个标签及其问题数)"""
+        where, params = self._where(site, "question_tags.site")
+        rows = self._query(f"""
+            SELECT tags.name AS tag, COUNT(*) AS count FROM question_tags JOIN tags ON tags.id = question_tags.tag_id
+            {where} GROUP BY tags.id ORDER BY count DESC, MIN(question_tags.site), MIN(question_tags.position)
+        """, params)
+        tags = [dict(row) for row in rows]
+        return len(tags), tags[:limit] if limit else tags
+
+    def dashboard(self, site: Optional[str] = None) -> Dict:
+        """仪表板数据：基础统计与热门问题、用户、标签"""
+        return {
+            "basic_stats": self.basic_stats(site),
+            "top_questions": self.top_questions(site, 10),
+            "top_users": [
+                {key: value for key, value in user.items() if key not in ("user_link", "profile")}
+                for user in self.top_users(site, 5)
+            ],
+            "top_tags": self.top_tags(site, 15)[1]
+        }
+
+    def trends(self, site: Optional[str] = None, granularity: str = "monthly") -> Dict:
+        """按月、周或日统计问题数与浏览、点赞、回答数，无法解析时间的问题不计入"""
+        where, params = self._where(site)
+        if not self._query(f"SELECT 1 FROM questions {where} LIMIT 1", params):
+            return {}
+        period = PERIOD_EXPRESSIONS.get(granularity, PERIOD_EXPRESSIONS["daily"])
+        rows = self._query(f"""
+            SELECT {period} AS period, COUNT(*) AS question_count, SUM(views) AS total_views,
+                   SUM(likes) AS total_likes, SUM(answers) AS total_answers
+            FROM questions {where} {'AND' if where else 'WHERE'} {period} IS NOT NULL
+            GROUP BY 1 ORDER BY 1
+        """, params)
+        return {
+            "granularity": granularity,
+            "data": [{key: row[key] if key == "period" else int(row[key] or 0) for key in row.keys()}
+                     for row in rows]
+        }
+
+    def user_analysis(self, site: Optional[str] = None, limit: int = 10) -> Dict:
+        """提问最多的用户及其统计与资料，声望以资料中的为准"""
+        where, params = self._where(site)
+        totals = self._query(f"""
+            SELECT COUNT(DISTINCT user) AS total_users, SUM(question_count) AS total_questions FROM users {where}
+        """, params)[0]
+        if not totals["total_users"]:
+            return {}
+
+        users = []
+        for rank, user in enumerate(self.top_users(site, limit), 1):
+            profile = json.loads(user["profile"]) if user["profile"] else None
+            profile_reputation = (profile or {}).get('reputation')
+            users.append({
+                "rank": rank,
+                "user": user["user"],
+                "question_count": int(user["question_count"]),
+                "total_views": int(user["total_views"]),
+                "total_likes": int(user["total_likes"]),
+                "total_answers": int(user["total_answers"]),
+                "reputation": int(profile_reputation if profile_reputation is not None else user["reputation"] or 0),
+                "profile": profile
+            })
+        return {
+            "total_users": int(totals["total_users"]),
+            "avg_questions_per_user": totals["total_questions"] / totals["total_users"],
+            "users": users
+        }
+
+    def questions(self, site: Optional[str] = None, page: int = 1, limit: int = 20, sort_by: str = "views",
+                  order: str = "desc", search: Optional[str] = None) -> Tuple[int, List[Dict]]:
+        """问题列表的一页，返回 (符合条件的问题数, 本页问题)；search 按标题不区分大小写匹配"""
+        conditions, params = [], []
+        if site:
+            conditions.append("site = ?")
+            params.append(site)
+        if search:
+            conditions.append("instr(py_lower(title), ?) > 0")
+            params.append(search.lower())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        total = self._query(f"SELECT COUNT(*) FROM questions {where}", params)[0][0]
+        direction = "DESC" if order.lower() == "desc" else "ASC"
+        order_by = f"{sort_by} {direction}, " if sort_by in SORT_COLUMNS else ""
+        rows = self._query(f"""
+            SELECT data FROM questions {where} ORDER BY {order_by}site, position LIMIT ? OFFSET ?
+        """, params + [limit, max(page - 1, 0) * limit])
+        return total, [json.loads(row["data"]) for row in rows]
+
+    def status(self) -> Dict:
+        """获取数据集状态"""
+        sites = {row["site"]: row["count"] for row in self._query(
+            "SELECT site, COUNT(*) AS count FROM questions GROUP BY site"
+        )}
+        return {
+            "db_path": self.db_path,
+            "snapshots": self._query("SELECT COUNT(*) FROM snapshots")[0][0],
+            "questions_by_site": sites,
+            "tags": self._query("SELECT COUNT(*) FROM tags")[0][0],
+            "size_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            "version": self.version,
+            **self.stats
+        }
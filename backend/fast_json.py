@@ -0,0 +1,102 @@
+"""
+JSON 编解码
+优先使用 orjson，其次 msgspec，都未安装时使用标准库 json；结果文件默认紧凑写入，
+设置环境变量 CRAWLER_PRETTY_JSON=1 时缩进输出，便于调试时直接查看
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Dict
+
+from fastapi.responses import JSONResponse
+
+try:
+    import numpy as np
+except ImportError:  # 没有 numpy 时不会出现 numpy 类型
+    np = None
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时尝试 msgspec
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # 都未安装时使用标准库 json
+    msgspec = None
+
+BACKEND = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+PRETTY = os.environ.get('CRAWLER_PRETTY_JSON') == '1'
+
+
+def _finite(obj: Any) -> Any:
+    """把 NaN 与正负无穷替换为 None（与 orjson、msgspec 的输出一致，标准库会写出不合法的 NaN）"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _default(obj: Any) -> Any:
+    """编码库不认识的类型：pandas 统计结果中的 numpy 标量与数组转为 Python 的数值与列表"""
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return _finite(obj.item())
+        if isinstance(obj, np.ndarray):
+            return _finite(obj.tolist())
+    raise TypeError(f"无法编码为 JSON 的类型: {type(obj).__name__}")
+
+
+def _dumps_orjson(obj: Any, pretty: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    return orjson.dumps(obj, default=_default, option=option | orjson.OPT_INDENT_2 if pretty else option)
+
+
+def _dumps_msgspec(obj: Any, pretty: bool) -> bytes:
+    data = _msgspec_encoder.encode(obj)
+    return msgspec.json.format(data, indent=2) if pretty else data
+
+
+def _dumps_json(obj: Any, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(_finite(obj), ensure_ascii=False, indent=2, default=_default).encode('utf-8')
+    return json.dumps(_finite(obj), ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+# 已安装的编码实现；输出一致：中文不转义，numpy 类型转为普通数值，NaN 与无穷写为 null
+ENCODERS: Dict[str, Callable[[Any, bool], bytes]] = {"json": _dumps_json}
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_default)
+    _msgspec_decoder = msgspec.json.Decoder()
+    ENCODERS["msgspec"] = _dumps_msgspec
+if orjson is not None:
+    ENCODERS["orjson"] = _dumps_orjson
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """编码为 UTF-8 JSON（中文不转义），pretty 为 True 时缩进两格"""
+    return ENCODERS[BACKEND](obj, pretty)
+
+
+def loads(data) -> Any:
+    """解码 JSON（bytes 或 str）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return _msgspec_decoder.decode(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """用 dumps 编码的 JSON 响应
+
+    作为应用的默认响应类；接口直接返回它时 FastAPI 不再逐层调用 jsonable_encoder，
+    大的嵌套结果（完整的问题列表）编码更快、输出更小。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -51,6 +51,7 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import re
 import time
+from rate_limiter import get_rate_limiter
 
 def fetch_all_questions(base_url, max_pages=10):
     """
@@ -58,6 +59,7 @@ def fetch_all_questions(base_url, max_pages=10):
     """
     all_questions = []
     page = 1
+    rate_limiter = get_rate_limiter(base_url)  # 与后端爬虫共用的按主机限速器
     
     while page <= max_pages:
         # 构建页面URL
@@ -73,7 +75,10 @@ def fetch_all_questions(base_url, max_pages=10):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
+            rate_limiter.acquire_sync()
+            started = time.monotonic()
             response = requests.get(url, headers=headers, timeout=10)
+            rate_limiter.record(response.status_code, time.monotonic() - started, response.headers.get('Retry-After'))
             
             if response.status_code != 200:
                 print(f"第 {page} 页请求失败: {response.status_code}")
@@ -103,7 +108,6 @@ def fetch_all_questions(base_url, max_pages=10):
                 break
             
             page += 1
-            time.sleep(1)  # 礼貌等待
             
         except Exception as e:
             print(f"抓取第 {page} 页时出错: {e}")
@@ -454,6 +458,8 @@ import json
 from datetime import datetime
 import os
 from typing import List, Dict, Optional
+from rate_limiter import get_rate_limiter
+from crawl_transport import transport_from_env
 
 class AnswerSiteCrawler:
     """天工开物问答站完整数据抓取器"""
@@ -467,13 +473,20 @@ class AnswerSiteCrawler:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # CRAWLER_TRANSPORT=record/replay 时录制或回放响应（与后端爬虫共用夹具目录）
+        adapter = transport_from_env(os.path.join(OUTPUT_DIR, 'fixtures')).sync_adapter(pool_size=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = get_rate_limiter(self.base_url)  # 令牌桶限速，替代固定等待
+        self.last_page = None  # 分页栏中的最后一页
+        self.next_page_exists = True  # 最近抓取的页面分页栏中是否有 Next 链接
         
     def fetch_all_questions(self, max_pages: int = 20) -> List[Dict]:
         """
         抓取所有页面问题数据
         
         Args:
-            max_pages: 最大抓取页数
+            max_pages: 最大抓取页数，站点实际页数更少时以分页栏为准
             
         Returns:
             问题数据列表
@@ -491,6 +504,9 @@ class AnswerSiteCrawler:
                 print(f"第 {page} 页没有数据，停止抓取")
                 break
             
+            if page == 1 and self.last_page is not None:
+                print(f"分页栏显示共 {self.last_page} 页，本次抓取 {min(self.last_page, max_pages)} 页")
+            
             all_questions.extend(page_data)
             print(f"第 {page} 页: 抓到 {len(page_data)} 个问题，累计 {len(all_questions)} 个")
             
@@ -500,7 +516,6 @@ class AnswerSiteCrawler:
                 break
             
             page += 1
-            time.sleep(1.5)  # 礼貌等待，避免给服务器压力
         
         print(f"\n抓取完成！共抓取 {len(all_questions)} 个问题")
         return all_questions
@@ -524,7 +539,14 @@ class AnswerSiteCrawler:
             
             print(f"抓取第 {page_num} 页: {url}")
             
-            response = self.session.get(url, timeout=15)
+            self.rate_limiter.acquire_sync()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=15)
+            except requests.RequestException:
+                self.rate_limiter.record(None, time.monotonic() - started)
+                raise
+            self.rate_limiter.record(response.status_code, time.monotonic() - started, response.headers.get('Retry-After'))
             response.raise_for_status()
             
             # 保存页面内容用于调试
@@ -533,6 +555,7 @@ class AnswerSiteCrawler:
             
             # 解析页面
             soup = BeautifulSoup(response.text, 'html.parser')
+            self._read_pagination(soup, page_num)
             
             # 查找问题列表
             question_items = soup.find_all('div', class_='list-group-item')
@@ -653,15 +676,32 @@ class AnswerSiteCrawler:
         except:
             return ""
     
+    def _read_pagination(self, soup, page_num: int):
+        """从分页栏读取最后一页的页码，以及是否还有下一页"""
+        pagination = soup.find('ul', class_='pagination')
+        if pagination is None:
+            # 没有分页栏说明只有这一页
+            self.last_page = page_num
+            self.next_page_exists = False
+            return
+        
+        page_numbers = [page_num]
+        for link in pagination.find_all('a', href=True):
+            match = re.search(r'[?&]page=(\d+)', link['href'])
+            if match:
+                page_numbers.append(int(match.group(1)))
+        self.last_page = max(page_numbers)
+        self.next_page_exists = any('Next' in link.get_text() for link in pagination.find_all('a'))
+    
     def _has_next_page(self, current_page_data: List, current_page: int) -> bool:
-        """检查是否有下一页"""
-        # 如果当前页数据少于10个，可能没有下一页
-        if len(current_page_data) < 10:
+        """根据分页栏检查是否有下一页，页数上限由 fetch_all_questions 的 max_pages 控制"""
+        if not current_page_data:
+            return False
+        
+        if self.last_page is not None and current_page >= self.last_page:
             return False
         
-        # 实际应该检查HTML中的分页信息，这里简化处理
-        # 最多抓取20页防止无限循环
-        return current_page < 20
+        return self.next_page_exists
     
     def _save_page_content(self, content: str, filename: str):
         """保存页面内容用于调试"""
@@ -932,9 +972,9 @@ def main():
     print("=" * 70)
     
     # 配置
-    BASE_URL = "https://answer.chancefoundation.org.cn"
+    BASE_URL = os.environ.get('CRAWLER_BASE_URL', "https://answer.chancefoundation.org.cn")  # 可指向本地替身服务器
     OUTPUT_BASE = os.path.join(OUTPUT_DIR, 'questions_data_full')
-    MAX_PAGES = 20  # 最大抓取页数，根据实际情况调整
+    MAX_PAGES = 20  # 最大抓取页数上限，站点页数更少时以分页栏为准
     
     print(f"目标网站: {BASE_URL}")
     print(f"输出文件: {OUTPUT_BASE}.*")
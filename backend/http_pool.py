@@ -0,0 +1,269 @@
+"""
+爬虫共用的 HTTP 连接池
+httpx 异步客户端在多次爬取之间保持长连接，安装了 h2 时启用 HTTP/2 多路复用，
+安装了 brotli 时优先协商 br 压缩；未安装 httpx 时退回每个线程一个 requests.Session
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+except ImportError:
+    h2 = None
+
+try:
+    import brotli  # noqa: F401  httpx / urllib3 检测到后自动解码 br
+except ImportError:
+    try:
+        import brotlicffi as brotli  # noqa: F401
+    except ImportError:
+        brotli = None
+
+from crawl_transport import CrawlTransport
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_ENCODING = "br, gzip, deflate" if brotli else "gzip, deflate"
+
+DEFAULT_POOL_SIZE = 10  # 单个主机最多同时在途的请求数（连接数）
+MAX_HOSTS = 10  # 同步请求的每个 Session 最多为多少个主机保留连接池
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 15.0
+KEEPALIVE_EXPIRY = 60.0  # 空闲连接保留的秒数，覆盖相邻两次爬取之间的间隔
+
+
+class PoolOptions(NamedTuple):
+    """连接池配置，超时与 HTTP/2 变化时新建客户端；pool_size 是没有单独设置的主机的默认并发预算"""
+    pool_size: int = DEFAULT_POOL_SIZE
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    http2: bool = True
+
+
+class HostSlot:
+    """一个主机的并发预算：同一个限流器按最新预算计数在途请求
+
+    预算调小后，新请求要等在途请求降到新预算以下才放行；调大后排队的请求立即被唤醒。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    @asynccontextmanager
+    async def hold(self, limit: int):
+        """按预算 limit 占用一个名额"""
+        async with self._changed:
+            if limit > self.limit:
+                self._changed.notify_all()
+            self.limit = limit
+            await self._changed.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self.in_flight -= 1
+                self._changed.notify()
+
+
+class ConnectionPool:
+    """按配置复用的 HTTP 客户端，多个站点的爬虫共用
+
+    - 异步：同一配置共用一个 httpx.AsyncClient，爬取结束后连接保持，下次爬取直接复用；
+      配置变化后旧客户端在最后一个使用者退出时关闭。客户端绑定创建它的事件循环。
+      每个主机有各自的并发预算（configure 时传入 host 设置），同时在途的请求数不超过预算，
+      同一站点的多个爬取共享预算，不同站点互不占用。
+    - 同步：requests.Session 不能跨线程共用，线程池中的每个线程各用一个（不限制主机并发）。
+    底层的连接由传输层建立，回放模式下不访问网络。
+    统计新建连接与复用次数、实际传输字节与解压后字节、HTTP 版本与平均耗时。
+    """
+
+    def __init__(self, headers: Dict[str, str], options: PoolOptions = PoolOptions(),
+                 transport: Optional[CrawlTransport] = None):
+        self.headers = {**headers, 'Accept-Encoding': ACCEPT_ENCODING}
+        self.options = options
+        self.transport = transport or CrawlTransport()
+        self.host_limits: Dict[str, int] = {}  # 主机 -> 并发预算
+        self.in_flight: Counter = Counter()  # 主机 -> 在途请求数
+        self._host_slots: Dict[str, HostSlot] = {}
+        self.clients: Dict[PoolOptions, List] = {}  # 配置 -> [客户端, 使用中的爬取数]
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {
+            "requests": 0,
+            "traced_requests": 0,  # 能判断是否新建连接的请求（异步请求）
+            "new_connections": 0,
+            "bytes_on_wire": 0,
+            "bytes_decoded": 0,
+            "latency_total": 0.0
+        }
+        self.http_versions: Counter = Counter()
+        self._local = threading.local()
+        self._sync_sessions: List[requests.Session] = []
+        self._lock = threading.Lock()
+
+    def configure(self, pool_size: int, connect_timeout: float, read_timeout: float, http2: bool = True,
+                  host: Optional[str] = None):
+        """调整并发预算与超时，之后开始的爬取使用新配置；传入 host 时 pool_size 只作为该主机的预算"""
+        if host:
+            self.host_limits[host] = pool_size
+            pool_size = self.options.pool_size
+        self.options = PoolOptions(pool_size, connect_timeout, read_timeout, http2)
+
+    def _host_slot(self, host: str):
+        """占用主机的一个并发名额；预算调整后仍是同一个限流器，已在途的请求计入新预算"""
+        limit = self.host_limits.get(host, self.options.pool_size)
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = HostSlot(limit)
+        return slot.hold(limit)
+
+    def _new_client(self, options: PoolOptions):
+        # 总连接数不设上限，由各主机的并发预算约束
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None, keepalive_expiry=KEEPALIVE_EXPIRY)
+        timeout = httpx.Timeout(options.read_timeout, connect=options.connect_timeout)
+        transport = self.transport.async_transport(limits, http2=options.http2 and h2 is not None)
+        return httpx.AsyncClient(headers=self.headers, timeout=timeout, transport=transport, follow_redirects=True)
+
+    @asynccontextmanager
+    async def session(self):
+        """一次爬取使用的异步客户端，未安装 httpx 时为 None"""
+        if httpx is None:
+            yield None
+            return
+
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            # 旧事件循环上的连接与限流器无法继续使用
+            self.clients.clear()
+            self._host_slots.clear()
+            self.loop = loop
+
+        options = self.options
+        entry = self.clients.get(options)
+        if entry is None:
+            entry = self.clients[options] = [self._new_client(options), 0]
+        entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            entry[1] -= 1
+            await self._close_stale()
+
+    async def _close_stale(self):
+        """关闭配置已过期且没有爬取在用的客户端"""
+        for options, (client, users) in list(self.clients.items()):
+            if options != self.options and users == 0:
+                del self.clients[options]
+                await client.aclose()
+
+    async def get(self, client, url: str, headers: Dict[str, str]):
+        """异步GET，记录是否新建了连接以及传输字节数"""
+        connected = []
+
+        async def trace(event_name: str, info: Dict):
+            if event_name == "connection.connect_tcp.complete":
+                connected.append(True)
+
+        host = urlsplit(url).netloc
+        async with self._host_slot(host):
+            self.in_flight[host] += 1
+            started = time.monotonic()
+            try:
+                response = await client.get(url, headers=headers, extensions={"trace": trace})
+            finally:
+                self.in_flight[host] -= 1
+        self._record(time.monotonic() - started, len(response.content),
+                     response.num_bytes_downloaded, bool(connected), response.http_version)
+        return response
+
+    def get_sync(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """同步GET，使用当前线程自己的 requests.Session；配置变化后关闭旧的 Session 再新建"""
+        session = getattr(self._local, 'session', None)
+        if session is not None and self._local.options != self.options:
+            with self._lock:
+                self._sync_sessions.remove(session)
+            session.close()
+            session = None
+        if session is None:
+            session = self._new_sync_session(self.options)
+
+        options = self._local.options
+        started = time.monotonic()
+        response = session.get(url, headers=headers, timeout=(options.connect_timeout, options.read_timeout))
+        self._record(time.monotonic() - started, len(response.content), None, None, "HTTP/1.1")
+        return response
+
+    def _new_sync_session(self, options: PoolOptions) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = self.transport.sync_adapter(options.pool_size, MAX_HOSTS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        self._local.session = session
+        self._local.options = options
+        with self._lock:
+            self._sync_sessions.append(session)
+        return session
+
+    def _record(self, latency: float, decoded: int, on_wire: Optional[int],
+                new_connection: Optional[bool], http_version: str):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["latency_total"] += latency
+            self.stats["bytes_decoded"] += decoded
+            self.stats["bytes_on_wire"] += decoded if on_wire is None else on_wire
+            if new_connection is not None:
+                self.stats["traced_requests"] += 1
+                self.stats["new_connections"] += int(new_connection)
+            self.http_versions[http_version] += 1
+
+    async def aclose(self):
+        """关闭所有连接（服务关闭时调用）"""
+        for client, _ in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+        with self._lock:
+            for session in self._sync_sessions:
+                session.close()
+            self._sync_sessions.clear()
+
+    def status(self) -> Dict:
+        """获取连接池状态与复用统计"""
+        with self._lock:
+            requests_count = self.stats["requests"]
+            decoded = self.stats["bytes_decoded"]
+            return {
+                **self.options._asdict(),
+                "transport": self.transport.mode,
+                "http2_available": h2 is not None,
+                "accept_encoding": ACCEPT_ENCODING,
+                "requests": requests_count,
+                "new_connections": self.stats["new_connections"],
+                "reused_connections": self.stats["traced_requests"] - self.stats["new_connections"],
+                "bytes_on_wire": self.stats["bytes_on_wire"],
+                "bytes_decoded": decoded,
+                "compression_ratio": round(self.stats["bytes_on_wire"] / decoded, 3) if decoded else None,
+                "avg_latency_ms": round(self.stats["latency_total"] / requests_count * 1000, 1)
+                if requests_count else None,
+                "http_versions": dict(self.http_versions),
+                "hosts": {
+                    host: {"limit": self.host_limits.get(host, self.options.pool_size), "in_flight": self.in_flight[host]}
+                    for host in sorted(set(self.host_limits) | set(self.in_flight))
+                }
+            }
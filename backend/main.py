@@ -7,33 +7,89 @@ import os
 import sys
 import json
 import asyncio
+import contextvars
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Union, TypedDict
 from pathlib import Path
 import logging
+import threading
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
-from bs4 import BeautifulSoup
+from rate_limiter import get_rate_limiter, DEFAULT_RATE, DEFAULT_BURST
+from retry_policy import get_circuit_breaker, retry_async, FetchError, CircuitOpenError, is_transient_status
+from http_pool import ConnectionPool, DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT
+from page_archive import PageArchive, read_blob
+from dataset_store import DatasetStore
+from result_manifest import ResultManifest
+from fast_json import FastJSONResponse
+import fast_json
+import columnar_snapshot
+from crawl_transport import CrawlTransport, transport_from_env
+from crawl_scheduler import CrawlScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, run_periodically
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 from collections import Counter
 import re
 import time
+import gzip
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from contextlib import asynccontextmanager
+import hashlib
+import heapq
+from urllib.parse import urlencode, unquote, urlsplit
+
+try:
+    import httpx
+except ImportError:  # 未安装 httpx 时并发模式退回逐页爬取
+    httpx = None
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # 未安装 lxml 时只能使用 BeautifulSoup 解析
+    lxml_html = None
 
 # ==================== 配置设置 ====================
 
 # 获取项目根目录
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-OUTPUT_DIR = os.path.join(BASE_DIR, 'backendData', 'output')
+# 输出目录，测试时可通过 CRAWLER_OUTPUT_DIR 指向临时目录
+OUTPUT_DIR = os.environ.get('CRAWLER_OUTPUT_DIR') or os.path.join(BASE_DIR, 'backendData', 'output')
 INPUT_DIR = os.path.join(BASE_DIR, 'backendData', 'input')
+HTTP_CACHE_DIR = os.path.join(OUTPUT_DIR, 'http_cache')
+CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, 'checkpoints')
+USER_PROFILE_FILE = os.path.join(OUTPUT_DIR, 'user_profiles.json')
+ARCHIVE_DIR = os.path.join(OUTPUT_DIR, 'archive')
+SITE_RESULTS_DIR = os.path.join(OUTPUT_DIR, 'sites')  # 默认站点以外各站点的爬虫结果，每个站点一个子目录
+FIXTURE_DIR = os.path.join(OUTPUT_DIR, 'fixtures')  # record/replay 传输模式的夹具目录
+DATASET_PATH = os.path.join(OUTPUT_DIR, 'dataset.sqlite3')  # 分析接口查询的 SQLite 数据集
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, 'latest_results.json')  # 各站点最新爬虫结果的清单
+USER_PROFILE_TTL = 86400  # 用户资料缓存有效期（秒），过期后下次爬取重新抓取
 
 # 创建必要的目录
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(INPUT_DIR, exist_ok=True)
+os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+# 爬取的站点；离线基准测试时指向本地替身服务器（见 standin_server.py）
+CRAWLER_BASE_URL = os.environ.get('CRAWLER_BASE_URL') or None
+# 监控的多个站点（逗号分隔的根地址），第一个为默认站点；未设置时只监控 CRAWLER_BASE_URL 或线上站点
+CRAWLER_SITES = [url.strip().rstrip('/') for url in os.environ.get('CRAWLER_SITES', '').split(',') if url.strip()]
+
+# 定时增量刷新：每隔约 RECRAWL_INTERVAL 秒（上下浮动 RECRAWL_JITTER）后台爬取一次；
+# 环境变量 CRAWLER_RECRAWL_INTERVAL 设为 0 时关闭（测试、离线回放时不访问线上站点）
+RECRAWL_INTERVAL = float(os.environ.get('CRAWLER_RECRAWL_INTERVAL') or 3600)
+RECRAWL_JITTER = 0.1
+RECRAWL_PAGES = 10
+
+# 爬取历史的统计只需要这几列
+HISTORY_COLUMNS = ['views', 'likes', 'answers', 'reputation', 'user']
 
 # 日志配置
 logging.basicConfig(
@@ -42,11 +98,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """同步结果清单与数据集，启动定时刷新并创建解析进程池；关闭时停止，并关闭爬虫的长连接与解析进程池"""
+    await asyncio.get_event_loop().run_in_executor(None, import_existing_results)
+    get_parse_pool()
+    recrawl = asyncio.create_task(
+        run_periodically(RECRAWL_INTERVAL, RECRAWL_JITTER, start_scheduled_recrawl)
+    ) if RECRAWL_INTERVAL > 0 else None
+    yield
+    if recrawl:
+        recrawl.cancel()
+    await crawler.pool.aclose()
+    shutdown_parse_pool()
+
+
 # FastAPI应用
 app = FastAPI(
     title="天工开物数据分析API",
     description="问答网站数据爬取与分析系统",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS配置
@@ -60,11 +134,62 @@ app.add_middleware(
 
 # ==================== 数据模型 ====================
 
+class SiteConfig(BaseModel):
+    """多站点爬取中单个站点的配置，未设置的项沿用请求中的值"""
+    base_url: str
+    concurrency: Optional[int] = None
+    rate_limit: Optional[float] = None
+    burst: Optional[int] = None
+    pool_size: Optional[int] = None
+
+
 class CrawlerRequest(BaseModel):
     """爬虫请求模型"""
     max_pages: int = 10
-    timeout: int = 30
+    timeout: int = 30  # 单个请求的读取超时（秒）
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT  # 建立连接的超时（秒）
+    pool_size: int = DEFAULT_POOL_SIZE  # 与目标站点保持的最大连接数
+    http2: bool = True  # 安装了 h2 时使用 HTTP/2 多路复用
     async_mode: bool = True
+    concurrency: int = 3  # 同时在途的页面请求数，1 为逐页顺序爬取
+    source: str = "auto"  # auto, api, html
+    parse_workers: int = 0  # 解析进程数，0 表示在线程池中解析
+    rate_limit: float = DEFAULT_RATE  # 对目标站点每秒请求数上限（令牌桶速率）
+    burst: int = DEFAULT_BURST  # 令牌桶容量，允许的瞬时突发请求数
+    incremental: bool = False  # 增量模式：遇到全部已知且计数未变的页面即停止，并与上次结果合并
+    fetch_details: bool = False  # 列表爬完后抓取问题正文与回答，计数未变的问题沿用上次的详情
+    detail_concurrency: int = 3  # 同时在途的详情请求数
+    fetch_users: bool = False  # 抓取提问用户的个人资料，每个用户只请求一次，缓存期内不再请求
+    user_concurrency: int = 3  # 同时在途的用户资料请求数
+    site: Optional[str] = None  # 爬取的站点根地址，默认为默认站点
+    sites: Optional[List[SiteConfig]] = None  # 同时爬取多个站点，每个站点一个子任务，各自限速与排队
+
+
+class ReparseRequest(BaseModel):
+    """重新解析请求模型"""
+    task_id: Optional[str] = None  # 重新解析哪一次爬取（任务ID）的归档，默认为站点最近一次爬取
+    as_of: Optional[str] = None  # 未指定 task_id 时，使用不晚于该时间（ISO格式）结束的最近一次爬取
+    parse_workers: int = 0  # 解析进程数，0 表示使用全部CPU核心
+    site: Optional[str] = None  # 重新解析的站点根地址，默认为默认站点
+
+
+class QuestionRecord(TypedDict, total=False):
+    """一条问题记录：列表页与接口解析出的字段相同，在爬取、合并、分析与保存之间按字典传递，不做运行时校验"""
+    id: str
+    title: str
+    user: str
+    reputation: int
+    asked_time: str
+    precise_time: str
+    likes: int
+    answers: int
+    views: int
+    tags: List[str]
+    question_link: str
+    user_link: str
+    crawled_at: str
+    source_page: int
+    site: str  # 多站点时标记所属站点
 
 
 class AnalysisRequest(BaseModel):
@@ -139,27 +264,261 @@ class CacheManager:
 # 全局缓存实例
 cache_manager = CacheManager()
 
+
+class SingleFlight:
+    """合并并发的相同计算：同一 key 的计算进行中时，后来的调用直接等待同一个结果
+
+    计算在线程池中执行，不阻塞事件循环；计算结束（成功或失败）后立即移除，下次调用重新计算。
+    """
+
+    def __init__(self):
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    async def run(self, key: str, func, *args):
+        """执行 func(*args)，已有同 key 的计算时等待其结果"""
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(None, func, *args)
+        self.inflight[key] = future
+        future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        self.stats["executed"] += 1
+        return await asyncio.shield(future)
+
+    def status(self) -> Dict:
+        """获取合并统计"""
+        return {"inflight": sorted(self.inflight), **self.stats}
+
+
+# 分析接口缓存未命中时的重新计算共用一个
+analysis_flight = SingleFlight()
+
+
+class HttpResponseCache:
+    """爬取页面的磁盘响应缓存
+
+    按 URL 保存 ETag / Last-Modified、gzip 压缩的响应体、响应体哈希和解析结果。
+    再次请求时发送条件请求头，收到 304 或响应体哈希未变时直接复用解析结果。
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.stats = {"not_modified": 0, "unchanged": 0, "misses": 0}
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def _load_entry(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url, '.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry if entry.get('url') == url else None
+        except (OSError, ValueError):
+            return None
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """生成条件请求头"""
+        entry = self._load_entry(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def lookup(self, url: str, status_code: int, body: bytes):
+        """检查响应能否复用缓存，命中返回 (True, 解析结果)，否则返回 (False, None)"""
+        if status_code not in (200, 304):
+            return False, None
+
+        entry = self._load_entry(url)
+        if entry is None:
+            if status_code == 304:
+                raise ValueError(f"收到304但本地没有缓存: {url}")
+            self.stats["misses"] += 1
+            return False, None
+
+        if status_code == 304:
+            self.stats["not_modified"] += 1
+            logger.info(f"HTTP缓存命中(304): {url}")
+            return True, entry['parsed']
+
+        if entry.get('sha256') == hashlib.sha256(body).hexdigest():
+            self.stats["unchanged"] += 1
+            logger.info(f"HTTP缓存命中(内容未变): {url}")
+            return True, entry['parsed']
+
+        self.stats["misses"] += 1
+        return False, None
+
+    def body_hash(self, url: str) -> Optional[str]:
+        """缓存的响应体的内容哈希（返回 304 时用来在页面归档中找到同一内容），没有缓存时返回 None"""
+        entry = self._load_entry(url)
+        return entry.get('sha256') if entry else None
+
+    def store(self, url: str, response_headers, body: bytes, parsed):
+        """保存响应与解析结果"""
+        try:
+            with open(self._path(url, '.gz'), 'wb') as f:
+                f.write(gzip.compress(body))
+
+            entry = {
+                "url": url,
+                "etag": response_headers.get('ETag'),
+                "last_modified": response_headers.get('Last-Modified'),
+                "sha256": hashlib.sha256(body).hexdigest(),
+                "stored_at": datetime.now().isoformat(),
+                "parsed": parsed
+            }
+            # 先写临时文件再替换，避免并发读到半个文件
+            tmp_path = self._path(url, f'.json.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(url, '.json'))
+        except OSError as e:
+            logger.warning(f"HTTP缓存写入失败: {url} - {e}")
+
+    def load_body(self, url: str) -> Optional[str]:
+        """读取缓存的原始响应体"""
+        try:
+            with open(self._path(url, '.gz'), 'rb') as f:
+                return gzip.decompress(f.read()).decode('utf-8')
+        except OSError:
+            return None
+
+    def status(self) -> Dict:
+        """获取缓存状态"""
+        return {
+            "entries": sum(1 for f in os.listdir(self.cache_dir) if f.endswith('.json')),
+            **self.stats
+        }
+
+
+# 全局HTTP响应缓存
+http_response_cache = HttpResponseCache(HTTP_CACHE_DIR)
+
+
+class UserProfileCache:
+    """用户资料的磁盘缓存
+
+    按 user_link 保存抓到的个人资料，多次爬取之间共用；超过 ttl 的资料视为过期，需要重新抓取，
+    重新抓取失败时仍可取回过期的旧资料。
+    """
+    def __init__(self, path: str, ttl: int = USER_PROFILE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.profiles: Dict[str, Dict] = self._load()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, user_link: str, allow_stale: bool = False) -> Optional[Dict]:
+        """获取未过期的资料，allow_stale 为 True 时过期的也返回"""
+        profile = self.profiles.get(user_link)
+        if profile is None:
+            self.stats["misses"] += 1
+            return None
+        fetched_at = datetime.fromisoformat(profile['fetched_at'])
+        if not allow_stale and datetime.now() - fetched_at > timedelta(seconds=self.ttl):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return profile
+
+    def set(self, user_link: str, profile: Dict):
+        """保存资料（调用 save 后写入磁盘）"""
+        self.profiles[user_link] = {**profile, "fetched_at": datetime.now().isoformat()}
+
+    def save(self):
+        """写入磁盘，先写临时文件再替换"""
+        try:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(self.profiles), f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"用户资料缓存写入失败: {e}")
+
+    def status(self) -> Dict:
+        """获取缓存状态"""
+        return {"profiles": len(self.profiles), "ttl": self.ttl, **self.stats}
+
+
+user_profile_cache = UserProfileCache(USER_PROFILE_FILE)
+
 # ==================== 任务管理 ====================
 
 class TaskManager:
     """爬虫任务管理器"""
     def __init__(self):
         self.tasks = {}
+        self.runners: Dict[str, asyncio.Task] = {}  # 正在执行的任务协程，停止时取消
+        self.flight_keys: Dict[str, str] = {}  # 合并键 -> 进行中的任务ID
+
+    def run(self, task_id: str, coroutine, key: Optional[str] = None) -> asyncio.Task:
+        """在后台执行任务协程并登记，便于 stop_task 取消
+
+        传入 key 时登记为该 key 的进行中任务，等价的请求可以通过 find_running 复用它。
+        """
+        runner = asyncio.create_task(coroutine)
+        self.runners[task_id] = runner
+        if key:
+            self.flight_keys[key] = task_id
 
-    def create_task(self, task_id: str, max_pages: int):
-        """创建任务"""
+        def release(_):
+            self.runners.pop(task_id, None)
+            if key and self.flight_keys.get(key) == task_id:
+                del self.flight_keys[key]
+
+        runner.add_done_callback(release)
+        return runner
+
+    def find_running(self, key: str) -> Optional[str]:
+        """查找 key 对应的进行中任务，没有时返回 None"""
+        task_id = self.flight_keys.get(key)
+        runner = self.runners.get(task_id) if task_id else None
+        return task_id if runner and not runner.done() else None
+
+    def create_task(self, task_id: str, max_pages: int, site: Optional[str] = None):
+        """创建任务，site 为任务所属的站点"""
         self.tasks[task_id] = {
             "id": task_id,
-            "status": "running",
+            "site": site,
+            "status": "queued",
             "progress": 0,
             "current_page": 0,
             "total_pages": max_pages,
-            "message": "正在初始化...",
+            "message": "排队等待中...",
             "created_at": datetime.now().isoformat(),
+            "failed_pages": {},
             "result": None
         }
         logger.info(f"任务已创建: {task_id}")
 
+    def start_task(self, task_id: str):
+        """任务获得执行槽位，开始执行"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["status"] = "running"
+            self.tasks[task_id]["message"] = "正在初始化..."
+            self.tasks[task_id]["started_at"] = datetime.now().isoformat()
+
+    def is_active(self, task_id: str) -> bool:
+        """任务是否在排队或执行中"""
+        task = self.tasks.get(task_id)
+        return task is not None and task["status"] in ("queued", "running")
+
     def update_progress(self, task_id: str, progress: int, message: str = "", current_page: int = 0):
         """更新任务进度"""
         if task_id in self.tasks:
@@ -169,6 +528,33 @@ class TaskManager:
                 self.tasks[task_id]["current_page"] = current_page
             logger.info(f"任务进度: {task_id} - {progress}% - {message}")
 
+    def set_total_pages(self, task_id: str, total_pages: int):
+        """得知实际要爬取的页数后更新任务的总页数"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["total_pages"] = total_pages
+
+    def update_rate_limit(self, task_id: str, rate_limit: Dict):
+        """更新任务当前的限速状态"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["rate_limit"] = rate_limit
+
+    def record_page_failures(self, task_id: str, failures: Dict[int, Dict]):
+        """记录爬取失败的页面（页码 -> 失败信息），供之后只重试这些页面"""
+        if task_id in self.tasks and failures:
+            self.tasks[task_id]["failed_pages"].update(failures)
+            logger.warning(f"任务{task_id}有{len(failures)}个页面爬取失败: {sorted(failures)}")
+
+    def get_failed_pages(self, task_id: str) -> List[int]:
+        """获取任务中爬取失败的页码"""
+        if task_id in self.tasks:
+            return sorted(self.tasks[task_id]["failed_pages"])
+        return []
+
+    def update_live_stats(self, task_id: str, live_stats: Dict):
+        """更新爬取过程中的实时统计"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["live_stats"] = live_stats
+
     def complete_task(self, task_id: str, result: Dict):
         """完成任务"""
         if task_id in self.tasks:
@@ -178,6 +564,14 @@ class TaskManager:
             self.tasks[task_id]["completed_at"] = datetime.now().isoformat()
             logger.info(f"任务已完成: {task_id}")
 
+    def keep_stopped_result(self, task_id: str, result: Dict):
+        """保存已停止任务在停止前爬到的部分结果"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["status"] = "stopped"
+            self.tasks[task_id]["result"] = result
+            self.tasks[task_id]["completed_at"] = datetime.now().isoformat()
+            logger.info(f"任务已停止，保留部分结果: {task_id}")
+
     def fail_task(self, task_id: str, error: str):
         """标记任务失败"""
         if task_id in self.tasks:
@@ -191,105 +585,478 @@ class TaskManager:
         return self.tasks.get(task_id)
 
     def stop_task(self, task_id: str):
-        """停止任务"""
+        """停止任务：取消正在执行的协程，在途的请求随之中断"""
         if task_id in self.tasks:
             self.tasks[task_id]["status"] = "stopped"
+            self.tasks[task_id]["message"] = "任务已停止"
+            runner = self.runners.get(task_id)
+            if runner and not runner.done():
+                runner.cancel()
             logger.info(f"任务已停止: {task_id}")
 
 
 # 全局任务管理器
 task_manager = TaskManager()
 
-# ==================== 爬虫模块 ====================
+# 全局爬取调度器，所有访问目标站点的任务都经它排队
+crawl_scheduler = CrawlScheduler()
 
-class AnswerSiteCrawler:
-    """天工开物问答站爬虫"""
 
-    BASE_URL = "https://answer.chancefoundation.org.cn"
+async def run_scheduled(task_id: str, pages: int, priority: int, coroutine, host: str = ""):
+    """排队等到所在站点的执行槽位后再执行任务协程；排队期间被停止时协程不会开始"""
+    try:
+        async with crawl_scheduler.slot(task_id, pages, priority, host):
+            task_manager.start_task(task_id)
+            await coroutine
+    finally:
+        coroutine.close()
+
+
+async def submitted_schedule(task_id: str) -> Optional[Dict]:
+    """刚提交的任务的调度信息（排队位置与 ETA，与任务接口一致）
+
+    提交后任务协程还没有运行，不在调度器中；先让出一次事件循环，它会运行到申请槽位（排队或开始执行）。
+    """
+    await asyncio.sleep(0)
+    return crawl_scheduler.job_info(task_id)
+
+# ==================== 结果读写 ====================
+
+TASK_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+
+def site_key(base_url: str) -> str:
+    """站点的标识：根地址中的主机名（含端口），也接受直接传入主机名"""
+    return urlsplit(base_url).netloc or base_url.strip('/')
+
+
+def build_crawler_result(questions: List[QuestionRecord], failed_pages: Optional[List[int]] = None,
+                         user_profiles: Optional[Dict[str, Dict]] = None, base_url: Optional[str] = None) -> Dict:
+    """分析问题列表，生成爬虫结果；传入 base_url 时结果与每个问题都标记所属站点"""
+    if base_url:
+        for question in questions:
+            question['site'] = site_key(base_url)
+    result = {
+        "total_questions": len(questions),
+        "basic_stats": DataAnalyzer.analyze_basic_stats(questions),
+        "top_questions": DataAnalyzer.get_top_questions(questions, 10),
+        "top_users": DataAnalyzer.get_top_users(questions, 5),
+        "top_tags": DataAnalyzer.get_top_tags(questions, 15),
+        "questions": questions,
+        "failed_pages": failed_pages or [],
+        "completed_at": datetime.now().isoformat()
+    }
+    if user_profiles is not None:
+        result["user_profiles"] = user_profiles
+    if base_url:
+        result["site"] = site_key(base_url)
+        result["base_url"] = base_url
+    return result
 
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
 
-    async def fetch_all_questions(self, max_pages: int = 10, task_id: str = None) -> List[Dict]:
-        """异步爬取所有页面问题数据"""
-        all_questions = []
+def site_results_dir(site: Optional[str] = None) -> str:
+    """站点结果所在目录：默认站点（以及没有标记站点的旧结果）在输出目录下，其他站点在 sites/ 下各一个子目录"""
+    if not site or site_key(site) == site_key(crawler.base_url):
+        return OUTPUT_DIR
+    return os.path.join(SITE_RESULTS_DIR, re.sub(r'[^\w.-]', '_', site_key(site)))
 
-        for page in range(1, max_pages + 1):
-            try:
-                # 更新进度
-                if task_id:
-                    task_manager.update_progress(
-                        task_id,
-                        int((page - 1) / max_pages * 100),
-                        f"正在爬取第{page}页...",
-                        page
-                    )
 
-                page_data = await self._fetch_single_page_async(page)
+def crawler_result_path(task_id: str, site: Optional[str] = None) -> str:
+    """任务结果文件路径"""
+    return os.path.join(site_results_dir(site), f'crawler_result_{task_id}.json')
 
-                if not page_data:
-                    logger.info(f"第{page}页无数据，停止爬取")
-                    break
 
-                all_questions.extend(page_data)
-                logger.info(f"第{page}页: 抓到{len(page_data)}个问题，累计{len(all_questions)}个")
+def find_crawler_result(task_id: str) -> Optional[str]:
+    """在各站点的结果目录中查找任务的结果文件"""
+    for directory in all_results_dirs():
+        json_file = os.path.join(directory, f'crawler_result_{task_id}.json')
+        if os.path.exists(json_file):
+            return json_file
+    return None
 
-                # 礼貌延迟
-                await asyncio.sleep(1.5)
 
-            except Exception as e:
-                logger.error(f"第{page}页爬取失败: {e}")
-                if task_id:
-                    task_manager.fail_task(task_id, str(e))
-                break
+def save_crawler_result(task_id: str, result: Dict) -> str:
+    """保存爬虫结果到所属站点的目录，登记到最新结果清单，并导入数据集成为站点当前的数据，返回文件路径
 
-        if task_id:
-            task_manager.update_progress(task_id, 100, "爬取完成，正在整理数据...")
+    结果文件保留每次爬取的完整记录（增量合并、重试与续爬依赖它），分析接口只查询数据集。
+    """
+    json_file = crawler_result_path(task_id, result.get('site'))
+    os.makedirs(os.path.dirname(json_file), exist_ok=True)
+    data = fast_json.dumps(result, pretty=fast_json.PRETTY)
+    with open(json_file, 'wb') as f:
+        f.write(data)
+    try:
+        columnar_snapshot.write_snapshot(columnar_snapshot.snapshot_path(json_file), result.get('questions') or [])
+    except Exception as e:
+        logger.warning(f"写入列式快照失败: {e}")
 
-        return all_questions
+    site = result.get('site') or site_key(crawler.base_url)
+    result_manifest.update(site, manifest_entry(task_id, json_file, result, hashlib.sha256(data).hexdigest()))
+    dataset_store.import_result(task_id, result, site)
+    return json_file
 
-    async def _fetch_single_page_async(self, page_num: int) -> List[Dict]:
-        """异步爬取单个页面"""
-        # 在线程池中运行同步爬虫逻辑
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._fetch_single_page_sync, page_num)
 
-    def _fetch_single_page_sync(self, page_num: int) -> List[Dict]:
-        """同步爬取单个页面"""
-        try:
-            if page_num == 1:
-                url = f"{self.BASE_URL}/questions"
-            else:
-                url = f"{self.BASE_URL}/questions?page={page_num}"
+def manifest_entry(task_id: str, json_file: str, result: Dict, digest: str) -> Dict:
+    """最新结果清单中的一条记录：路径（相对输出目录）与站点根地址用于读取结果、判断站点是否爬取过，
+    版本、问题数与完成时间见系统状态的 latest_results；分析数据从数据集查询，清单中不重复保存"""
+    return {
+        "task_id": task_id,
+        "path": os.path.relpath(json_file, OUTPUT_DIR),
+        "version": f"{task_id}:{digest[:16]}",
+        "total_questions": result.get('total_questions', 0),
+        "completed_at": result.get('completed_at'),
+        "base_url": result.get('base_url')
+    }
+
+
+def rebuild_manifest():
+    """从各站点的结果目录重建最新结果清单（升级前已有的结果，或清单文件被删除后），只在启动时扫描一次目录"""
+    entries = {}
+    for directory in all_results_dirs():
+        json_file = latest_result_file(directory) if os.path.isdir(directory) else None
+        if not json_file:
+            continue
+        with open(json_file, 'rb') as f:
+            data = f.read()
+        result = fast_json.loads(data)
+        task_id = os.path.basename(json_file)[len('crawler_result_'):-len('.json')]
+        entries[result.get('site') or site_key(crawler.base_url)] = manifest_entry(
+            task_id, json_file, result, hashlib.sha256(data).hexdigest()
+        )
+    result_manifest.replace(entries)
+
+
+def import_existing_results():
+    """启动时同步：没有清单时从结果目录重建，再把数据集中还不是最新的站点结果导入数据集"""
+    if not result_manifest.exists():
+        rebuild_manifest()
+    current = dataset_store.version.get('snapshots', {})
+    for site, entry in result_manifest.entries().items():
+        if current.get(site) == entry['task_id']:
+            continue
+        if not os.path.exists(os.path.join(OUTPUT_DIR, entry['path'])):
+            logger.warning(f"清单中站点{site}的结果文件不存在，已跳过: {entry['path']}")
+            continue
+        with open(os.path.join(OUTPUT_DIR, entry['path']), 'rb') as f:
+            result = fast_json.loads(f.read())
+        dataset_store.import_result(entry['task_id'], result, site)
+
+
+def load_question_frame(task_id: str, site: Optional[str], columns: List[str]) -> Optional[pd.DataFrame]:
+    """按列读取一次爬取的问题：有列式快照时内存映射只读取需要的列，否则读取 JSON 结果文件；都没有时返回 None"""
+    json_file = crawler_result_path(task_id, site)
+    snapshot = columnar_snapshot.snapshot_path(json_file)
+    if columnar_snapshot.available() and os.path.exists(snapshot):
+        return columnar_snapshot.read_snapshot(snapshot, columns)
+    if not os.path.exists(json_file):
+        return None
+    with open(json_file, 'rb') as f:
+        frame = pd.DataFrame(fast_json.loads(f.read()).get('questions', []))
+    return frame[[name for name in columns if name in frame.columns]]
+
+
+def all_results_dirs() -> List[str]:
+    """默认站点与所有其他站点的结果目录（按任务ID查找结果与重建清单时使用）"""
+    directories = [OUTPUT_DIR]
+    if os.path.isdir(SITE_RESULTS_DIR):
+        directories += [entry.path for entry in os.scandir(SITE_RESULTS_DIR) if entry.is_dir()]
+    return directories
+
+
+def latest_result_file(directory: str) -> Optional[str]:
+    """目录中最新的爬虫结果文件，没有时返回 None"""
+    json_files = sorted(
+        [f for f in os.listdir(directory) if f.startswith('crawler_result_') and f.endswith('.json')],
+        key=lambda x: os.path.getmtime(os.path.join(directory, x)),
+        reverse=True
+    )
+    return os.path.join(directory, json_files[0]) if json_files else None
+
+
+def load_latest_crawler_result(site: Optional[str] = None) -> Optional[Dict]:
+    """按最新结果清单读取最新的爬虫结果，不存在时返回 None
+
+    指定 site（根地址或主机名）时只读取该站点的最新结果；否则读取每个站点各自的最新结果，
+    只有一个站点时原样返回，多个站点时合并为一份跨站点的结果。
+    """
+    entries = result_manifest.entries()
+    if site:
+        entries = {site_key(site): entries[site_key(site)]} if site_key(site) in entries else {}
+    results = []
+    for entry in entries.values():
+        if not os.path.exists(os.path.join(OUTPUT_DIR, entry['path'])):
+            continue
+        with open(os.path.join(OUTPUT_DIR, entry['path']), 'rb') as f:
+            results.append(fast_json.loads(f.read()))
+
+    if len(results) <= 1:
+        return results[0] if results else None
+    return merge_site_results(results)
+
+
+def merge_site_results(results: List[Dict]) -> Dict:
+    """合并多个站点的最新结果：问题、用户资料与详情合在一起重新分析，sites 中保留各站点的概况"""
+    questions: List[Dict] = []
+    user_profiles: Dict[str, Dict] = {}
+    details: Dict[str, Dict] = {}
+    sites = {}
+    for result in results:
+        site = result.get('site') or site_key(crawler.base_url)
+        questions += [{**q, 'site': site} for q in result.get('questions', [])]
+        user_profiles.update(result.get('user_profiles') or {})
+        details.update(result.get('details') or {})
+        sites[site] = {
+            "base_url": result.get('base_url'),
+            "total_questions": result.get('total_questions', 0),
+            "failed_pages": result.get('failed_pages', []),
+            "completed_at": result.get('completed_at')
+        }
+
+    merged = build_crawler_result(questions, [], user_profiles or None)
+    if details:
+        merged["details"] = details
+    merged["completed_at"] = max(site["completed_at"] or "" for site in sites.values())
+    merged["sites"] = sites
+    return merged
+
+# ==================== 断点续爬 ====================
+
+class CrawlCheckpoint:
+    """任务的断点文件：每完成一页追加一行 JSON，进程中断后可跳过已完成的页面继续爬取
+
+    第一行记录任务参数，之后每行是一个已完成的页面（空页也记录，表示数据到此为止）。
+    写入中途崩溃最多损坏最后一行，读取时跳过无法解析的行即可。
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.path = os.path.join(CHECKPOINT_DIR, f'{task_id}.jsonl')
+        self.params: Dict = {}
+        self.pages: Dict[int, List[Dict]] = {}
+
+    def start(self, params: Dict):
+        """新建断点文件并写入任务参数"""
+        self.params = params
+        self.pages = {}
+        header = {"type": "task", "task_id": self.task_id, "params": params,
+                  "created_at": datetime.now().isoformat()}
+        with open(self.path, 'wb') as f:
+            f.write(fast_json.dumps(header) + b'\n')
+
+    def record_page(self, page: int, questions: List[Dict]):
+        """追加一个已完成的页面"""
+        self.pages[page] = questions
+        with open(self.path, 'ab') as f:
+            f.write(fast_json.dumps({"type": "page", "page": page, "questions": questions}) + b'\n')
+
+    def remove(self):
+        """任务完成后删除断点文件"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @classmethod
+    def load(cls, task_id: str) -> Optional['CrawlCheckpoint']:
+        """读取任务的断点文件，不存在时返回 None"""
+        checkpoint = cls(task_id)
+        if not os.path.exists(checkpoint.path):
+            return None
 
-            logger.info(f"爬取: {url}")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+        with open(checkpoint.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = fast_json.loads(line)
+                except ValueError:
+                    logger.warning(f"断点文件{checkpoint.path}中有损坏的行，已跳过")
+                    continue
+                if record.get('type') == 'task':
+                    checkpoint.params = record.get('params') or {}
+                elif record.get('type') == 'page':
+                    checkpoint.pages[int(record['page'])] = record.get('questions') or []
+
+        logger.info(f"读取断点: {task_id}，已完成{len(checkpoint.pages)}页")
+        return checkpoint
+
+# ==================== 页面解析 ====================
+
+USER_LINK_PATTERN = re.compile(r'/users/')
+QUESTION_ID_PATTERN = re.compile(r'/questions/(\d+)')
+PAGE_LINK_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+# 统计图标 class -> 字段名
+STAT_ICONS = {
+    'bi-hand-thumbs-up-fill': 'likes',
+    'bi-chat-square-text-fill': 'answers',
+    'bi-eye-fill': 'views',
+}
+
+
+class QuestionPageParser:
+    """问题列表页解析器
+
+    engine 可选 bs4（BeautifulSoup + html.parser）或 lxml（C 实现，需要安装 lxml），
+    auto 表示优先使用 lxml。两种引擎都只解析问题列表部分，输出完全一致。
+    """
+
+    ENGINES = ("auto", "lxml", "bs4")
+
+    def __init__(self, base_url: str, engine: str = "auto"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的解析引擎: {engine}")
+        if engine == "auto":
+            engine = "lxml" if lxml_html is not None else "bs4"
+        if engine == "lxml" and lxml_html is None:
+            raise ValueError("lxml 未安装，无法使用 lxml 解析引擎")
+
+        self.base_url = base_url
+        self.engine = engine
+
+    def parse(self, html: str, page_num: int) -> List[Dict]:
+        """解析列表页HTML"""
+        if self.engine == "lxml":
+            page_questions = self._parse_lxml(html, page_num)
+        else:
+            page_questions = self._parse_bs4(html, page_num)
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            question_items = soup.find_all('div', class_='list-group-item')
+        if page_questions is None:
+            logger.warning(f"第{page_num}页未找到问题元素")
+            return []
+        return page_questions
 
-            if not question_items:
-                logger.warning(f"第{page_num}页未找到问题元素")
-                return []
+    # ---------- lxml 引擎 ----------
 
-            page_questions = []
-            for item in question_items:
-                question_data = self._extract_question_data(item, page_num)
-                if question_data:
-                    page_questions.append(question_data)
+    def _parse_lxml(self, html: str, page_num: int) -> Optional[List[Dict]]:
+        """lxml 引擎：只解析问题列表片段，每个问题单次遍历取出全部字段"""
+        fragment = self._list_fragment(html)
+        if not fragment:
+            return None
 
-            return page_questions
+        root = lxml_html.fragment_fromstring(fragment, create_parent='div')
+        question_items = [
+            elem for elem in root.iter('div')
+            if 'list-group-item' in (elem.get('class') or '').split()
+        ]
+        if not question_items:
+            return None
+
+        page_questions = []
+        for item in question_items:
+            question_data = self._extract_lxml_item(item, page_num)
+            if question_data:
+                page_questions.append(question_data)
+        return page_questions
+
+    @staticmethod
+    def pagination(html: str) -> Optional[Tuple[int, bool]]:
+        """读取分页栏：(最大页码, 是否就是最后一页)
+
+        Answer 的分页栏只显示当前页附近最多 5 个页码和 Next，没有最后一页的链接：
+        有 Next 时最大页码只是总页数的下界；没有 Next 时当前页就是最后一页，最大页码即总页数。
+        没有分页栏的列表页只有一页，不是列表页时返回 None。
+        """
+        start = html.find('pagination')
+        if start == -1:
+            return (1, True) if 'list-group-item' in html else None
+        end = html.find('</ul>', start)
+        bar = html[start:end if end != -1 else len(html)]
+        numbers = PAGE_LINK_PATTERN.findall(bar)
+        return max((int(number) for number in numbers), default=1), 'Next' not in bar
+
+    @staticmethod
+    def _list_fragment(html: str) -> str:
+        """截取第一个问题条目到分页栏之间的HTML"""
+        start = html.find('list-group-item')
+        if start == -1:
+            return ""
+        start = html.rfind('<div', 0, start)
+        end = html.find('pagination', start)
+        end = html.rfind('<', start, end) if end != -1 else len(html)
+        return html[start:end]
+
+    def _extract_lxml_item(self, question_item, page_num: int) -> Optional[Dict]:
+        """单次遍历问题条目，按文档顺序取每个字段的第一个匹配元素"""
+        try:
+            title_elem = user_elem = reputation_elem = time_elem = None
+            stats = {'likes': 0, 'answers': 0, 'views': 0}
+            seen_stats = set()
+            pending_stats = []  # 等待下一个 <em> 的统计字段
+            tags = []
+
+            for elem in question_item.iter():
+                tag = elem.tag
+                if tag == 'a':
+                    classes = (elem.get('class') or '').split()
+                    href = elem.get('href')
+                    if title_elem is None and 'link-dark' in classes:
+                        title_elem = elem
+                    if user_elem is None and href is not None and USER_LINK_PATTERN.search(href):
+                        user_elem = elem
+                    if 'badge-tag' in classes:
+                        span = elem.find('.//span')
+                        if span is not None:
+                            tags.append(span.text_content().strip())
+                elif tag == 'span':
+                    if reputation_elem is None and elem.get('title') == 'Reputation':
+                        reputation_elem = elem
+                elif tag == 'time':
+                    if time_elem is None:
+                        time_elem = elem
+                elif tag == 'i':
+                    for icon_class in (elem.get('class') or '').split():
+                        key = STAT_ICONS.get(icon_class)
+                        if key and key not in seen_stats:
+                            seen_stats.add(key)
+                            pending_stats.append(key)
+                elif tag == 'em' and pending_stats:
+                    for key in pending_stats:
+                        try:
+                            stats[key] = int(elem.text_content().strip())
+                        except ValueError:
+                            pass
+                    pending_stats = []
+
+            title = title_elem.text_content().strip() if title_elem is not None else "未知标题"
+            question_link = title_elem.attrib['href'] if title_elem is not None else ""
+            user = user_elem.text_content().strip() if user_elem is not None else "匿名用户"
+            reputation = int(reputation_elem.text_content().strip()) if reputation_elem is not None else 0
+            asked_time = (time_elem.text_content().strip().replace('asked', '').strip()
+                          if time_elem is not None else "未知时间")
+            datetime_str = time_elem.get('datetime', '') if time_elem is not None else ""
+            user_href = user_elem.attrib['href'] if user_elem is not None else None
+
+            return self._question_record(
+                title, question_link, user, user_href, reputation, asked_time, datetime_str,
+                stats['likes'], stats['answers'], stats['views'], tags, page_num
+            )
 
         except Exception as e:
-            logger.error(f"爬取第{page_num}页失败: {e}")
-            return []
+            logger.error(f"提取问题数据失败: {e}")
+            return None
+
+    # ---------- BeautifulSoup 引擎 ----------
+
+    def _parse_bs4(self, html: str, page_num: int) -> Optional[List[Dict]]:
+        """BeautifulSoup 引擎：用 SoupStrainer 只建立问题条目的子树"""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', class_=self._is_list_item_class))
+        question_items = soup.find_all('div', class_='list-group-item')
+
+        if not question_items:
+            return None
+
+        page_questions = []
+        for item in question_items:
+            question_data = self._extract_question_data(item, page_num)
+            if question_data:
+                page_questions.append(question_data)
+
+        return page_questions
+
+    @staticmethod
+    def _is_list_item_class(value) -> bool:
+        """SoupStrainer 的 class 过滤条件，兼容 class 为字符串或列表的 bs4 版本"""
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return 'list-group-item' in classes
 
     def _extract_question_data(self, question_item, page_num: int) -> Optional[Dict]:
         """提取问题数据"""
@@ -298,7 +1065,7 @@ class AnswerSiteCrawler:
             title = title_elem.text.strip() if title_elem else "未知标题"
             question_link = title_elem['href'] if title_elem else ""
 
-            user_elem = question_item.find('a', href=re.compile(r'/users/'))
+            user_elem = question_item.find('a', href=USER_LINK_PATTERN)
             user = user_elem.text.strip() if user_elem else "匿名用户"
 
             reputation_elem = question_item.find('span', title='Reputation')
@@ -316,27 +1083,12 @@ class AnswerSiteCrawler:
             views = self._extract_stat(question_item, 'bi-eye-fill')
 
             tags = self._extract_tags(question_item)
-            question_id = self._extract_question_id(question_link)
-
-            full_question_url = f"{self.BASE_URL}{question_link}" if question_link else ""
-            full_user_url = f"{self.BASE_URL}{user_elem['href']}" if user_elem else ""
+            user_href = user_elem['href'] if user_elem else None
 
-            return {
-                'id': question_id,
-                'title': title,
-                'user': user,
-                'reputation': reputation,
-                'asked_time': asked_time,
-                'precise_time': datetime_str,
-                'likes': likes,
-                'answers': answers,
-                'views': views,
-                'tags': tags,
-                'question_link': full_question_url,
-                'user_link': full_user_url,
-                'crawled_at': datetime.now().isoformat(),
-                'source_page': page_num
-            }
+            return self._question_record(
+                title, question_link, user, user_href, reputation, asked_time, datetime_str,
+                likes, answers, views, tags, page_num
+            )
 
         except Exception as e:
             logger.error(f"提取问题数据失败: {e}")
@@ -367,27 +1119,1181 @@ class AnswerSiteCrawler:
             pass
         return tags
 
-    def _extract_question_id(self, question_link: str) -> str:
+    # ---------- 详情页 ----------
+
+    def parse_detail(self, html: str) -> Dict:
+        """解析问题详情页：问题正文与各个回答"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        answer_items = soup.find_all('div', class_='answer-item')
+        for item in answer_items:
+            item.extract()
+
+        question_body = soup.find(class_='fmt')
+        answers = []
+        for item in answer_items:
+            body_elem = item.find(class_='fmt')
+            user_elem = item.find('a', href=USER_LINK_PATTERN)
+            time_elem = item.find('time')
+            answers.append({
+                'id': item.get('id', ''),
+                'user': user_elem.text.strip() if user_elem else "匿名用户",
+                'body': body_elem.get_text('\n', strip=True) if body_elem else "",
+                'likes': self._extract_stat(item, 'bi-hand-thumbs-up-fill'),
+                'accepted': 'accepted' in (item.get('class') or []),
+                'precise_time': time_elem.get('datetime', '') if time_elem else ""
+            })
+
+        return {
+            'body': question_body.get_text('\n', strip=True) if question_body else "",
+            'answer_list': answers
+        }
+
+    # ---------- 用户主页 ----------
+
+    PROFILE_COUNTERS = {
+        'reputation': re.compile(r'(\d[\d,]*)\s*(?:reputation|声望)', re.I),
+        'answer_count': re.compile(r'(\d[\d,]*)\s*(?:answers?|个?回答)', re.I),
+        'question_count': re.compile(r'(\d[\d,]*)\s*(?:questions?|个?提问|个?问题)', re.I),
+    }
+
+    def parse_user_profile(self, html: str) -> Dict:
+        """解析用户主页：显示名、声望与回答数、提问数"""
+        soup = BeautifulSoup(html, 'html.parser')
+        name_elem = soup.find(['h3', 'h1'])
+        text = soup.get_text(' ', strip=True)
+
+        profile = {'display_name': name_elem.text.strip() if name_elem else ""}
+        for key, pattern in self.PROFILE_COUNTERS.items():
+            match = pattern.search(text)
+            profile[key] = int(match.group(1).replace(',', '')) if match else None
+        return profile
+
+    # ---------- 公共 ----------
+
+    def _question_record(self, title: str, question_link: str, user: str, user_href: Optional[str],
+                         reputation: int, asked_time: str, datetime_str: str,
+                         likes: int, answers: int, views: int, tags: List[str], page_num: int) -> Dict:
+        """组装问题数据"""
+        return {
+            'id': self._extract_question_id(question_link),
+            'title': title,
+            'user': user,
+            'reputation': reputation,
+            'asked_time': asked_time,
+            'precise_time': datetime_str,
+            'likes': likes,
+            'answers': answers,
+            'views': views,
+            'tags': tags,
+            'question_link': f"{self.base_url}{question_link}" if question_link else "",
+            'user_link': f"{self.base_url}{user_href}" if user_href is not None else "",
+            'crawled_at': datetime.now().isoformat(),
+            'source_page': page_num
+        }
+
+    @staticmethod
+    def _extract_question_id(question_link: str) -> str:
         """提取问题ID"""
+        match = QUESTION_ID_PATTERN.search(question_link)
+        return match.group(1) if match else ""
+
+
+PARSE_POOL_SIZE = os.cpu_count() or 1  # 解析进程池的进程数，各次爬取与重新解析按 parse_workers 分用
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """服务共用的解析进程池，服务启动时（或第一次使用时）创建，关闭时统一关闭
+
+    spawn/forkserver 下每个新进程都要重新导入本模块，不能每次爬取都新建进程池；
+    每次爬取同时提交的解析任务不超过自己的 parse_workers。
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_POOL_SIZE)
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """关闭解析进程池（服务关闭时调用），未完成的解析任务取消"""
+    global _parse_pool
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_page_in_worker(base_url: str, engine: str, html: str, page_num: int) -> List[Dict]:
+    """在解析进程中解析列表页（进程池只能调用模块级函数）"""
+    return QuestionPageParser(base_url, engine).parse(html, page_num)
+
+
+def reparse_archived_page(archive_dir: str, base_url: str, engine: str, entry: Dict, location: Dict):
+    """在解析进程中从归档读取页面并解析：列表页返回问题列表，详情页返回详情，用户主页返回资料"""
+    html = read_blob(archive_dir, location).decode('utf-8', errors='replace')
+    parser = QuestionPageParser(base_url, engine)
+    if entry['kind'] == 'list':
+        page_questions = parser.parse(html, entry['page'])
+        for question in page_questions:
+            question['crawled_at'] = entry['crawled_at']
+        return page_questions
+    if entry['kind'] == 'detail':
+        return parser.parse_detail(html)
+    return parser.parse_user_profile(html)
+
+
+# ==================== 爬虫模块 ====================
+
+# 当前协程所属的爬取任务ID，抓到的页面按它归档，构成这次爬取的归档分段（重新解析按分段进行）
+CURRENT_CRAWL: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_crawl', default=None)
+
+
+class AnswerSiteCrawler:
+    """天工开物问答站爬虫"""
+
+    BASE_URL = "https://answer.chancefoundation.org.cn"
+    HTML_PAGE_SIZE = 10  # 列表页每页问题数
+    API_PATH = "/answer/api/v1/question/page"
+    API_PAGE_SIZE = 100  # JSON接口单次拉取的问题数
+    DETAIL_API_PATH = "/answer/api/v1/question/info"
+    ANSWER_API_PATH = "/answer/api/v1/answer/page"
+    USER_API_PATH = "/answer/api/v1/personal/user/info"
+
+    def __init__(self, base_url: Optional[str] = None, response_cache: Optional[HttpResponseCache] = None,
+                 parser_engine: str = "auto", archive: Optional[PageArchive] = None,
+                 transport: Optional[CrawlTransport] = None, pool: Optional[ConnectionPool] = None):
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.response_cache = response_cache  # None 表示不使用HTTP缓存
+        self.archive = archive  # None 表示不归档抓到的页面
+        self.parser = QuestionPageParser(self.base_url, parser_engine)
+        self.api_available: Optional[bool] = None  # None 表示尚未探测
+        # 页码 -> 该页分页栏的 (最大页码, 是否为最后一页)，页面返回304时沿用上次的
+        self.page_hints: Dict[int, Tuple[int, bool]] = {}
+        self.rate_limiter = get_rate_limiter(self.base_url)  # 同一主机的所有爬取共用
+        self.circuit_breaker = get_circuit_breaker(self.base_url)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+        }
+        # 长连接在多次爬取之间复用，多个站点的爬虫可以共用一个连接池；transport 为 None 时直接访问站点
+        self.pool = pool or ConnectionPool(self.headers, transport=transport)
+
+    async def fetch_all_questions(self, max_pages: int = 10, task_id: str = None,
+                                  concurrency: int = 1, source: str = "auto",
+                                  known: Optional[Dict[str, tuple]] = None,
+                                  parse_workers: int = 0,
+                                  checkpoint: Optional[CrawlCheckpoint] = None) -> List[Dict]:
+        """异步爬取所有页面问题数据，参数见 iter_pages，结果按页码顺序返回"""
+        pages: Dict[int, List[Dict]] = {}
+        async for page, page_data in self.iter_pages(
+            max_pages, task_id, concurrency=concurrency, source=source, known=known,
+            parse_workers=parse_workers, checkpoint=checkpoint
+        ):
+            pages[page] = page_data
+
+        return [q for page in sorted(pages) for q in pages[page]]
+
+    async def iter_pages(self, max_pages: int = 10, task_id: str = None,
+                         concurrency: int = 1, source: str = "auto",
+                         known: Optional[Dict[str, tuple]] = None,
+                         parse_workers: int = 0,
+                         checkpoint: Optional[CrawlCheckpoint] = None) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """逐页产出 (页码, 问题列表)，每解析完一页就产出，调用方无需等待整个爬取结束
+
+        source 为 auto 时优先使用站点的 JSON 接口，接口不可用再退回 HTML 列表页；
+        api / html 则只使用对应的方式。
+        HTML 方式下 concurrency > 1 且安装了 httpx 时使用原生异步客户端并发爬取，
+        按完成顺序产出；否则逐页爬取，按页码顺序产出；
+        并发爬取时 parse_workers > 0 会把解析放到独立的进程池。只产出有数据的页面。
+
+        传入 known（问题ID -> 计数，见 known_counters）时为增量模式：
+        遇到全部已知且计数未变化的页面即停止，该页不产出。
+
+        单个页面的临时性错误会按指数退避重试，仍失败的页面跳过并记入任务的 failed_pages，
+        不影响其余页面；站点熔断时停止爬取。
+
+        传入 checkpoint 时每完成一页就写入断点，断点中已有的页面直接复用、不再请求。
+        """
+        if known is not None:
+            # 增量爬取通常一两页就结束，逐页爬取避免并发预取浪费请求
+            concurrency = 1
+
+        if source in ("auto", "api") and self.api_available is not False:
+            try:
+                async for item in self._iter_api_pages(max_pages, task_id, known, checkpoint):
+                    yield item
+                return
+            except FetchError as e:
+                logger.error(f"接口第1批获取失败: {e}")
+        if source == "api":
+            raise RuntimeError("问答站JSON接口不可用")
+        if source == "auto":
+            logger.info("JSON接口不可用，使用HTML列表页爬取")
+
+        if concurrency > 1 and httpx is not None:
+            async for item in self._iter_pages_concurrently(max_pages, task_id, concurrency,
+                                                            parse_workers, checkpoint):
+                yield item
+            return
+
+        done = checkpoint.pages if checkpoint else {}
+        total = 0
+        failures: Dict[int, FetchError] = {}
+        last_page = max_pages
+
+        async with self._client_session() as client:
+            page = 0
+            while page < last_page:
+                page += 1
+                # 更新进度
+                if task_id:
+                    self._report_progress(
+                        task_id,
+                        int((page - 1) / last_page * 100),
+                        f"正在爬取第{page}页...",
+                        page
+                    )
+
+                if page in done:
+                    page_data = done[page]
+                else:
+                    try:
+                        page_data = await self._fetch_single_page_async(page, client)
+                    except CircuitOpenError as e:
+                        failures[page] = e
+                        logger.error(f"第{page}页未爬取，停止爬取: {e}")
+                        break
+                    except FetchError as e:
+                        failures[page] = e
+                        logger.error(f"第{page}页爬取失败（尝试{e.attempts}次），跳过: {e}")
+                        continue
+                    if checkpoint:
+                        checkpoint.record_page(page, page_data)
+                    last_page = self._apply_page_hint(task_id, page, last_page)
+
+                if not page_data:
+                    logger.info(f"第{page}页无数据，停止爬取")
+                    break
+
+                if known is not None and self._is_known_page(page_data, known):
+                    logger.info(f"第{page}页的问题均已爬取且无变化，增量爬取结束")
+                    break
+
+                total += len(page_data)
+                logger.info(f"第{page}页: 抓到{len(page_data)}个问题，累计{total}个")
+                yield page, page_data
+
+        self._record_failures(task_id, failures)
+
+        if task_id:
+            task_manager.update_progress(task_id, 100, "爬取完成，正在整理数据...")
+
+    async def fetch_pages(self, pages: List[int], task_id: str = None) -> List[Dict]:
+        """只爬取指定的 HTML 列表页（用于重试失败页），仍失败的页面再次记入任务"""
+        all_questions = []
+        failures: Dict[int, FetchError] = {}
+
+        async with self._client_session() as client:
+            for index, page in enumerate(pages):
+                if task_id:
+                    self._report_progress(
+                        task_id,
+                        int(index / len(pages) * 100),
+                        f"正在重新爬取第{page}页（{index + 1}/{len(pages)}）...",
+                        page
+                    )
+
+                try:
+                    page_data = await self._fetch_single_page_async(page, client)
+                except CircuitOpenError as e:
+                    # 熔断时剩余页面都没有爬取，全部保留为失败页
+                    failures.update({remaining: e for remaining in pages[index:]})
+                    logger.error(f"站点已熔断，剩余{len(pages) - index}页未重试: {e}")
+                    break
+                except FetchError as e:
+                    failures[page] = e
+                    logger.error(f"第{page}页重试仍失败: {e}")
+                    continue
+
+                all_questions.extend(page_data)
+                logger.info(f"第{page}页: 抓到{len(page_data)}个问题")
+
+        self._record_failures(task_id, failures)
+
+        if task_id:
+            task_manager.update_progress(task_id, 100, "重试完成，正在整理数据...")
+
+        return all_questions
+
+    async def fetch_details(self, questions: List[Dict], previous: Optional[Dict[str, Dict]],
+                            details: Dict[str, Dict], task_id: str = None, concurrency: int = 3) -> Dict[str, int]:
+        """抓取问题详情（正文与回答），结果按问题ID写入 details，返回抓取统计
+
+        - 按问题ID去重，同一问题只请求一次；
+        - 上次已有详情且列表页的回答数、浏览数没有变化的问题直接沿用上次的详情，不再请求；
+        - 同时在途的请求数不超过 concurrency，每个请求仍经过限速、重试与熔断。
+        任务被停止时 details 中保留已经抓到的详情。
+        """
+        previous = previous or {}
+        stats = {"fetched": 0, "unchanged": 0, "failed": 0}
+
+        pending: Dict[str, Dict] = {}
+        for question in questions:
+            question_id = question.get('id')
+            if not question_id or question_id in pending or question_id in details:
+                continue
+            old = previous.get(question_id)
+            if old and self._detail_unchanged(old, question):
+                details[question_id] = old
+                stats["unchanged"] += 1
+            elif question.get('question_link'):
+                pending[question_id] = question
+
+        logger.info(f"问题详情: 需要抓取{len(pending)}个，未变化沿用{stats['unchanged']}个")
+        semaphore = asyncio.Semaphore(concurrency)
+        finished = 0
+
+        async def fetch_one(question: Dict, client):
+            nonlocal finished
+            async with semaphore:
+                try:
+                    details[question['id']] = await self._fetch_detail(client, question)
+                    stats["fetched"] += 1
+                except FetchError as e:
+                    stats["failed"] += 1
+                    logger.error(f"问题{question['id']}详情抓取失败: {e}")
+
+                finished += 1
+                if task_id:
+                    self._report_progress(
+                        task_id, int(finished / len(pending) * 100),
+                        f"正在抓取问题详情（{finished}/{len(pending)}）..."
+                    )
+
+        if pending:
+            async with self._client_session() as client:
+                await asyncio.gather(*(fetch_one(question, client) for question in pending.values()))
+
+        logger.info(f"问题详情抓取完成: {stats}")
+        return stats
+
+    async def fetch_user_profiles(self, questions: List[Dict], cache: UserProfileCache,
+                                  task_id: str = None, concurrency: int = 3) -> Dict[str, Dict]:
+        """抓取问题作者的个人资料，返回 user_link -> 资料
+
+        同一用户不论提了多少问题只请求一次；缓存中未过期的资料直接使用，
+        抓取失败时退回过期的旧资料。同时在途的请求数不超过 concurrency。
+        """
+        links = list(dict.fromkeys(q['user_link'] for q in questions if q.get('user_link')))
+        profiles: Dict[str, Dict] = {}
+        pending = []
+        for link in links:
+            cached = cache.get(link)
+            if cached:
+                profiles[link] = cached
+            else:
+                pending.append(link)
+
+        logger.info(f"用户资料: 共{len(links)}个用户，需要抓取{len(pending)}个")
+        semaphore = asyncio.Semaphore(concurrency)
+        finished = failed = 0
+
+        async def fetch_one(link: str, client):
+            nonlocal finished, failed
+            async with semaphore:
+                try:
+                    cache.set(link, await self._fetch_user_profile(client, link))
+                    profiles[link] = cache.profiles[link]
+                except FetchError as e:
+                    failed += 1
+                    logger.error(f"用户资料抓取失败: {link} - {e}")
+                    stale = cache.get(link, allow_stale=True)
+                    if stale:
+                        profiles[link] = stale
+
+                finished += 1
+                if task_id:
+                    self._report_progress(
+                        task_id, int(finished / len(pending) * 100),
+                        f"正在抓取用户资料（{finished}/{len(pending)}）..."
+                    )
+
+        if pending:
+            async with self._client_session() as client:
+                await asyncio.gather(*(fetch_one(link, client) for link in pending))
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, cache.save)
+
+        logger.info(f"用户资料抓取完成: 抓取{len(pending) - failed}个，失败{failed}个")
+        return profiles
+
+    async def _fetch_user_profile(self, client, user_link: str) -> Dict:
+        """抓取单个用户的资料：接口可用时走 JSON 接口，否则解析用户主页 HTML"""
+        username = unquote(user_link.rsplit('/users/', 1)[-1].split('/')[0])
+        label = f"用户{username}资料"
+
+        if self.api_available:
+            try:
+                info = await self._get_api_data(client, self.USER_API_PATH, {'username': username}, label)
+                created = datetime.fromtimestamp(int(info.get('created_at') or 0), tz=timezone.utc)
+                return {
+                    'username': username,
+                    'display_name': info.get('display_name') or username,
+                    'reputation': int(info.get('rank') or 0),
+                    'question_count': int(info.get('question_count') or 0),
+                    'answer_count': int(info.get('answer_count') or 0),
+                    'follow_count': int(info.get('follow_count') or 0),
+                    'location': info.get('location') or "",
+                    'website': info.get('website') or "",
+                    'joined_at': created.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+                }
+            except ValueError as e:
+                logger.warning(f"{label}接口不可用，改为解析用户主页: {e}")
+
+        response = await self._with_retry(label, self._get_checked, client, user_link, {})
+        loop = asyncio.get_event_loop()
+        await self._archive_in_thread('user', user_link, response)
+        profile = await loop.run_in_executor(None, self.parser.parse_user_profile, response.text)
+        return {'username': username, **profile}
+
+    @staticmethod
+    def _detail_unchanged(detail: Dict, question: Dict) -> bool:
+        """用列表页的回答数、浏览数判断详情是否可能变化
+
+        抓取详情页本身会让浏览数加 1，所以浏览数只多 1 仍视为未变化。
+        """
+        answers, views = detail.get('counters') or (None, None)
+        if answers is None or answers != question.get('answers'):
+            return False
+        return 0 <= (question.get('views') or 0) - (views or 0) <= 1
+
+    async def _fetch_detail(self, client, question: Dict) -> Dict:
+        """抓取单个问题的详情：接口可用时走 JSON 接口，否则解析详情页 HTML"""
+        label = f"问题{question['id']}详情"
+        detail = None
+        if self.api_available:
+            try:
+                detail = await self._fetch_detail_api(client, question['id'], label)
+            except ValueError as e:
+                logger.warning(f"{label}接口不可用，改为解析详情页: {e}")
+
+        if detail is None:
+            response = await self._with_retry(label, self._get_checked, client, question['question_link'], {})
+            loop = asyncio.get_event_loop()
+            await self._archive_in_thread('detail', question['question_link'], response)
+            detail = await loop.run_in_executor(None, self.parser.parse_detail, response.text)
+
+        return {
+            'id': question['id'],
+            **detail,
+            'counters': [question.get('answers'), question.get('views')],
+            'crawled_at': datetime.now().isoformat()
+        }
+
+    async def _fetch_detail_api(self, client, question_id: str, label: str) -> Dict:
+        """通过 JSON 接口获取问题正文与全部回答，接口返回的不是预期数据时抛出 ValueError"""
+        info = await self._get_api_data(client, self.DETAIL_API_PATH, {'id': question_id}, label)
+
+        answers = []
+        page = 1
+        while True:
+            params = {'question_id': question_id, 'page': page, 'page_size': self.API_PAGE_SIZE, 'order': 'default'}
+            data = await self._get_api_data(client, self.ANSWER_API_PATH, params, f"{label}第{page}页回答")
+            items = data.get('list') or []
+            for item in items:
+                user = item.get('user_info') or {}
+                created = datetime.fromtimestamp(int(item.get('created_at') or 0), tz=timezone.utc)
+                answers.append({
+                    'id': str(item.get('id', '')),
+                    'user': user.get('display_name') or user.get('username') or "匿名用户",
+                    'body': item.get('content') or "",
+                    'likes': int(item.get('vote_count') or 0),
+                    'accepted': item.get('accepted') == 2,
+                    'precise_time': created.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+                })
+            if len(items) < self.API_PAGE_SIZE or len(answers) >= int(data.get('count') or 0):
+                break
+            page += 1
+
+        return {
+            'body': info.get('content') or "",
+            'answer_list': answers
+        }
+
+    async def _get_api_data(self, client, path: str, params: Dict, label: str) -> Dict:
+        """请求 JSON 接口，返回 data 字段"""
+        url = f"{self.base_url}{path}?{urlencode(params)}"
         try:
-            match = re.search(r'/questions/(\d+)', question_link)
-            return match.group(1) if match else ""
-        except:
-            return ""
+            response = await self._with_retry(label, self._get_checked, client, url, {'Accept': 'application/json'})
+        except FetchError as e:
+            if e.status_code == 404:
+                raise ValueError(f"接口不存在: {url}") from e
+            raise
+        if 'json' not in response.headers.get('Content-Type', ''):
+            raise ValueError(f"接口返回的不是 JSON: {url}")
+        payload = fast_json.loads(response.content)
+        if payload.get('code') != 200 or not isinstance(payload.get('data'), dict):
+            raise ValueError(f"接口返回异常: {payload.get('msg') or payload.get('reason')}")
+        return payload['data']
+
+    async def _get_checked(self, client, url: str, headers: Dict[str, str]):
+        """单次GET，错误状态码抛出 FetchError；client 为 None 时在线程池中用 requests 请求"""
+        if client is not None:
+            response = await self._async_get(client, url, headers)
+        else:
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(None, self._rate_limited_get, url, headers)
+
+        if response.status_code >= 400:
+            raise FetchError(
+                f"HTTP {response.status_code}: {url}", response.status_code,
+                is_transient_status(response.status_code)
+            )
+        return response
+
+    async def _iter_api_pages(self, max_pages: int, task_id: str,
+                              known: Optional[Dict[str, tuple]] = None,
+                              checkpoint: Optional[CrawlCheckpoint] = None) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """通过 JSON 接口爬取问题列表，按换算出的 HTML 页码逐页产出
+
+        按 max_pages 个 HTML 列表页的问题数换算需要拉取的条数，每次请求 API_PAGE_SIZE 条。
+        第一次请求就失败时抛出 FetchError（此时尚未产出任何页面），由调用方退回 HTML 方式；之后某批失败时，
+        把该批对应的 HTML 页码记为失败页，之后可按页重试。
+        断点同样按 HTML 页码记录，一批对应的页面都已在断点中时不再请求该批。
+        """
+        limit = max_pages * self.HTML_PAGE_SIZE
+        api_pages = (limit + self.API_PAGE_SIZE - 1) // self.API_PAGE_SIZE
+        pages_per_batch = self.API_PAGE_SIZE // self.HTML_PAGE_SIZE
+        done = checkpoint.pages if checkpoint else {}
+        total_questions = 0
+        failures: Dict[int, FetchError] = {}
+
+        async with self._client_session() as client:
+            for api_page in range(1, api_pages + 1):
+                if task_id:
+                    self._report_progress(
+                        task_id,
+                        int((api_page - 1) / api_pages * 100),
+                        f"正在通过接口获取第{api_page}批数据...",
+                        api_page
+                    )
+
+                first_page = (api_page - 1) * pages_per_batch + 1
+                batch_pages = range(first_page, min(first_page + pages_per_batch, max_pages + 1))
+
+                if all(page in done for page in batch_pages):
+                    batch = [q for page in batch_pages for q in done[page]]
+                    received, total = len(batch), 0
+                else:
+                    try:
+                        label = f"接口第{api_page}批"
+                        if client is not None:
+                            items, total = await self._with_retry(label, self._fetch_api_page_async, client, api_page)
+                        else:
+                            items, total = await self._with_retry(label, self._fetch_api_page_sync, api_page)
+                    except FetchError as e:
+                        if api_page == 1:
+                            raise
+                        logger.error(f"接口第{api_page}批获取失败: {e}")
+                        failures.update({page: e for page in batch_pages})
+                        if isinstance(e, CircuitOpenError):
+                            break
+                        continue
+
+                    self.api_available = True
+                    offset = (api_page - 1) * self.API_PAGE_SIZE
+                    batch = []
+                    for index, item in enumerate(items):
+                        question_data = self._map_api_question(item, offset + index)
+                        if question_data:
+                            batch.append(question_data)
+                    received = len(items)
+
+                    if checkpoint:
+                        for page in batch_pages:
+                            checkpoint.record_page(page, [q for q in batch if q['source_page'] == page])
+
+                if known is not None and batch and self._is_known_page(batch, known):
+                    logger.info(f"接口第{api_page}批的问题均已爬取且无变化，增量爬取结束")
+                    break
+
+                total_questions += len(batch)
+                logger.info(f"接口第{api_page}批: 获得{received}个问题，累计{total_questions}个")
+                for page in batch_pages:
+                    page_data = [q for q in batch if q['source_page'] == page]
+                    if page_data:
+                        yield page, page_data
+
+                if received < self.API_PAGE_SIZE or api_page * self.API_PAGE_SIZE >= min(limit, total or limit):
+                    break
+
+        self._record_failures(task_id, failures)
+
+        if task_id:
+            task_manager.update_progress(task_id, 100, "爬取完成，正在整理数据...")
+
+    def _fetch_api_page_sync(self, api_page: int):
+        """同步请求一页 JSON 接口数据，返回 (问题列表, 问题总数)"""
+        url, headers = self._api_request(api_page)
+        response = self._rate_limited_get(url, headers)
+        self._archive_page('api_list', url, response, api_page)
+        return self._handle_api_response(url, response.status_code, response.headers, response.content)
+
+    async def _fetch_api_page_async(self, client, api_page: int):
+        """用 httpx 异步客户端请求一页 JSON 接口数据，返回 (问题列表, 问题总数)"""
+        url, headers = self._api_request(api_page)
+        response = await self._async_get(client, url, headers)
+        await self._archive_in_thread('api_list', url, response, api_page)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self._handle_api_response, url, response.status_code, response.headers, response.content
+        )
+
+    def _api_request(self, api_page: int):
+        """构建一页 JSON 接口请求的 URL 与请求头"""
+        params = {'page': api_page, 'page_size': self.API_PAGE_SIZE, 'order': 'newest'}
+        url = f"{self.base_url}{self.API_PATH}?{urlencode(params)}"
+
+        logger.info(f"接口请求: {url}")
+        headers = {'Accept': 'application/json'}
+        if self.response_cache:
+            headers.update(self.response_cache.request_headers(url))
+        return url, headers
+
+    def _handle_api_response(self, url: str, status_code: int, response_headers, body: bytes):
+        """处理 JSON 接口响应：命中HTTP缓存时直接复用，否则校验、解析并写入缓存"""
+        if self.response_cache:
+            hit, data = self.response_cache.lookup(url, status_code, body)
+            if hit:
+                return data.get('list') or [], int(data.get('count') or 0)
+
+        if is_transient_status(status_code):
+            raise FetchError(f"HTTP {status_code}: {url}", status_code, transient=True)
+
+        # 404 或返回的不是 JSON 说明站点没有开放该接口，后续直接走 HTML
+        content_type = response_headers.get('Content-Type', '')
+        if status_code == 404 or 'json' not in content_type:
+            self.api_available = False
+            raise ValueError(f"接口不可用: HTTP {status_code}, {content_type}")
+        if status_code >= 400:
+            raise FetchError(f"HTTP {status_code}: {url}", status_code, transient=False)
+
+        payload = fast_json.loads(body)
+        if payload.get('code') != 200 or not isinstance(payload.get('data'), dict):
+            raise ValueError(f"接口返回异常: {payload.get('msg') or payload.get('reason')}")
+
+        data = payload['data']
+        if self.response_cache:
+            self.response_cache.store(url, response_headers, body, data)
+        return data.get('list') or [], int(data.get('count') or 0)
+
+    def _map_api_question(self, item: Dict, index: int) -> Optional[QuestionRecord]:
+        """将接口返回的问题映射为与 HTML 解析一致的数据结构"""
+        try:
+            question_id = str(item['id'])
+            url_title = item.get('url_title') or ''
+            question_link = f"/questions/{question_id}/{url_title}" if url_title else f"/questions/{question_id}"
+
+            operator = item.get('operator') or {}
+            username = operator.get('username') or ''
+
+            created = datetime.fromtimestamp(int(item.get('created_at') or 0), tz=timezone.utc)
+
+            return {
+                'id': question_id,
+                'title': (item.get('title') or '').strip() or "未知标题",
+                'user': operator.get('display_name') or username or "匿名用户",
+                'reputation': int(operator.get('rank') or 0),
+                'asked_time': f"{created:%b} {created.day}, {created.year}",
+                'precise_time': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'likes': int(item.get('vote_count') or 0),
+                'answers': int(item.get('answer_count') or 0),
+                'views': int(item.get('view_count') or 0),
+                'tags': [tag.get('display_name') or tag.get('slug_name', '') for tag in item.get('tags') or []],
+                'question_link': f"{self.base_url}{question_link}",
+                'user_link': f"{self.base_url}/users/{username}" if username else "",
+                'crawled_at': datetime.now().isoformat(),
+                'source_page': index // self.HTML_PAGE_SIZE + 1
+            }
+
+        except Exception as e:
+            logger.error(f"映射接口问题数据失败: {e}")
+            return None
+
+    async def _iter_pages_concurrently(self, max_pages: int, task_id: str, concurrency: int,
+                                       parse_workers: int = 0,
+                                       checkpoint: Optional[CrawlCheckpoint] = None
+                                       ) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """流水线并发爬取：异步抓取 → 解析 → 汇总，按完成顺序逐页产出
+
+        - 抓取阶段：concurrency 个协程依次领取页码，同时在途的请求数不超过 concurrency；
+        - 解析阶段：parse_workers > 0 时由 parse_workers 个解析协程把页面交给共用的解析进程池，
+          可利用多核且不占用主进程的 GIL，为 0 时在默认线程池中解析；
+        - 汇总阶段（生成器本身）：逐页上报进度并产出结果，某页为空时收缩上界，不再领取更大的页码。
+        相邻阶段之间用有界队列衔接，下游处理不过来时上游自动等待。
+        重试后仍失败的页面不收缩上界，记入任务的 failed_pages；站点熔断时停止领取新页码。
+        断点中已完成的页面不再领取，最先产出，汇总阶段每完成一页写入断点。
+        调用方提前结束迭代时，后台的抓取与解析协程随之取消。
+        """
+        parser_count = max(parse_workers, 1)
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=parser_count * 2)
+        result_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+        done = checkpoint.pages if checkpoint else {}
+        failures: Dict[int, FetchError] = {}
+        next_page = 1
+        last_page = min([max_pages] + [page - 1 for page, page_data in done.items() if not page_data])
+
+        # 第1页返回后先看分页栏是否已是最后一页，其余页面再一次性按并发数铺开；之后每页的分页栏没有 Next 时收缩上界
+        discovered = asyncio.Event()
+        if 1 in done:
+            discovered.set()
+
+        async def fetch_stage(client):
+            nonlocal next_page, last_page
+            while next_page <= last_page:
+                if next_page > 1 and not discovered.is_set():
+                    await discovered.wait()
+                    continue
+
+                page = next_page
+                next_page += 1
+                if page in done:
+                    continue
+
+                try:
+                    fetched = await self._with_retry(f"第{page}页", self._fetch_raw_page, client, page)
+                except CircuitOpenError as e:
+                    if page <= last_page:
+                        logger.error(f"站点已熔断，停止调度第{page}页之后的页面")
+                        last_page = page
+                    fetched = e
+                except FetchError as e:
+                    fetched = e
+                finally:
+                    if page == 1:
+                        discovered.set()
+
+                if not isinstance(fetched, FetchError):
+                    last_page = self._apply_page_hint(task_id, page, last_page)
+                await parse_queue.put((page, fetched))
+
+        async def parse_stage(pool):
+            while True:
+                item = await parse_queue.get()
+                if item is None:
+                    break
+                page, fetched = item
+                if isinstance(fetched, FetchError):
+                    await result_queue.put((page, [], fetched))
+                    continue
+
+                try:
+                    page_data = await self._parse_fetched_page(fetched, page, pool)
+                except Exception as e:
+                    logger.error(f"解析第{page}页失败: {e}")
+                    await result_queue.put((page, [], FetchError(f"解析第{page}页失败: {e}", transient=False)))
+                    continue
+                await result_queue.put((page, page_data, None))
+
+        async def feed(client, parsers):
+            try:
+                await asyncio.gather(*(fetch_stage(client) for _ in range(min(concurrency, max_pages))))
+                for _ in parsers:
+                    await parse_queue.put(None)
+                await asyncio.gather(*parsers)
+            except Exception:
+                # 出错时也要让汇总循环结束，异常在 await feeder 时抛出
+                await result_queue.put(None)
+                raise
+            await result_queue.put(None)
+
+        for page in sorted(done):
+            if page <= last_page and done[page]:
+                yield page, done[page]
+
+        finished = sum(1 for page in done if page <= last_page)
+        total = sum(len(done[page]) for page in done if page <= last_page)
+        pool = get_parse_pool() if parse_workers > 0 else None
+        workers: List[asyncio.Task] = []
+        try:
+            async with self._client_session() as client:
+                parsers = [asyncio.create_task(parse_stage(pool)) for _ in range(parser_count)]
+                feeder = asyncio.create_task(feed(client, parsers))
+                workers = parsers + [feeder]
+
+                while True:
+                    item = await result_queue.get()
+                    if item is None:
+                        break
+                    page, page_data, error = item
+                    finished += 1
+
+                    if error is not None:
+                        failures[page] = error
+                        logger.error(f"第{page}页爬取失败（尝试{error.attempts}次），跳过: {error}")
+                    else:
+                        if checkpoint:
+                            checkpoint.record_page(page, page_data)
+                        if page_data:
+                            total += len(page_data)
+                            logger.info(f"第{page}页: 抓到{len(page_data)}个问题")
+                        elif page <= last_page:
+                            logger.info(f"第{page}页无数据，停止调度后续页面")
+                            last_page = page - 1
+
+                    if task_id:
+                        self._report_progress(
+                            task_id,
+                            min(int(finished / max(last_page, 1) * 100), 99),
+                            f"已完成第{page}页（{finished}/{last_page}）",
+                            page
+                        )
+
+                    if page_data and page <= last_page:
+                        yield page, page_data
+
+                await feeder
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        # 上界之外的页面本来就没有数据，失败与否都不需要重试
+        self._record_failures(task_id, {page: e for page, e in failures.items() if page <= last_page})
+
+        logger.info(f"并发爬取完成: {last_page}页，共{total}个问题")
+
+        if task_id:
+            task_manager.update_progress(task_id, 100, "爬取完成，正在整理数据...")
+
+    async def _fetch_raw_page(self, client, page_num: int) -> Dict:
+        """抓取阶段：只发请求、不解析，错误状态码抛出 FetchError"""
+        url = self._page_url(page_num)
+        logger.info(f"爬取: {url}")
+        headers = self.response_cache.request_headers(url) if self.response_cache else {}
+        response = await self._async_get(client, url, headers)
+
+        if response.status_code >= 400:
+            raise FetchError(
+                f"HTTP {response.status_code}: {url}", response.status_code,
+                is_transient_status(response.status_code)
+            )
+        if response.status_code == 200:
+            self._note_pagination(page_num, response.text)
+        await self._archive_in_thread('list', url, response, page_num)
+
+        return {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": response.headers,
+            "body": response.content,
+            "text": response.text
+        }
+
+    async def _parse_fetched_page(self, fetched: Dict, page_num: int, pool) -> List[Dict]:
+        """解析阶段：命中HTTP缓存直接复用，否则交给解析进程池（pool 为 None 时用线程池）"""
+        loop = asyncio.get_event_loop()
+        page_questions = await loop.run_in_executor(
+            None, self._lookup_cached_page, fetched['url'], fetched['status_code'], fetched['body']
+        )
+        if page_questions is not None:
+            return page_questions
+
+        page_questions = await loop.run_in_executor(
+            pool, parse_page_in_worker, self.base_url, self.parser.engine, fetched['text'], page_num
+        )
+        if self.response_cache:
+            await loop.run_in_executor(
+                None, self.response_cache.store,
+                fetched['url'], fetched['headers'], fetched['body'], page_questions
+            )
+        return page_questions
+
+    async def _fetch_single_page_async(self, page_num: int, client=None) -> List[Dict]:
+        """异步爬取单个页面，失败时按退避策略重试，最终失败抛出 FetchError
+
+        client 为 httpx 异步客户端时直接在事件循环中请求，任务取消时请求立即中断；
+        为 None 时在线程池中用 requests 请求。
+        """
+        label = f"第{page_num}页"
+        if client is None:
+            return await self._with_retry(label, self._fetch_single_page_sync, page_num)
+
+        fetched = await self._with_retry(label, self._fetch_raw_page, client, page_num)
+        try:
+            return await self._parse_fetched_page(fetched, page_num, None)
+        except Exception as e:
+            raise FetchError(f"解析第{page_num}页失败: {e}", transient=False) from e
+
+    def _fetch_single_page_sync(self, page_num: int) -> List[Dict]:
+        """同步爬取单个页面（单次请求，不重试）"""
+        url = self._page_url(page_num)
+
+        logger.info(f"爬取: {url}")
+        headers = self.response_cache.request_headers(url) if self.response_cache else {}
+        response = self._rate_limited_get(url, headers)
+        if response.status_code == 200:
+            self._note_pagination(page_num, response.text)
+        self._archive_page('list', url, response, page_num)
+
+        return self._parse_response(
+            url, response.status_code, response.headers, response.content, response.text, page_num
+        )
+
+    def _archive_page(self, kind: str, url: str, response, page: Optional[int] = None):
+        """把 200 响应的响应体写入页面归档，记在当前爬取任务名下
+
+        304 没有响应体，按HTTP缓存中的内容哈希记一条指向上次归档内容的记录，这次爬取的归档分段仍然完整。
+        在线程中调用时需要带上调用方的上下文（见 _archive_in_thread），否则不知道所属的爬取任务。
+        """
+        if self.archive is None:
+            return
+        crawl = CURRENT_CRAWL.get()
+        meta = {"crawl": crawl} if crawl else None
+        try:
+            if response.status_code == 200 and response.content:
+                self.archive.store(url, kind, response.content, page, meta)
+            elif response.status_code == 304 and self.response_cache:
+                sha256 = self.response_cache.body_hash(url)
+                if sha256:
+                    self.archive.reference(url, kind, sha256, page, meta)
+        except OSError as e:
+            logger.warning(f"页面归档写入失败: {url} - {e}")
+
+    async def _archive_in_thread(self, kind: str, url: str, response, page: Optional[int] = None):
+        """在线程池中归档页面，带上当前协程的上下文（所属的爬取任务）"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, contextvars.copy_context().run, self._archive_page, kind, url, response, page
+        )
+
+    def _note_pagination(self, page_num: int, html: str):
+        """记录列表页分页栏中的页码"""
+        hint = QuestionPageParser.pagination(html)
+        if hint is not None:
+            self.page_hints[page_num] = hint
+
+    def _apply_page_hint(self, task_id: Optional[str], page_num: int, last_page: int) -> int:
+        """爬完一页后的爬取上界
+
+        只有分页栏表明这一页就是最后一页（没有 Next）时才收缩上界；有 Next 时分页栏中的最大页码只是下界，
+        上界不变，一直爬到 max_pages 或第一个空页为止。
+        """
+        hint = self.page_hints.get(page_num)
+        if hint is None or not hint[1] or max(hint[0], page_num) >= last_page:
+            return last_page
+        last_page = max(hint[0], page_num)
+        logger.info(f"第{page_num}页的分页栏没有下一页，共{last_page}页")
+        if task_id:
+            task_manager.set_total_pages(task_id, last_page)
+        return last_page
+
+    async def _with_retry(self, label: str, func, *args):
+        """每次尝试前先获取限速令牌，临时性错误按指数退避重试，并经过站点熔断器
+
+        func 可以是协程函数，也可以是同步函数（在线程池中执行）。
+        """
+        loop = asyncio.get_event_loop()
+
+        async def attempt():
+            await self.rate_limiter.acquire()
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args)
+            # 带上当前协程的上下文，同步请求中归档的页面记在所属的爬取任务名下
+            return await loop.run_in_executor(None, contextvars.copy_context().run, func, *args)
+
+        return await retry_async(attempt, self.circuit_breaker, label)
+
+    def _record_failures(self, task_id: Optional[str], failures: Dict[int, FetchError]):
+        """把失败页面记入任务"""
+        if task_id and failures:
+            task_manager.record_page_failures(
+                task_id, {page: error.to_dict() for page, error in failures.items()}
+            )
+
+    def _client_session(self):
+        """一次爬取使用的 httpx 异步客户端，未安装 httpx 时为 None（退回线程池 + requests）
+
+        客户端来自连接池，退出时连接保持以供下次爬取复用；异步请求随任务取消立即中断。
+        """
+        return self.pool.session()
+
+    async def _async_get(self, client, url: str, headers: Dict[str, str]):
+        """异步GET，并把响应状态与耗时反馈给限速器（令牌由调用方预先获取）"""
+        started = time.monotonic()
+        try:
+            response = await self.pool.get(client, url, headers)
+        except Exception:
+            self.rate_limiter.record(None, time.monotonic() - started)
+            raise
+        self.rate_limiter.record(
+            response.status_code, time.monotonic() - started, response.headers.get('Retry-After')
+        )
+        return response
+
+    def _rate_limited_get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """同步GET，并把响应状态与耗时反馈给限速器（令牌由调用方预先获取）"""
+        started = time.monotonic()
+        try:
+            response = self.pool.get_sync(url, headers)
+        except requests.RequestException:
+            self.rate_limiter.record(None, time.monotonic() - started)
+            raise
+        self.rate_limiter.record(
+            response.status_code, time.monotonic() - started, response.headers.get('Retry-After')
+        )
+        return response
+
+    def _report_progress(self, task_id: str, progress: int, message: str, current_page: int = 0):
+        """上报任务进度，同时附带当前限速状态"""
+        task_manager.update_progress(task_id, progress, message, current_page)
+        task_manager.update_rate_limit(task_id, self.rate_limiter.status())
+
+    @staticmethod
+    def known_counters(questions: List[Dict]) -> Dict[str, tuple]:
+        """问题ID -> (点赞, 回答, 浏览)，用于增量爬取判断问题是否变化"""
+        return {
+            q['id']: (q.get('likes'), q.get('answers'), q.get('views'))
+            for q in questions if q.get('id')
+        }
+
+    @staticmethod
+    def merge_questions(previous: List[Dict], fresh: List[Dict]) -> List[Dict]:
+        """合并增量结果：新爬到的问题在前并覆盖同ID的旧记录"""
+        fresh_ids = {q['id'] for q in fresh if q.get('id')}
+        return fresh + [q for q in previous if not q.get('id') or q['id'] not in fresh_ids]
+
+    def _is_known_page(self, page_data: List[Dict], known: Dict[str, tuple]) -> bool:
+        """页面上的问题是否都已爬取过且计数没有变化"""
+        return all(
+            known.get(q['id']) == (q['likes'], q['answers'], q['views'])
+            for q in page_data
+        )
+
+    def _page_url(self, page_num: int) -> str:
+        """构建列表页URL"""
+        if page_num == 1:
+            return f"{self.base_url}/questions"
+        return f"{self.base_url}/questions?page={page_num}"
+
+    def _parse_response(self, url: str, status_code: int, headers, body: bytes, text: str,
+                        page_num: int) -> List[Dict]:
+        """处理列表页响应：命中HTTP缓存时直接复用解析结果，否则解析并写入缓存"""
+        page_questions = self._lookup_cached_page(url, status_code, body)
+        if page_questions is not None:
+            return page_questions
+
+        page_questions = self._parse_page(text, page_num)
+        if self.response_cache:
+            self.response_cache.store(url, headers, body, page_questions)
+        return page_questions
+
+    def _lookup_cached_page(self, url: str, status_code: int, body: bytes) -> Optional[List[Dict]]:
+        """命中HTTP缓存时返回缓存的解析结果，未命中返回 None，错误状态码抛出异常"""
+        if self.response_cache:
+            hit, page_questions = self.response_cache.lookup(url, status_code, body)
+            if hit:
+                return page_questions
+
+        if status_code >= 400:
+            raise FetchError(f"HTTP {status_code}: {url}", status_code, is_transient_status(status_code))
+        return None
+
+    def _parse_page(self, html: str, page_num: int) -> List[Dict]:
+        """解析列表页HTML"""
+        return self.parser.parse(html, page_num)
 
 
 # ==================== 分析模块 ====================
 
+class RunningAnalytics:
+    """爬取过程中的增量统计：每收到一页就累加，随时可取当前快照
+
+    字段与 DataAnalyzer 的结果保持一致，同一问题ID只计一次。
+    """
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self.pages = 0
+        self.totals = Counter()
+        self.users = Counter()
+        self.tags = Counter()
+        self.seen_ids = set()
+        self._top_heap = []  # (浏览量, 序号, 问题) 的最小堆，只保留 top_k 个
+        self._sequence = 0
+
+    def add_page(self, page_data: List[Dict]):
+        """累加一页问题"""
+        self.pages += 1
+        for question in page_data:
+            question_id = question.get('id')
+            if question_id:
+                if question_id in self.seen_ids:
+                    continue
+                self.seen_ids.add(question_id)
+
+            self.totals['questions'] += 1
+            self.totals['views'] += question.get('views', 0)
+            self.totals['likes'] += question.get('likes', 0)
+            self.totals['answers'] += question.get('answers', 0)
+            self.users[question.get('user')] += 1
+            self.tags.update(question.get('tags') or [])
+
+            self._sequence += 1
+            entry = (question.get('views', 0), self._sequence, question)
+            if len(self._top_heap) < self.top_k:
+                heapq.heappush(self._top_heap, entry)
+            elif entry[0] > self._top_heap[0][0]:
+                heapq.heapreplace(self._top_heap, entry)
+
+    def snapshot(self) -> Dict:
+        """当前统计快照"""
+        return {
+            "pages": self.pages,
+            "total_questions": self.totals['questions'],
+            "total_views": self.totals['views'],
+            "total_likes": self.totals['likes'],
+            "total_answers": self.totals['answers'],
+            "total_users": len(self.users),
+            "top_questions": [
+                {key: question.get(key) for key in ('id', 'title', 'views', 'likes', 'answers', 'user')}
+                for _, _, question in sorted(self._top_heap, key=lambda entry: entry[0], reverse=True)
+            ],
+            "top_users": [
+                {"user": user, "question_count": count} for user, count in self.users.most_common(5)
+            ],
+            "top_tags": [
+                {"tag": tag, "count": count} for tag, count in self.tags.most_common(15)
+            ]
+        }
+
+
 class DataAnalyzer:
-    """数据分析器"""
+    """数据分析器
+
+    问题可以是字典列表，也可以是已经按列加载的 DataFrame（例如内存映射的列式快照）。
+    """
+
+    @staticmethod
+    def frame(questions: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+        """按列组织的问题；字典编码的列还原为普通字符串列，分组与排序的结果与字典列表一致"""
+        if not isinstance(questions, pd.DataFrame):
+            return pd.DataFrame(questions)
+        categorical = questions.select_dtypes('category').columns
+        return questions.astype({name: object for name in categorical}) if len(categorical) else questions
 
     @staticmethod
-    def analyze_basic_stats(questions: List[Dict]) -> Dict:
+    def analyze_basic_stats(questions: Union[List[Dict], pd.DataFrame]) -> Dict:
         """基础统计分析"""
-        if not questions:
+        if len(questions) == 0:
             return {}
 
-        df = pd.DataFrame(questions)
+        df = DataAnalyzer.frame(questions)
 
         return {
             "total_questions": len(df),
@@ -404,12 +2310,12 @@ class DataAnalyzer:
         }
 
     @staticmethod
-    def get_top_questions(questions: List[Dict], limit: int = 10) -> List[Dict]:
+    def get_top_questions(questions: Union[List[Dict], pd.DataFrame], limit: int = 10) -> List[Dict]:
         """获取最热门问题"""
-        if not questions:
+        if len(questions) == 0:
             return []
 
-        df = pd.DataFrame(questions)
+        df = DataAnalyzer.frame(questions)
         top_df = df.nlargest(limit, 'views')[
             ['id', 'title', 'views', 'likes', 'answers', 'asked_time', 'question_link', 'user']
         ]
@@ -417,12 +2323,12 @@ class DataAnalyzer:
         return top_df.to_dict('records')
 
     @staticmethod
-    def get_top_users(questions: List[Dict], limit: int = 5) -> List[Dict]:
+    def get_top_users(questions: Union[List[Dict], pd.DataFrame], limit: int = 5) -> List[Dict]:
         """获取最活跃用户"""
-        if not questions:
+        if len(questions) == 0:
             return []
 
-        df = pd.DataFrame(questions)
+        df = DataAnalyzer.frame(questions)
         user_stats = df.groupby('user').agg({
             'views': 'sum',
             'likes': 'sum',
@@ -466,87 +2372,281 @@ class DataAnalyzer:
             for tag, count in tag_counts.most_common(limit)
         ]
 
-    @staticmethod
-    def get_trends(questions: List[Dict], granularity: str = "monthly") -> Dict:
-        """获取趋势数据"""
-        if not questions:
-            return {}
 
-        df = pd.DataFrame(questions)
-        df['date'] = pd.to_datetime(df['precise_time'], errors='coerce')
+# ==================== API 路由 ====================
 
-        if granularity == "monthly":
-            df['period'] = df['date'].dt.to_period('M')
-        elif granularity == "weekly":
-            df['period'] = df['date'].dt.to_period('W')
-        else:  # daily
-            df['period'] = df['date'].dt.to_period('D')
+# 全局爬虫实例（默认站点）
+page_archive = PageArchive(ARCHIVE_DIR)
+dataset_store = DatasetStore(DATASET_PATH)
+result_manifest = ResultManifest(MANIFEST_PATH)
+crawler = AnswerSiteCrawler(CRAWLER_SITES[0] if CRAWLER_SITES else CRAWLER_BASE_URL,
+                            response_cache=http_response_cache, archive=page_archive,
+                            transport=transport_from_env(FIXTURE_DIR))
+site_crawlers: Dict[str, AnswerSiteCrawler] = {}  # 主机 -> 其他站点的爬虫
+
+
+def get_site_crawler(base_url: Optional[str] = None) -> AnswerSiteCrawler:
+    """站点的爬虫，同一站点共用一个（限速器与熔断器本就按主机共用）
+
+    所有站点共用默认爬虫的连接池、HTTP缓存与页面归档，每个站点在连接池中有各自的并发预算。
+    """
+    if not base_url or site_key(base_url) == site_key(crawler.base_url):
+        return crawler
+    host = site_key(base_url)
+    if host not in site_crawlers:
+        site_crawlers[host] = AnswerSiteCrawler(
+            base_url, response_cache=crawler.response_cache, parser_engine=crawler.parser.engine,
+            archive=crawler.archive, pool=crawler.pool
+        )
+    return site_crawlers[host]
 
-        trends = df.groupby('period').agg({
-            'views': 'sum',
-            'likes': 'sum',
-            'answers': 'sum',
-            'title': 'count'
-        }).rename(columns={'title': 'question_count'})
 
-        return {
-            "granularity": granularity,
-            "data": [
-                {
-                    "period": str(idx),
-                    "question_count": int(row['question_count']),
-                    "total_views": int(row['views']),
-                    "total_likes": int(row['likes']),
-                    "total_answers": int(row['answers'])
-                }
-                for idx, row in trends.iterrows()
-            ]
-        }
+def known_site_url(site: str) -> Optional[str]:
+    """按主机名或根地址找到已配置或爬取过的站点的根地址，未知站点返回 None
 
-    @staticmethod
-    def get_user_analysis(questions: List[Dict], limit: int = 10) -> Dict:
-        """用户分析"""
-        if not questions:
-            return {}
+    只有这些站点可以爬取：每个站点的爬虫、限速器与连接预算在进程内一直保留，不接受任意主机。
+    """
+    host = site_key(site)
+    crawled = [entry.get('base_url') for entry in result_manifest.entries().values()]
+    for base_url in [crawler.base_url, *CRAWLER_SITES, *(c.base_url for c in site_crawlers.values()), *crawled]:
+        if base_url and site_key(base_url) == host:
+            return base_url
+    return None
 
-        df = pd.DataFrame(questions)
-        user_stats = df.groupby('user').agg({
-            'views': 'sum',
-            'likes': 'sum',
-            'answers': 'sum',
-            'title': 'count',
-            'reputation': 'max'
-        }).rename(columns={'title': 'question_count'}).sort_values('question_count', ascending=False)
 
-        top_users = user_stats.head(limit).reset_index()
+def crawl_key(request: CrawlerRequest) -> str:
+    """等价爬取的合并键：只包含影响爬取结果的参数，并发数、限速等不影响结果的参数不计入"""
+    return (f"crawl:{get_site_crawler(request.site).base_url}:{request.max_pages}:{request.source}"
+            f":{request.incremental}:{request.fetch_details}:{request.fetch_users}")
 
-        return {
-            "total_users": int(df['user'].nunique()),
-            "avg_questions_per_user": float(user_stats['question_count'].mean()),
-            "users": [
-                {
-                    "rank": i + 1,
-                    "user": row['user'],
-                    "question_count": int(row['question_count']),
-                    "total_views": int(row['views']),
-                    "total_likes": int(row['likes']),
-                    "total_answers": int(row['answers']),
-                    "reputation": int(row['reputation'])
-                }
-                for i, (_, row) in enumerate(top_users.iterrows())
-            ]
-        }
 
+def launch_crawl_task(task_id: str, request: CrawlerRequest, checkpoint: CrawlCheckpoint,
+                      priority: int = PRIORITY_INTERACTIVE) -> asyncio.Task:
+    """提交爬虫任务到所在站点的调度队列执行，并登记合并键"""
+    host = site_key(get_site_crawler(request.site).base_url)
+    coroutine = run_scheduled(
+        task_id, request.max_pages, priority, run_crawl_task(task_id, request, checkpoint), host
+    )
+    return task_manager.run(task_id, coroutine, key=crawl_key(request))
+
+
+def submit_crawl(prefix: str, request: CrawlerRequest, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, bool]:
+    """提交爬取；已有等价的爬取在排队或运行时直接复用，返回 (任务ID, 是否复用)"""
+    task_id = task_manager.find_running(crawl_key(request))
+    if task_id:
+        # 交互式请求复用排队中的后台爬取时，把它提到前面
+        crawl_scheduler.promote(task_id, priority)
+        return task_id, True
+
+    task_id = f"{prefix}_{uuid.uuid4().hex[:12]}"
+    task_manager.create_task(task_id, request.max_pages, site_key(get_site_crawler(request.site).base_url))
+
+    # 每完成一页写入断点，进程中断后可通过 resume 接口继续
+    checkpoint = CrawlCheckpoint(task_id)
+    checkpoint.start(dict(request))
+
+    launch_crawl_task(task_id, request, checkpoint, priority)
+    return task_id, False
+
+
+def submit_site_group(request: CrawlerRequest) -> Tuple[str, Dict[str, str], List[str]]:
+    """同时爬取多个站点：每个站点提交一个子任务（各自排队、限速，可单独停止、续爬与重试），
+    再由汇总任务等待全部完成；返回 (汇总任务ID, 主机 -> 子任务ID, 复用了已有爬取的主机)
+
+    站点已有等价的爬取在排队或运行时直接复用它作为子任务，这样的子任务属于别人，停止汇总任务时不会停止它。
+    """
+    children: Dict[str, str] = {}
+    shared: List[str] = []
+    for site in request.sites:
+        overrides = {key: value for key, value in dict(site).items() if key != 'base_url' and value is not None}
+        site_request = CrawlerRequest(**{**dict(request), **overrides, 'site': site.base_url, 'sites': None})
+        child_id, coalesced = submit_crawl("crawler_task", site_request)
+        children[site_key(site.base_url)] = child_id
+        if coalesced:
+            shared.append(site_key(site.base_url))
+
+    group_id = f"crawler_group_{uuid.uuid4().hex[:12]}"
+    task_manager.create_task(group_id, request.max_pages * len(children))
+    task_manager.tasks[group_id]["sites"] = children
+    task_manager.tasks[group_id]["shared_sites"] = shared
+    task_manager.start_task(group_id)
+    task_manager.run(group_id, run_site_group(group_id, children, shared))
+    return group_id, children, shared
+
+
+async def run_site_group(group_id: str, children: Dict[str, str], shared: List[str]):
+    """等待各站点的子任务结束，汇总进度与结果；汇总任务被停止时一并停止仍在进行的子任务，
+    复用的别人的爬取（shared 中的主机）继续进行"""
+    runners = [task_manager.runners[child_id] for child_id in children.values() if child_id in task_manager.runners]
+    try:
+        while runners and not all(runner.done() for runner in runners):
+            await asyncio.wait(runners, timeout=1)
+            tasks = [task_manager.get_task(child_id) for child_id in children.values()]
+            finished = sum(1 for task in tasks if task['status'] not in ('queued', 'running'))
+            task_manager.update_progress(
+                group_id, sum(task['progress'] for task in tasks) // len(tasks),
+                f"已完成{finished}/{len(tasks)}个站点"
+            )
 
-# ==================== API 路由 ====================
+        sites = {}
+        for host, child_id in children.items():
+            task = task_manager.get_task(child_id)
+            result = task.get('result') or {}
+            sites[host] = {
+                "task_id": child_id,
+                "status": task['status'],
+                "total_questions": result.get('total_questions', 0),
+                "failed_pages": result.get('failed_pages', []),
+                "error": task.get('error')
+            }
+        task_manager.complete_task(group_id, {
+            "total_questions": sum(site["total_questions"] for site in sites.values()),
+            "sites": sites
+        })
+
+    except asyncio.CancelledError:
+        for host, child_id in children.items():
+            if host not in shared and task_manager.is_active(child_id):
+                task_manager.stop_task(child_id)
+        raise
+
+
+async def start_scheduled_recrawl():
+    """定时增量刷新每个监控的站点，保持看板数据新鲜；以后台优先级排队，不挤占用户发起的爬取"""
+    for base_url in CRAWLER_SITES or [None]:
+        task_id, coalesced = submit_crawl(
+            "scheduled_crawler_task",
+            CrawlerRequest(max_pages=RECRAWL_PAGES, concurrency=1, incremental=True, site=base_url),
+            PRIORITY_BACKGROUND
+        )
+        logger.info(f"定时刷新{'复用进行中的' if coalesced else '已提交'}爬虫任务: {task_id}")
+
+
+async def run_crawl_task(task_id: str, request: CrawlerRequest, checkpoint: CrawlCheckpoint):
+    """执行爬虫任务：爬取、分析并保存结果，成功后删除断点文件
+
+    任务被停止（协程被取消）时在途请求立即中断，已爬到的页面照常分析并保存为部分结果，
+    断点保留，之后可以通过 resume 接口继续。读取上次结果与保存（写文件、快照、导入数据集、更新清单）
+    都在线程池中执行，不阻塞事件循环。
+    """
+    loop = asyncio.get_event_loop()
+    CURRENT_CRAWL.set(task_id)  # 续爬沿用同一个任务ID，页面归档到同一个分段
+    pages: Dict[int, List[Dict]] = {}
+    previous = None
+    details: Optional[Dict[str, Dict]] = {} if request.fetch_details else None
+    site_crawler = get_site_crawler(request.site)
+    host = site_key(site_crawler.base_url)
+    try:
+        logger.info(f"开始执行爬虫任务: {task_id}（{host}）")
+        # 限速与连接池并发预算都按站点设置，不影响同时在爬的其他站点
+        site_crawler.rate_limiter.configure(request.rate_limit, request.burst)
+        site_crawler.pool.configure(
+            request.pool_size, request.connect_timeout, request.timeout, request.http2, host=host
+        )
+
+        latest = await loop.run_in_executor(None, load_latest_crawler_result, host) \
+            if request.incremental or request.fetch_details else None
+        previous = latest if request.incremental else None
+        previous_details = (latest or {}).get('details') or {}
+        known = AnswerSiteCrawler.known_counters(previous.get('questions', [])) if previous else None
+
+        # 边爬边统计，任务状态中随时可以看到已爬页面的汇总
+        analytics = RunningAnalytics()
+        async for page, page_data in site_crawler.iter_pages(
+            request.max_pages, task_id,
+            concurrency=request.concurrency, source=request.source, known=known,
+            parse_workers=request.parse_workers, checkpoint=checkpoint
+        ):
+            pages[page] = page_data
+            analytics.add_page(page_data)
+            task_manager.update_live_stats(task_id, analytics.snapshot())
+
+        # 抓取问题详情，只请求新出现或计数有变化的问题
+        if details is not None:
+            stats = await site_crawler.fetch_details(
+                [q for page in sorted(pages) for q in pages[page]], previous_details, details,
+                task_id, request.detail_concurrency
+            )
+            task_manager.update_progress(
+                task_id, 100,
+                f"问题详情: 抓取{stats['fetched']}个，未变化沿用{stats['unchanged']}个，失败{stats['failed']}个"
+            )
+
+        # 抓取提问用户的资料，增量模式下合并进来的旧问题的用户一并覆盖（缓存期内不重复请求）
+        user_profiles = None
+        if request.fetch_users:
+            questions = [q for page in sorted(pages) for q in pages[page]]
+            if previous:
+                questions += previous.get('questions', [])
+            user_profiles = await site_crawler.fetch_user_profiles(
+                questions, user_profile_cache, task_id, request.user_concurrency
+            )
+
+        # 执行分析
+        task_manager.update_progress(task_id, 100, "正在分析数据...")
+        result = await loop.run_in_executor(None, partial(
+            save_crawled_pages, task_id, pages, previous, details=details, previous_details=previous_details,
+            user_profiles=user_profiles, base_url=site_crawler.base_url
+        ))
+        # 最新结果已变化，清除分析缓存，强制下次请求重新计算
+        cache_manager.clear()
+
+        checkpoint.remove()
+        task_manager.complete_task(task_id, result)
+
+    except asyncio.CancelledError:
+        logger.info(f"爬虫任务被停止: {task_id}，停止前已爬取{len(pages)}页")
+        if pages:
+            task_manager.keep_stopped_result(task_id, await loop.run_in_executor(None, partial(
+                save_crawled_pages, task_id, pages, previous, stopped=True, details=details,
+                previous_details=previous_details, base_url=site_crawler.base_url
+            )))
+            cache_manager.clear()
+        raise
+
+    except Exception as e:
+        logger.error(f"爬虫执行失败: {e}")
+        task_manager.fail_task(task_id, str(e))
+
+
+def save_crawled_pages(task_id: str, pages: Dict[int, List[Dict]], previous: Optional[Dict],
+                       stopped: bool = False, details: Optional[Dict[str, Dict]] = None,
+                       previous_details: Optional[Dict[str, Dict]] = None,
+                       user_profiles: Optional[Dict[str, Dict]] = None, base_url: Optional[str] = None) -> Dict:
+    """按页码整理爬到的页面，增量模式下与上次结果合并，分析后保存到站点的结果目录（在线程池中调用）
+
+    details 不为 None 时一并保存问题详情；本次没有抓到详情的问题沿用 previous_details 中的旧详情。
+    user_profiles 不为 None 时一并保存用户资料（user_link -> 资料），用户分析优先使用其中的数据。
+    """
+    questions = [q for page in sorted(pages) for q in pages[page]]
+
+    fetched_count = len(questions)
+    if previous:
+        questions = AnswerSiteCrawler.merge_questions(previous.get('questions', []), questions)
+        logger.info(f"增量爬取: 新增或更新{fetched_count}个问题，合并后共{len(questions)}个")
+
+    result = build_crawler_result(questions, task_manager.get_failed_pages(task_id), user_profiles, base_url)
+
+    if previous:
+        result["incremental"] = {
+            "fetched_questions": fetched_count,
+            "previous_questions": len(previous.get('questions', []))
+        }
+    if stopped:
+        result["stopped"] = True
+    if details is not None:
+        available = {**(previous_details or {}), **details}
+        result["details"] = {q['id']: available[q['id']] for q in questions if q.get('id') in available}
+
+    json_file = save_crawler_result(task_id, result)
+    logger.info(f"爬虫数据已保存: {json_file}")
+    return result
 
-# 全局爬虫实例
-crawler = AnswerSiteCrawler()
 
 @app.get("/api/v1/system/status")
 async def get_system_status():
     """获取系统状态"""
-    return {
+    return FastJSONResponse({
         "code": 200,
         "message": "系统状态正常",
         "data": {
@@ -554,105 +2654,225 @@ async def get_system_status():
             "version": "1.0.0",
             "timestamp": datetime.now().isoformat(),
             "cache_enabled": True,
-            "tasks_running": sum(1 for t in task_manager.tasks.values() if t['status'] == 'running')
+            "tasks_running": sum(1 for t in task_manager.tasks.values() if t['status'] == 'running'),
+            "tasks_queued": sum(1 for t in task_manager.tasks.values() if t['status'] == 'queued'),
+            "scheduler": crawl_scheduler.status(),
+            "circuit_breaker": crawler.circuit_breaker.status(),
+            "page_archive": page_archive.status(),
+            "connection_pool": crawler.pool.status(),
+            "transport": crawler.pool.transport.status(),
+            "dataset": dataset_store.status(),
+            "latest_results": result_manifest.status(),
+            "sites": {
+                site_key(site_crawler.base_url): {
+                    "base_url": site_crawler.base_url,
+                    "rate_limiter": site_crawler.rate_limiter.status(),
+                    "circuit_breaker": site_crawler.circuit_breaker.status()
+                }
+                for site_crawler in [crawler, *site_crawlers.values()]
+            }
         }
-    }
+    })
 
 
 @app.post("/api/v1/crawler/start")
-async def start_crawler(request: CrawlerRequest, background_tasks: BackgroundTasks):
+async def start_crawler(request: CrawlerRequest):
     """启动爬虫"""
-    import uuid
+    try:
+        # 验证参数
+        if request.max_pages < 1 or request.max_pages > 50:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "max_pages 必须在 1-50 之间"
+                    }
+                }
+            )
+
+        if request.parse_workers < 0 or request.parse_workers > (os.cpu_count() or 1):
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": f"parse_workers 必须在 0-{os.cpu_count() or 1} 之间"
+                    }
+                }
+            )
+
+        if request.rate_limit < 0.1 or request.rate_limit > 20 or request.burst < 1 or request.burst > 20:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "rate_limit 必须在 0.1-20 之间，burst 必须在 1-20 之间"
+                    }
+                }
+            )
+
+        if request.source not in ("auto", "api", "html"):
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "source 必须是 auto、api 或 html"
+                    }
+                }
+            )
+
+        if request.timeout < 1 or request.timeout > 120 or request.connect_timeout <= 0 or request.connect_timeout > 60 \
+                or request.pool_size < 1 or request.pool_size > 50:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "timeout 必须在 1-120 之间，connect_timeout 必须在 0-60 之间，pool_size 必须在 1-50 之间"
+                    }
+                }
+            )
 
-    try:
-        # 验证参数
-        if request.max_pages < 1 or request.max_pages > 50:
-            return JSONResponse(
+        if not 1 <= request.detail_concurrency <= 10 or not 1 <= request.user_concurrency <= 10:
+            return FastJSONResponse(
                 status_code=400,
                 content={
                     "code": 400,
                     "message": "参数验证失败",
                     "error": {
                         "type": "ValidationError",
-                        "details": "max_pages 必须在 1-50 之间"
+                        "details": "detail_concurrency 与 user_concurrency 必须在 1-10 之间"
                     }
                 }
             )
 
-        # 创建任务ID
-        task_id = f"crawler_task_{uuid.uuid4().hex[:12]}"
-
-        # 创建任务
-        task_manager.create_task(task_id, request.max_pages)
-
-        # 异步执行爬虫
-        async def run_crawler():
-            try:
-                logger.info(f"开始执行爬虫任务: {task_id}")
-                questions = await crawler.fetch_all_questions(request.max_pages, task_id)
-
-                # 执行分析
-                task_manager.update_progress(task_id, 100, "正在分析数据...")
-
-                basic_stats = DataAnalyzer.analyze_basic_stats(questions)
-                top_questions = DataAnalyzer.get_top_questions(questions, 10)
-                top_users = DataAnalyzer.get_top_users(questions, 5)
-                top_tags = DataAnalyzer.get_top_tags(questions, 15)
-
-                result = {
-                    "total_questions": len(questions),
-                    "basic_stats": basic_stats,
-                    "top_questions": top_questions,
-                    "top_users": top_users,
-                    "top_tags": top_tags,
-                    "questions": questions,
-                    "completed_at": datetime.now().isoformat()
+        if request.concurrency < 1 or request.concurrency > 10:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "concurrency 必须在 1-10 之间"
+                    }
                 }
+            )
 
-                # 保存到本地JSON
-                json_file = os.path.join(OUTPUT_DIR, f'crawler_result_{task_id}.json')
-                with open(json_file, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+        site_urls = [request.site] if request.site else []
+        site_urls += [site.base_url for site in request.sites or []]
+        if any(not url.startswith(('http://', 'https://')) for url in site_urls) \
+                or len({site_key(url) for url in site_urls}) < len(request.sites or []):
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "站点地址必须以 http:// 或 https:// 开头，且 sites 中的站点不能重复"
+                    }
+                }
+            )
 
-                logger.info(f"爬虫数据已保存: {json_file}")
+        unknown = [url for url in site_urls if not known_site_url(url)]
+        if unknown:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": f"未配置的站点: {', '.join(unknown)}，只能爬取 CRAWLER_SITES 中或爬取过的站点"
+                    }
+                }
+            )
 
-                task_manager.complete_task(task_id, result)
+        for site in request.sites or []:
+            if (site.concurrency is not None and not 1 <= site.concurrency <= 10) \
+                    or (site.rate_limit is not None and not 0.1 <= site.rate_limit <= 20) \
+                    or (site.burst is not None and not 1 <= site.burst <= 20) \
+                    or (site.pool_size is not None and not 1 <= site.pool_size <= 50):
+                return FastJSONResponse(
+                    status_code=400,
+                    content={
+                        "code": 400,
+                        "message": "参数验证失败",
+                        "error": {
+                            "type": "ValidationError",
+                            "details": f"站点 {site.base_url} 的 concurrency、rate_limit、burst 或 pool_size 超出范围"
+                        }
+                    }
+                )
 
-            except Exception as e:
-                logger.error(f"爬虫执行失败: {e}")
-                task_manager.fail_task(task_id, str(e))
+        # 多个站点：每个站点一个子任务，各自排队、限速，由汇总任务等待全部完成
+        sites = shared_sites = None
+        coalesced = False
+        if request.sites:
+            task_id, sites, shared_sites = submit_site_group(request)
+        else:
+            # 已有等价的爬取在运行时直接复用，不重复请求目标站点；否则交给调度器排队
+            task_id, coalesced = submit_crawl("crawler_task", request)
+            if coalesced:
+                logger.info(f"已有相同参数的爬虫任务在运行，复用: {task_id}")
+        runner = task_manager.runners[task_id]
 
         if request.async_mode:
             # 异步模式：立即返回task_id，后台执行爬虫
-            background_tasks.add_task(run_crawler)
+            schedule = await submitted_schedule(task_id)
+            task = task_manager.get_task(task_id)
 
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=202,
                 content={
                     "code": 202,
-                    "message": "爬虫任务已提交",
+                    "message": "已有相同参数的爬虫任务在运行" if coalesced else "爬虫任务已提交",
                     "data": {
                         "task_id": task_id,
-                        "status": "running",
-                        "progress": 0,
-                        "message": "爬虫正在初始化..."
+                        "status": task['status'],
+                        "progress": task['progress'],
+                        "message": task.get('message', ''),
+                        "coalesced": coalesced,
+                        "sites": sites,
+                        "shared_sites": shared_sites,
+                        "schedule": schedule
                     }
                 }
             )
         else:
-            # 同步模式：等待爬虫完成
-            await run_crawler()
+            # 同步模式：等待爬虫完成（被停止时 wait 不会抛出取消异常）
+            await asyncio.wait({runner})
 
             task = task_manager.get_task(task_id)
 
             if task['status'] == 'completed':
-                return {
+                return FastJSONResponse({
                     "code": 200,
                     "message": "爬虫执行成功",
                     "data": task['result']
-                }
+                })
+            elif task['status'] == 'stopped':
+                return FastJSONResponse({
+                    "code": 200,
+                    "message": "爬虫已停止，返回停止前爬取的数据",
+                    "data": task.get('result')
+                })
             else:
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=500,
                     content={
                         "code": 500,
@@ -663,7 +2883,7 @@ async def start_crawler(request: CrawlerRequest, background_tasks: BackgroundTas
 
     except Exception as e:
         logger.error(f"爬虫启动失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -679,7 +2899,7 @@ async def get_crawler_task(task_id: str):
     task = task_manager.get_task(task_id)
 
     if not task:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=404,
             content={
                 "code": 404,
@@ -694,19 +2914,28 @@ async def get_crawler_task(task_id: str):
         "progress": task['progress'],
         "message": task.get('message', ''),
         "current_page": task.get('current_page', 0),
-        "total_pages": task['total_pages']
+        "total_pages": task['total_pages'],
+        "rate_limit": task.get('rate_limit'),
+        "live_stats": task.get('live_stats'),
+        "failed_pages": [
+            {"page": page, **failure} for page, failure in sorted(task.get('failed_pages', {}).items())
+        ],
+        "site": task.get('site'),
+        "sites": task.get('sites'),
+        "shared_sites": task.get('shared_sites'),
+        "schedule": crawl_scheduler.job_info(task_id)
     }
 
-    if task['status'] == 'completed':
+    if task['status'] in ('completed', 'stopped') and task.get('result') is not None:
         response_data['result'] = task['result']
     elif task['status'] == 'failed':
         response_data['error'] = task.get('error', '未知错误')
 
-    return {
+    return FastJSONResponse({
         "code": 200,
         "message": "任务信息获取成功",
         "data": response_data
-    }
+    })
 
 
 @app.post("/api/v1/crawler/stop/{task_id}")
@@ -715,7 +2944,7 @@ async def stop_crawler_task(task_id: str):
     task = task_manager.get_task(task_id)
 
     if not task:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=404,
             content={
                 "code": 404,
@@ -723,99 +2952,432 @@ async def stop_crawler_task(task_id: str):
             }
         )
 
+    if not task_manager.is_active(task_id):
+        return FastJSONResponse(
+            status_code=409,
+            content={
+                "code": 409,
+                "message": f"任务已结束（{task['status']}），无需停止"
+            }
+        )
+
     task_manager.stop_task(task_id)
 
-    return {
+    return FastJSONResponse({
         "code": 200,
         "message": "任务已停止",
         "data": {
             "task_id": task_id,
             "status": "stopped"
         }
-    }
+    })
+
+
+@app.post("/api/v1/crawler/resume/{task_id}")
+async def resume_crawler_task(task_id: str):
+    """从断点继续中断的爬虫任务，已完成的页面不再请求"""
+    if task_manager.is_active(task_id):
+        return FastJSONResponse(
+            status_code=409,
+            content={
+                "code": 409,
+                "message": "任务仍在运行，无需续爬"
+            }
+        )
+
+    checkpoint = CrawlCheckpoint.load(task_id) if TASK_ID_PATTERN.match(task_id) else None
+    if not checkpoint:
+        return FastJSONResponse(
+            status_code=404,
+            content={
+                "code": 404,
+                "message": "断点不存在",
+                "error": "指定的task_id没有可继续的断点，可能已完成或从未启动"
+            }
+        )
+
+    request = CrawlerRequest(**checkpoint.params)
+    task_manager.create_task(task_id, request.max_pages, site_key(get_site_crawler(request.site).base_url))
+    task_manager.update_progress(task_id, 0, f"从断点继续，已完成{len(checkpoint.pages)}页，排队等待中...")
+
+    launch_crawl_task(task_id, request, checkpoint)
+    schedule = await submitted_schedule(task_id)
+
+    return FastJSONResponse(
+        status_code=202,
+        content={
+            "code": 202,
+            "message": "续爬任务已提交",
+            "data": {
+                "task_id": task_id,
+                "status": task_manager.get_task(task_id)['status'],
+                "completed_pages": sorted(checkpoint.pages),
+                "schedule": schedule
+            }
+        }
+    )
+
+
+@app.post("/api/v1/crawler/retry/{task_id}")
+async def retry_failed_pages(task_id: str):
+    """只重新爬取任务中失败的页面，并合并回该任务的结果文件"""
+    if task_manager.is_active(task_id):
+        return FastJSONResponse(
+            status_code=409,
+            content={
+                "code": 409,
+                "message": "任务仍在运行，请等待完成后再重试"
+            }
+        )
+
+    json_file = find_crawler_result(task_id) if TASK_ID_PATTERN.match(task_id) else None
+    if not json_file:
+        return FastJSONResponse(
+            status_code=404,
+            content={
+                "code": 404,
+                "message": "任务结果不存在",
+                "error": "指定的task_id没有可重试的结果文件"
+            }
+        )
+
+    with open(json_file, 'rb') as f:
+        previous = fast_json.loads(f.read())
+
+    failed_pages = previous.get('failed_pages') or []
+    if not failed_pages:
+        return FastJSONResponse({
+            "code": 200,
+            "message": "任务没有失败的页面，无需重试",
+            "data": {
+                "task_id": task_id,
+                "failed_pages": []
+            }
+        })
+
+    site_crawler = get_site_crawler(previous.get('base_url'))
+    host = site_key(site_crawler.base_url)
+    task_manager.create_task(task_id, len(failed_pages), host)
+
+    async def run_retry():
+        # 重试沿用原任务ID，补抓的页面归档到原爬取的分段，重新解析时得到完整的列表
+        CURRENT_CRAWL.set(task_id)
+        try:
+            logger.info(f"重试任务{task_id}的失败页面: {failed_pages}")
+            fresh = await site_crawler.fetch_pages(failed_pages, task_id)
+
+            # 新结果覆盖同ID的旧记录，再按页码恢复原来的顺序
+            questions = AnswerSiteCrawler.merge_questions(previous.get('questions', []), fresh)
+            questions.sort(key=lambda q: q.get('source_page', 0))
+
+            task_manager.update_progress(task_id, 100, "正在分析数据...")
+            result = build_crawler_result(
+                questions, task_manager.get_failed_pages(task_id), previous.get('user_profiles'),
+                previous.get('base_url')
+            )
+            if previous.get('incremental'):
+                result['incremental'] = previous['incremental']
+            if previous.get('details'):
+                result['details'] = previous['details']
+
+            await asyncio.get_event_loop().run_in_executor(None, save_crawler_result, task_id, result)
+            logger.info(f"重试完成: 补回{len(fresh)}个问题，仍失败{len(result['failed_pages'])}页")
+
+            task_manager.complete_task(task_id, result)
+            cache_manager.clear()
+
+        except Exception as e:
+            logger.error(f"重试失败页面出错: {e}")
+            task_manager.fail_task(task_id, str(e))
+
+    task_manager.run(task_id, run_scheduled(task_id, len(failed_pages), PRIORITY_INTERACTIVE, run_retry(), host))
+    schedule = await submitted_schedule(task_id)
+
+    return FastJSONResponse(
+        status_code=202,
+        content={
+            "code": 202,
+            "message": "失败页面重试任务已提交",
+            "data": {
+                "task_id": task_id,
+                "status": task_manager.get_task(task_id)['status'],
+                "failed_pages": failed_pages,
+                "schedule": schedule
+            }
+        }
+    )
+
+
+def latest_site_archive(kind: str, as_of: Optional[str], base_url: str) -> Dict[str, Dict]:
+    """站点每个 URL 最近一次（不晚于 as_of）归档的抓取；归档由所有站点共用，按主机筛选"""
+    host = site_key(base_url)
+    return {url: entry for url, entry in page_archive.latest(kind, as_of).items() if site_key(url) == host}
+
+
+def site_archive_crawl(base_url: str, crawl: Optional[str], as_of: Optional[str]) -> Optional[Tuple[str, str]]:
+    """要重新解析的那次爬取：(任务ID, 最后一次抓取的时间)；未指定任务ID时取站点不晚于 as_of 的最近一次爬取"""
+    host = site_key(base_url)
+    crawls = {task: info for task, info in page_archive.crawls(('list', 'api_list')).items()
+              if site_key(info['url']) == host and (crawl or not as_of or info['last_crawled_at'] <= as_of)}
+    if crawl:
+        return (crawl, crawls[crawl]['last_crawled_at']) if crawl in crawls else None
+    if not crawls:
+        return None
+    task, info = max(crawls.items(), key=lambda item: item[1]['last_crawled_at'])
+    return task, info['last_crawled_at']
+
+
+async def run_reparse(task_id: str, request: ReparseRequest):
+    """从页面归档重新解析出完整的爬虫结果，不访问网络
+
+    列表页、详情页与用户主页在共用的解析进程池中并行解析（最多占用 parse_workers 个进程）；JSON 接口批次直接映射。
+    列表只取同一次爬取归档的分段，不同爬取之间列表已经移动，混用会重复或漏掉问题；
+    同一次爬取中列表页与接口批次都有归档时使用最近抓取的那种来源。
+    详情与用户主页取到该次爬取结束为止最近的归档，归档中没有的沿用最新结果中的。
+    """
+    loop = asyncio.get_event_loop()
+    workers = request.parse_workers or PARSE_POOL_SIZE
+    pool = get_parse_pool()
+    # 共用的进程池中同时只占用 workers 个进程
+    pool_slots = asyncio.Semaphore(workers)
+    site_crawler = get_site_crawler(request.site)
+    base_url = site_crawler.base_url
+
+    async def parse_in_pool(entry: Dict):
+        async with pool_slots:
+            return await loop.run_in_executor(
+                pool, reparse_archived_page, page_archive.archive_dir, base_url,
+                site_crawler.parser.engine, entry, page_archive.location(entry)
+            )
+
+    try:
+        crawl, crawl_end = site_archive_crawl(base_url, request.task_id, request.as_of)
+        logger.info(f"开始重新解析归档: {task_id}（爬取 {crawl}），{workers}个解析进程")
+        list_entries = sorted(page_archive.segment('list', crawl).values(), key=lambda e: e['page'] or 0)
+        api_entries = sorted(page_archive.segment('api_list', crawl).values(), key=lambda e: e['page'] or 0)
+        if list_entries and api_entries:
+            # 与爬取结果保持一致，只用最近一次爬取的来源
+            if max(e['crawled_at'] for e in api_entries) > max(e['crawled_at'] for e in list_entries):
+                list_entries = []
+            else:
+                api_entries = []
+
+        task_manager.update_progress(task_id, 10, f"正在解析{len(list_entries) + len(api_entries)}个列表页...")
+        questions = []
+        for page_questions in await asyncio.gather(*map(parse_in_pool, list_entries)):
+            questions.extend(page_questions)
+
+        for entry in api_entries:
+            body = await loop.run_in_executor(None, page_archive.read, entry)
+            items = (fast_json.loads(body).get('data') or {}).get('list') or []
+            offset = (entry['page'] - 1) * AnswerSiteCrawler.API_PAGE_SIZE
+            for index, item in enumerate(items):
+                question = site_crawler._map_api_question(item, offset + index)
+                if question:
+                    question['crawled_at'] = entry['crawled_at']
+                    questions.append(question)
+
+        latest = await loop.run_in_executor(None, load_latest_crawler_result, site_key(base_url)) or {}
+        details = dict(latest.get('details') or {})
+        user_profiles = dict(latest.get('user_profiles') or {})
+
+        task_manager.update_progress(task_id, 60, "正在解析问题详情与用户主页...")
+        detail_entries = latest_site_archive('detail', crawl_end, base_url)
+        user_entries = latest_site_archive('user', crawl_end, base_url)
+        detail_targets = [(q, detail_entries[q['question_link']]) for q in questions
+                          if q.get('id') and q.get('question_link') in detail_entries]
+        user_targets = [(link, user_entries[link]) for link in dict.fromkeys(q.get('user_link') for q in questions)
+                        if link in user_entries]
+
+        parsed = await asyncio.gather(*(parse_in_pool(entry) for _, entry in detail_targets + user_targets))
+        for (question, entry), detail in zip(detail_targets, parsed):
+            old_counters = (details.get(question['id']) or {}).get('counters')
+            details[question['id']] = {
+                'id': question['id'], **detail,
+                # 不知道归档时列表页的计数，沿用旧详情的；没有时下次爬取会重新抓取
+                'counters': old_counters,
+                'crawled_at': entry['crawled_at']
+            }
+        for (link, entry), profile in zip(user_targets, parsed[len(detail_targets):]):
+            username = unquote(link.rsplit('/users/', 1)[-1].split('/')[0])
+            user_profiles[link] = {'username': username, **profile, 'fetched_at': entry['crawled_at']}
+
+        task_manager.update_progress(task_id, 90, "正在分析数据...")
+        question_ids = {q.get('id') for q in questions}
+        user_links = {q.get('user_link') for q in questions}
+        user_profiles = {link: profile for link, profile in user_profiles.items() if link in user_links}
+        result = build_crawler_result(questions, [], user_profiles or None, base_url)
+        details = {question_id: detail for question_id, detail in details.items() if question_id in question_ids}
+        if details:
+            result["details"] = details
+        result["reparsed"] = {
+            "task_id": crawl,
+            "as_of": request.as_of,
+            "list_pages": len(list_entries),
+            "api_batches": len(api_entries),
+            "details": len(detail_targets),
+            "user_profiles": len(user_targets)
+        }
+
+        await loop.run_in_executor(None, save_crawler_result, task_id, result)
+        cache_manager.clear()
+        logger.info(f"重新解析完成: {task_id}，共{len(questions)}个问题")
+        task_manager.complete_task(task_id, result)
+
+    except Exception as e:
+        logger.error(f"重新解析失败: {e}")
+        task_manager.fail_task(task_id, str(e))
+
+
+@app.post("/api/v1/crawler/reparse")
+async def reparse_archive(request: ReparseRequest):
+    """从页面归档重新解析出爬虫结果（不访问网络），解析逻辑变化后用来回填字段"""
+    if request.parse_workers < 0 or request.parse_workers > (os.cpu_count() or 1):
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "code": 400,
+                "message": "参数验证失败",
+                "error": {
+                    "type": "ValidationError",
+                    "details": f"parse_workers 必须在 0-{os.cpu_count() or 1} 之间"
+                }
+            }
+        )
+
+    if request.as_of:
+        try:
+            datetime.fromisoformat(request.as_of)
+        except ValueError:
+            return FastJSONResponse(
+                status_code=400,
+                content={
+                    "code": 400,
+                    "message": "参数验证失败",
+                    "error": {
+                        "type": "ValidationError",
+                        "details": "as_of 必须是 ISO 格式的时间"
+                    }
+                }
+            )
+
+    if request.site and (not request.site.startswith(('http://', 'https://')) or not known_site_url(request.site)):
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "code": 400,
+                "message": "参数验证失败",
+                "error": {
+                    "type": "ValidationError",
+                    "details": "site 必须以 http:// 或 https:// 开头，且是 CRAWLER_SITES 中或爬取过的站点"
+                }
+            }
+        )
+
+    if request.task_id and not TASK_ID_PATTERN.match(request.task_id):
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "code": 400,
+                "message": "参数验证失败",
+                "error": {
+                    "type": "ValidationError",
+                    "details": "task_id 格式不正确"
+                }
+            }
+        )
+
+    base_url = get_site_crawler(request.site).base_url
+    archived_crawl = site_archive_crawl(base_url, request.task_id, request.as_of)
+    pages = len(page_archive.segment('list', archived_crawl[0])) \
+        + len(page_archive.segment('api_list', archived_crawl[0])) if archived_crawl else 0
+    if not pages:
+        return FastJSONResponse(
+            status_code=404,
+            content={
+                "code": 404,
+                "message": "归档中没有列表页",
+                "error": f"归档中没有任务 {request.task_id} 的列表页" if request.task_id
+                         else "请先爬取一次，抓到的页面会自动归档"
+            }
+        )
+
+    task_id = f"reparse_task_{uuid.uuid4().hex[:12]}"
+    task_manager.create_task(task_id, pages, site_key(base_url))
+    # 不访问网络，不需要经过爬取调度器排队
+    task_manager.start_task(task_id)
+    task_manager.run(task_id, run_reparse(task_id, request))
+
+    return FastJSONResponse(
+        status_code=202,
+        content={
+            "code": 202,
+            "message": "重新解析任务已提交",
+            "data": {
+                "task_id": task_id,
+                "status": "running",
+                "crawl_task_id": archived_crawl[0],
+                "archived_pages": pages
+            }
+        }
+    )
+
+
+def dataset_cache_key(name: str) -> str:
+    """分析结果的缓存键带上数据集版本，换成新版本后，换版前开始的计算写入的缓存不会再被读到"""
+    return f"{name}@v{dataset_store.version['number']}"
 
 
 @app.get("/api/v1/analysis/dashboard")
 async def get_dashboard_data(
     use_cache: bool = Query(True),
     cache_ttl: int = Query(3600),
-    auto_crawl: bool = Query(True)
+    auto_crawl: bool = Query(True),
+    site: Optional[str] = Query(None)
 ):
-    """获取仪表板数据"""
+    """获取仪表板数据，site（主机名或根地址）只看一个站点，默认汇总所有站点"""
     try:
-        cache_key = "dashboard_data"
+        site = site_key(site) if site else None
+        cache_key = dataset_cache_key(f"dashboard_data_{site}" if site else "dashboard_data")
 
         # 尝试从缓存获取
         if use_cache:
             cached_data = cache_manager.get(cache_key)
             if cached_data:
                 logger.info("从缓存返回仪表板数据")
-                return {
+                return FastJSONResponse({
                     "code": 200,
                     "message": "仪表板数据获取成功（缓存）",
                     "data": cached_data
-                }
-
-        # 读取最新的爬虫数据文件
-        json_files = sorted(
-            [f for f in os.listdir(OUTPUT_DIR) if f.startswith('crawler_result_') and f.endswith('.json')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)),
-            reverse=True
-        )
-
-        if not json_files:
-            # 如果没有爬虫数据
-            if auto_crawl:
-                # 自动启动爬虫
-                logger.info("检测到没有数据文件，自动启动爬虫...")
-                task_id = f"auto_crawler_task_{uuid.uuid4().hex[:12]}"
-                auto_max_pages = 5  # 自动爬虫默认爬取5页
-                task_manager.create_task(task_id, auto_max_pages)
-
-                # 后台执行爬虫
-                async def run_auto_crawler():
-                    try:
-                        logger.info(f"自动爬虫任务开始: {task_id}")
-                        questions = await crawler.fetch_all_questions(max_pages=auto_max_pages, task_id=task_id)
-
-                        # 执行分析
-                        task_manager.update_progress(task_id, 100, "正在分析数据...")
-
-                        basic_stats = DataAnalyzer.analyze_basic_stats(questions)
-                        top_questions = DataAnalyzer.get_top_questions(questions, 10)
-                        top_users = DataAnalyzer.get_top_users(questions, 5)
-                        top_tags = DataAnalyzer.get_top_tags(questions, 15)
-
-                        result = {
-                            "total_questions": len(questions),
-                            "basic_stats": basic_stats,
-                            "top_questions": top_questions,
-                            "top_users": top_users,
-                            "top_tags": top_tags,
-                            "questions": questions,
-                            "completed_at": datetime.now().isoformat()
-                        }
-
-                        # 保存到本地JSON
-                        json_file = os.path.join(OUTPUT_DIR, f'crawler_result_{task_id}.json')
-                        with open(json_file, 'w', encoding='utf-8') as f:
-                            json.dump(result, f, ensure_ascii=False, indent=2)
+                })
 
-                        logger.info(f"自动爬虫数据已保存: {json_file}")
-                        task_manager.complete_task(task_id, result)
+        def load_dashboard():
+            if not dataset_store.has_data(site):
+                return None
+            data = dataset_store.dashboard(site)
+            cache_manager.set(cache_key, data, cache_ttl)
+            return data
 
-                        # 清除缓存，强制下次请求读取新数据
-                        cache_manager.clear(cache_key)
+        # 从数据集查询统计与排行，并发的缓存未命中只查询一次
+        data = await analysis_flight.run(cache_key, load_dashboard)
 
-                    except Exception as e:
-                        logger.error(f"自动爬虫执行失败: {e}")
-                        task_manager.fail_task(task_id, str(e))
-
-                # 启动后台任务
-                asyncio.create_task(run_auto_crawler())
+        if data is None:
+            # 如果没有爬虫数据
+            # 只自动爬取已知的站点，不按查询参数访问任意主机
+            site_url = known_site_url(site) if site else None
+            if auto_crawl and (site is None or site_url):
+                # 自动启动爬虫（默认爬取5页），已有等价的爬取在运行时直接复用
+                # 后台执行爬虫，完成后会清除缓存，下次请求读取新数据
+                task_id, coalesced = submit_crawl(
+                    "auto_crawler_task", CrawlerRequest(max_pages=5, concurrency=1, site=site_url)
+                )
+                if coalesced:
+                    logger.info(f"检测到没有数据文件，复用进行中的爬虫任务: {task_id}")
+                else:
+                    logger.info(f"检测到没有数据文件，已自动提交爬虫任务: {task_id}")
 
                 # 返回提示信息
-                return {
+                return FastJSONResponse({
                     "code": 202,
                     "message": "暂无数据，已自动启动爬虫，请稍后刷新",
                     "data": {
@@ -826,39 +3388,25 @@ async def get_dashboard_data(
                         "auto_crawling": True,
                         "task_id": task_id
                     }
-                }
-            else:
-                # 不自动爬取，返回空数据
-                data = {
-                    "basic_stats": {},
-                    "top_questions": [],
-                    "top_users": [],
-                    "top_tags": []
-                }
-        else:
-            # 读取最新的数据文件
-            with open(os.path.join(OUTPUT_DIR, json_files[0]), 'r', encoding='utf-8') as f:
-                crawler_result = json.load(f)
+                })
 
+            # 不自动爬取，返回空数据
             data = {
-                "basic_stats": crawler_result.get('basic_stats', {}),
-                "top_questions": crawler_result.get('top_questions', []),
-                "top_users": crawler_result.get('top_users', []),
-                "top_tags": crawler_result.get('top_tags', [])
+                "basic_stats": {},
+                "top_questions": [],
+                "top_users": [],
+                "top_tags": []
             }
 
-        # 缓存数据
-        cache_manager.set(cache_key, data, cache_ttl)
-
-        return {
+        return FastJSONResponse({
             "code": 200,
             "message": "仪表板数据获取成功",
             "data": data
-        }
+        })
 
     except Exception as e:
         logger.error(f"获取仪表板数据失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -874,52 +3422,49 @@ async def get_trends_data(
     end_date: Optional[str] = Query(None),
     granularity: str = Query("monthly"),
     use_cache: bool = Query(True),
-    cache_ttl: int = Query(7200)
+    cache_ttl: int = Query(7200),
+    site: Optional[str] = Query(None)
 ):
     """获取趋势数据"""
     try:
-        cache_key = f"trends_{granularity}_{start_date}_{end_date}"
+        site = site_key(site) if site else None
+        cache_key = dataset_cache_key(f"trends_{granularity}_{start_date}_{end_date}_{site or 'all'}")
 
         if use_cache:
             cached_data = cache_manager.get(cache_key)
             if cached_data:
-                return {
+                return FastJSONResponse({
                     "code": 200,
                     "message": "趋势数据获取成功（缓存）",
                     "data": cached_data
-                }
+                })
 
-        # 读取最新的爬虫数据
-        json_files = sorted(
-            [f for f in os.listdir(OUTPUT_DIR) if f.startswith('crawler_result_') and f.endswith('.json')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)),
-            reverse=True
-        )
+        def compute_trends():
+            if not dataset_store.has_data(site):
+                return None
+            trends = dataset_store.trends(site, granularity)
+            cache_manager.set(cache_key, trends, cache_ttl)
+            return trends
 
-        if not json_files:
-            return {
+        # 在数据集中按周期分组统计，并发的缓存未命中只计算一次
+        trends = await analysis_flight.run(cache_key, compute_trends)
+
+        if trends is None:
+            return FastJSONResponse({
                 "code": 202,
                 "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
                 "data": {"data": [], "no_data": True}
-            }
-
-        with open(os.path.join(OUTPUT_DIR, json_files[0]), 'r', encoding='utf-8') as f:
-            crawler_result = json.load(f)
+            })
 
-        questions = crawler_result.get('questions', [])
-        trends = DataAnalyzer.get_trends(questions, granularity)
-
-        cache_manager.set(cache_key, trends, cache_ttl)
-
-        return {
+        return FastJSONResponse({
             "code": 200,
             "message": "趋势数据获取成功",
             "data": trends
-        }
+        })
 
     except Exception as e:
         logger.error(f"获取趋势数据失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -934,51 +3479,49 @@ async def get_users_analysis(
     limit: int = Query(10),
     sort_by: str = Query("question_count"),
     use_cache: bool = Query(True),
-    cache_ttl: int = Query(3600)
+    cache_ttl: int = Query(3600),
+    site: Optional[str] = Query(None)
 ):
     """获取用户分析"""
     try:
-        cache_key = f"users_analysis_{limit}_{sort_by}"
+        site = site_key(site) if site else None
+        cache_key = dataset_cache_key(f"users_analysis_{limit}_{sort_by}_{site or 'all'}")
 
         if use_cache:
             cached_data = cache_manager.get(cache_key)
             if cached_data:
-                return {
+                return FastJSONResponse({
                     "code": 200,
                     "message": "用户分析数据获取成功（缓存）",
                     "data": cached_data
-                }
+                })
 
-        json_files = sorted(
-            [f for f in os.listdir(OUTPUT_DIR) if f.startswith('crawler_result_') and f.endswith('.json')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)),
-            reverse=True
-        )
+        def compute_user_analysis():
+            if not dataset_store.has_data(site):
+                return None
+            user_analysis = dataset_store.user_analysis(site, limit)
+            cache_manager.set(cache_key, user_analysis, cache_ttl)
+            return user_analysis
 
-        if not json_files:
-            return {
+        # 并发的缓存未命中只计算一次
+        user_analysis = await analysis_flight.run(cache_key, compute_user_analysis)
+
+        if user_analysis is None:
+            return FastJSONResponse({
                 "code": 202,
                 "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
                 "data": {"users": [], "no_data": True}
-            }
-
-        with open(os.path.join(OUTPUT_DIR, json_files[0]), 'r', encoding='utf-8') as f:
-            crawler_result = json.load(f)
+            })
 
-        questions = crawler_result.get('questions', [])
-        user_analysis = DataAnalyzer.get_user_analysis(questions, limit)
-
-        cache_manager.set(cache_key, user_analysis, cache_ttl)
-
-        return {
+        return FastJSONResponse({
             "code": 200,
             "message": "用户分析数据获取成功",
             "data": user_analysis
-        }
+        })
 
     except Exception as e:
         logger.error(f"获取用户分析失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -992,58 +3535,56 @@ async def get_users_analysis(
 async def get_tags_analysis(
     limit: int = Query(15),
     use_cache: bool = Query(True),
-    cache_ttl: int = Query(7200)
+    cache_ttl: int = Query(7200),
+    site: Optional[str] = Query(None)
 ):
     """获取标签分析"""
     try:
-        cache_key = f"tags_analysis_{limit}"
+        site = site_key(site) if site else None
+        cache_key = dataset_cache_key(f"tags_analysis_{limit}_{site or 'all'}")
 
         if use_cache:
             cached_data = cache_manager.get(cache_key)
             if cached_data:
-                return {
+                return FastJSONResponse({
                     "code": 200,
                     "message": "标签分析数据获取成功（缓存）",
                     "data": cached_data
-                }
-
-        json_files = sorted(
-            [f for f in os.listdir(OUTPUT_DIR) if f.startswith('crawler_result_') and f.endswith('.json')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)),
-            reverse=True
-        )
+                })
 
-        if not json_files:
-            return {
-                "code": 202,
-                "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
-                "data": {"tags": [], "no_data": True}
-            }
+        def compute_tags():
+            if not dataset_store.has_data(site):
+                return None
 
-        with open(os.path.join(OUTPUT_DIR, json_files[0]), 'r', encoding='utf-8') as f:
-            crawler_result = json.load(f)
+            # 在数据集中按标签统计问题数，根据 limit 参数截取指定数量的标签
+            total_tags, tags = dataset_store.top_tags(site, limit)
 
-        # 直接使用 JSON 中已经计算好的 top_tags
-        all_tags = crawler_result.get('top_tags', [])
-        # 根据 limit 参数截取指定数量的标签
-        tags = all_tags[:limit] if limit else all_tags
+            data = {
+                "total_tags": total_tags,
+                "tags": tags
+            }
+            cache_manager.set(cache_key, data, cache_ttl)
+            return data
 
-        data = {
-            "total_tags": len(all_tags),
-            "tags": tags
-        }
+        # 并发的缓存未命中只计算一次
+        data = await analysis_flight.run(cache_key, compute_tags)
 
-        cache_manager.set(cache_key, data, cache_ttl)
+        if data is None:
+            return FastJSONResponse({
+                "code": 202,
+                "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
+                "data": {"tags": [], "no_data": True}
+            })
 
-        return {
+        return FastJSONResponse({
             "code": 200,
             "message": "标签分析数据获取成功",
             "data": data
-        }
+        })
 
     except Exception as e:
         logger.error(f"获取标签分析失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -1059,18 +3600,14 @@ async def get_questions_list(
     limit: int = Query(20),
     sort_by: str = Query("views"),
     order: str = Query("desc"),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    site: Optional[str] = Query(None)
 ):
     """获取问题列表"""
     try:
-        json_files = sorted(
-            [f for f in os.listdir(OUTPUT_DIR) if f.startswith('crawler_result_') and f.endswith('.json')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)),
-            reverse=True
-        )
-
-        if not json_files:
-            return {
+        site = site_key(site) if site else None
+        if not dataset_store.has_data(site):
+            return FastJSONResponse({
                 "code": 202,
                 "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
                 "data": {
@@ -1081,28 +3618,16 @@ async def get_questions_list(
                     "questions": [],
                     "no_data": True
                 }
-            }
-
-        with open(os.path.join(OUTPUT_DIR, json_files[0]), 'r', encoding='utf-8') as f:
-            crawler_result = json.load(f)
-
-        questions = crawler_result.get('questions', [])
-
-        # 搜索过滤
-        if search:
-            questions = [q for q in questions if search.lower() in q.get('title', '').lower()]
+            })
 
-        # 排序
-        reverse = order.lower() == 'desc'
-        questions = sorted(questions, key=lambda x: x.get(sort_by, 0), reverse=reverse)
-
-        # 分页
-        total = len(questions)
+        # 搜索、排序与分页都在内存中的数据集完成，只读取本页的问题；相同的并发查询只执行一次
+        total, questions = await analysis_flight.run(
+            dataset_cache_key(f"questions_{site}_{page}_{limit}_{sort_by}_{order}_{search}"),
+            dataset_store.questions, site, page, limit, sort_by, order, search
+        )
         pages = (total + limit - 1) // limit
-        start = (page - 1) * limit
-        end = start + limit
 
-        return {
+        return FastJSONResponse({
             "code": 200,
             "message": "问题列表获取成功",
             "data": {
@@ -1110,13 +3635,13 @@ async def get_questions_list(
                 "page": page,
                 "limit": limit,
                 "pages": pages,
-                "questions": questions[start:end]
+                "questions": questions
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"获取问题列表失败: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "code": 500,
@@ -1126,14 +3651,85 @@ async def get_questions_list(
         )
 
 
+@app.get("/api/v1/analysis/history")
+async def get_crawl_history(
+    limit: int = Query(20),
+    use_cache: bool = Query(True),
+    cache_ttl: int = Query(3600),
+    site: Optional[str] = Query(None)
+):
+    """获取历次爬取的统计，每次爬取只按列读取统计用到的字段"""
+    try:
+        site = site_key(site) if site else None
+        cache_key = dataset_cache_key(f"crawl_history_{limit}_{site or 'all'}")
+
+        if use_cache:
+            cached_data = cache_manager.get(cache_key)
+            if cached_data:
+                return FastJSONResponse({
+                    "code": 200,
+                    "message": "爬取历史获取成功（缓存）",
+                    "data": cached_data
+                })
+
+        def compute_history():
+            crawls = []
+            for snapshot in dataset_store.snapshot_history(site, limit):
+                frame = load_question_frame(snapshot['id'], snapshot['site'], HISTORY_COLUMNS)
+                if frame is None:
+                    continue
+                crawls.append({
+                    "task_id": snapshot['id'],
+                    "site": snapshot['site'],
+                    "completed_at": snapshot['completed_at'],
+                    "failed_pages": snapshot['failed_pages'],
+                    "basic_stats": DataAnalyzer.analyze_basic_stats(frame)
+                })
+            data = {"total": len(crawls), "crawls": crawls}
+            cache_manager.set(cache_key, data, cache_ttl)
+            return data
+
+        # 并发的缓存未命中只计算一次
+        data = await analysis_flight.run(cache_key, compute_history)
+
+        if not data["crawls"]:
+            return FastJSONResponse({
+                "code": 202,
+                "message": "暂无数据，请先启动爬虫或等待自动爬虫完成",
+                "data": {"crawls": [], "no_data": True}
+            })
+
+        return FastJSONResponse({
+            "code": 200,
+            "message": "爬取历史获取成功",
+            "data": data
+        })
+
+    except Exception as e:
+        logger.error(f"获取爬取历史失败: {e}")
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "code": 500,
+                "message": "获取爬取历史失败",
+                "error": str(e)
+            }
+        )
+
+
 @app.get("/api/v1/system/cache-status")
 async def get_cache_status():
     """获取缓存状态"""
-    return {
+    return FastJSONResponse({
         "code": 200,
         "message": "缓存状态获取成功",
-        "data": cache_manager.status()
-    }
+        "data": {
+            **cache_manager.status(),
+            "single_flight": analysis_flight.status(),
+            "user_profiles": user_profile_cache.status(),
+            "http_cache": http_response_cache.status()
+        }
+    })
 
 
 @app.post("/api/v1/system/cache-clear")
@@ -1147,13 +3743,13 @@ async def clear_cache(cache_keys: Optional[List[str]] = None):
         cache_manager.clear()
         cleared_count = len(cache_manager.cache)
 
-    return {
+    return FastJSONResponse({
         "code": 200,
         "message": "缓存已清空",
         "data": {
             "cleared_count": cleared_count
         }
-    }
+    })
 
 
 @app.get("/")
@@ -0,0 +1,206 @@
+"""
+爬取页面的压缩归档
+每个抓到的响应体按内容哈希去重，压缩（zstd，未安装 zstandard 时用 gzip）后追加写入分段文件；
+索引按 URL 与抓取时间记录每次抓取及所属的爬取任务，解析逻辑变化后可以不访问网络、直接从归档重新解析某一次爬取
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # 未安装 zstandard 时使用 gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC = "zstd" if zstandard is not None else "gzip"
+SEGMENT_SIZE = 64 * 1024 * 1024  # 单个分段文件超过该大小后新建下一个
+
+
+def compress(body: bytes) -> bytes:
+    """按当前编码压缩"""
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(body)
+    return gzip.compress(body)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """按写入时的编码解压"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("归档使用 zstd 压缩，需要安装 zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def read_blob(archive_dir: str, location: Dict) -> bytes:
+    """按位置读取并解压一个响应体（模块级函数，解析进程中也可以直接调用）"""
+    with open(os.path.join(archive_dir, 'segments', location['segment']), 'rb') as f:
+        f.seek(location['offset'])
+        data = f.read(location['length'])
+    return decompress(data, location['codec'])
+
+
+def _read_jsonl(path: str) -> List[Dict]:
+    """读取 JSON Lines 文件，跳过写到一半的行"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"归档文件{path}中有损坏的行，已跳过")
+    return records
+
+
+class PageArchive:
+    """内容寻址的页面归档
+
+    - segments/segment-NNNNN.bin：压缩后的响应体依次追加，内容相同的响应体只存一份；
+    - blobs.jsonl：内容哈希 -> 所在分段、偏移、长度与压缩编码；
+    - index.jsonl：每次抓取一行，记录 URL、页面类型、页码、抓取时间、内容哈希与所属的爬取任务（crawl）。
+      同一次爬取的记录构成它的归档分段；返回 304 的页面也记一行，指向上次归档的同一内容。
+    先写分段再写索引，进程中断最多丢失最后一次抓取的记录。线程安全。
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.segments_dir = os.path.join(archive_dir, 'segments')
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self.index_path = os.path.join(archive_dir, 'index.jsonl')
+        self.blobs_path = os.path.join(archive_dir, 'blobs.jsonl')
+
+        self.blobs: Dict[str, Dict] = {blob['sha256']: blob for blob in _read_jsonl(self.blobs_path)}
+        self.entries: List[Dict] = _read_jsonl(self.index_path)
+        self.stats = {"stored": 0, "deduplicated": 0}
+        self._lock = threading.Lock()
+
+    def _current_segment(self) -> str:
+        segments = sorted(name for name in os.listdir(self.segments_dir) if name.startswith('segment-'))
+        if segments and os.path.getsize(os.path.join(self.segments_dir, segments[-1])) < SEGMENT_SIZE:
+            return segments[-1]
+        return f"segment-{len(segments) + 1:05d}.bin"
+
+    def store(self, url: str, kind: str, body: bytes, page: Optional[int] = None,
+              meta: Optional[Dict] = None) -> Dict:
+        """归档一次抓取，返回索引记录；meta 中的字段一并写入索引"""
+        sha256 = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "kind": kind,
+            "page": page,
+            "crawled_at": datetime.now().isoformat(),
+            "sha256": sha256,
+            "size": len(body),
+            **(meta or {})
+        }
+
+        with self._lock:
+            if sha256 in self.blobs:
+                self.stats["deduplicated"] += 1
+            else:
+                data = compress(body)
+                segment = self._current_segment()
+                with open(os.path.join(self.segments_dir, segment), 'ab') as f:
+                    offset = f.tell()
+                    f.write(data)
+                blob = {"sha256": sha256, "segment": segment, "offset": offset,
+                        "length": len(data), "codec": CODEC}
+                with open(self.blobs_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(blob) + '\n')
+                self.blobs[sha256] = blob
+                self.stats["stored"] += 1
+
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.entries.append(entry)
+        return entry
+
+    def reference(self, url: str, kind: str, sha256: str, page: Optional[int] = None,
+                  meta: Optional[Dict] = None) -> Optional[Dict]:
+        """记录一次内容未变（304）的抓取，指向已归档的响应体；没有归档过该内容时返回 None"""
+        entry = {
+            "url": url,
+            "kind": kind,
+            "page": page,
+            "crawled_at": datetime.now().isoformat(),
+            "sha256": sha256,
+            "not_modified": True,
+            **(meta or {})
+        }
+        with self._lock:
+            if sha256 not in self.blobs:
+                return None
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.entries.append(entry)
+        return entry
+
+    def location(self, entry: Dict) -> Dict:
+        """索引记录对应的响应体位置"""
+        return self.blobs[entry['sha256']]
+
+    def read(self, entry: Dict) -> bytes:
+        """读取索引记录对应的响应体"""
+        return read_blob(self.archive_dir, self.location(entry))
+
+    def latest(self, kind: str, as_of: Optional[str] = None) -> Dict[str, Dict]:
+        """每个 URL 最近一次（不晚于 as_of）抓取的索引记录"""
+        with self._lock:
+            entries = list(self.entries)
+
+        latest: Dict[str, Dict] = {}
+        for entry in entries:
+            if entry['kind'] != kind or entry['sha256'] not in self.blobs:
+                continue
+            if as_of and entry['crawled_at'] > as_of:
+                continue
+            if entry['url'] not in latest or entry['crawled_at'] >= latest[entry['url']]['crawled_at']:
+                latest[entry['url']] = entry
+        return latest
+
+    def crawls(self, kinds: Tuple[str, ...]) -> Dict[str, Dict]:
+        """归档中的各次爬取（只看 kinds 类型的页面）：任务ID -> 任意一个 URL 与最后一次抓取的时间"""
+        with self._lock:
+            entries = list(self.entries)
+
+        crawls: Dict[str, Dict] = {}
+        for entry in entries:
+            crawl = entry.get('crawl')
+            if not crawl or entry['kind'] not in kinds or entry['sha256'] not in self.blobs:
+                continue
+            if crawl not in crawls or entry['crawled_at'] > crawls[crawl]['last_crawled_at']:
+                crawls[crawl] = {"url": entry['url'], "last_crawled_at": entry['crawled_at']}
+        return crawls
+
+    def segment(self, kind: str, crawl: str) -> Dict[str, Dict]:
+        """一次爬取归档的 kind 类型页面：URL -> 索引记录（同一次爬取重复抓取时取最后一次）"""
+        with self._lock:
+            entries = list(self.entries)
+        return {entry['url']: entry for entry in entries
+                if entry['kind'] == kind and entry.get('crawl') == crawl and entry['sha256'] in self.blobs}
+
+    def status(self) -> Dict:
+        """获取归档状态"""
+        with self._lock:
+            kinds: Dict[str, int] = {}
+            for entry in self.entries:
+                kinds[entry['kind']] = kinds.get(entry['kind'], 0) + 1
+            stored_bytes = sum(blob['length'] for blob in self.blobs.values())
+            return {
+                "codec": CODEC,
+                "entries": len(self.entries),
+                "entries_by_kind": kinds,
+                "unique_bodies": len(self.blobs),
+                "compressed_bytes": stored_bytes,
+                **self.stats
+            }
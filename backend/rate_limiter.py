@@ -0,0 +1,148 @@
+"""
+按主机的自适应令牌桶限速器
+main.py 的 FastAPI 爬虫与 finicialData.py 脚本共用
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 2.0  # 每秒请求数
+DEFAULT_BURST = 3  # 令牌桶容量
+MIN_RATE = 0.2  # 退避后的最低速率
+MAX_RETRY_AFTER = 300  # Retry-After 最多等待的秒数
+
+FAST_LATENCY = 1.0  # 低于该耗时（秒）视为快速响应
+RAMP_AFTER = 5  # 连续多少次快速响应后提速
+RAMP_FACTOR = 1.25
+BACKOFF_FACTOR = 0.5
+
+
+class AdaptiveRateLimiter:
+    """单个主机的令牌桶限速器
+
+    - 以 rate 的速度补充令牌，最多积攒 burst 个；
+    - 响应带 Retry-After 时在该时间之前暂停发放令牌；
+    - 429 / 5xx / 网络错误时速率减半（不低于 MIN_RATE）；
+    - 连续 RAMP_AFTER 次快速响应后逐步恢复，直到配置的速率上限。
+    线程安全，异步代码用 acquire()，同步代码用 acquire_sync()。
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.fast_streak = 0
+        self.stats = {"requests": 0, "throttled": 0, "backoffs": 0}
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int):
+        """调整速率上限与突发容量"""
+        with self._lock:
+            self._refill(time.monotonic())
+            backed_off = self.rate < self.max_rate
+            self.max_rate = rate
+            self.rate = min(self.rate, rate) if backed_off else rate
+            self.burst = burst
+            self.tokens = min(self.tokens, float(burst))
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _reserve(self) -> float:
+        """预订一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.stats["requests"] += 1
+
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.blocked_until - now)
+            if wait > 0:
+                self.stats["throttled"] += 1
+            return wait
+
+    async def acquire(self):
+        """异步获取令牌"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        """同步获取令牌"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, status_code: Optional[int], latency: float, retry_after: Optional[str] = None):
+        """根据响应调整速率，status_code 为 None 表示请求异常"""
+        with self._lock:
+            now = time.monotonic()
+
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self.blocked_until = max(self.blocked_until, now + delay)
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                self._refill(now)
+                self.rate = max(MIN_RATE, self.rate * BACKOFF_FACTOR)
+                self.fast_streak = 0
+                self.stats["backoffs"] += 1
+            elif latency < FAST_LATENCY:
+                self.fast_streak += 1
+                if self.fast_streak >= RAMP_AFTER and self.rate < self.max_rate:
+                    self._refill(now)
+                    self.rate = min(self.max_rate, self.rate * RAMP_FACTOR)
+                    self.fast_streak = 0
+            else:
+                self.fast_streak = 0
+
+    def status(self) -> Dict:
+        """获取限速器状态"""
+        with self._lock:
+            return {
+                "current_rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "paused_seconds": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+                **self.stats
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return 0.0
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(url: str) -> AdaptiveRateLimiter:
+    """获取 URL 所属主机的限速器，同一主机的所有爬取共用一个"""
+    host = urlparse(url).netloc or url
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter()
+        return _limiters[host]
@@ -0,0 +1,95 @@
+"""
+最新爬虫结果的清单
+每个站点最新一次结果的路径、版本、问题数与完成时间写在一个小 JSON 文件里，先写临时文件再改名，读者不会读到一半；
+读者只检查这一个文件有没有变化，不必每次列出结果目录、逐个读取历史结果文件的修改时间
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultManifest:
+    """各站点最新爬虫结果的清单
+
+    sites 中每个站点一条记录：结果文件路径、任务ID、站点根地址、版本（任务ID加内容哈希）、问题数与完成时间。
+    清单文件每次整体替换，inode 与修改时间不变时直接使用内存中的副本。线程安全。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.stats = {"reloads": 0, "writes": 0}
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        """清单文件变化时重新读取（调用方持有锁）"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        entries = {}
+        if stamp is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('sites', {})
+            self.stats["reloads"] += 1
+        self._entries, self._stamp = entries, stamp
+
+    def exists(self) -> bool:
+        """清单文件是否存在"""
+        return self._file_stamp() is not None
+
+    def entries(self) -> Dict[str, Dict]:
+        """各站点最新结果的记录"""
+        with self._lock:
+            self._refresh()
+            return dict(self._entries)
+
+    def get(self, site: str) -> Optional[Dict]:
+        """站点最新结果的记录，没有时返回 None"""
+        return self.entries().get(site)
+
+    def _write(self, entries: Dict[str, Dict]):
+        """原子地替换清单文件（调用方持有锁）"""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"updated_at": datetime.now().isoformat(), "sites": entries}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._entries, self._stamp = entries, self._file_stamp()
+        self.stats["writes"] += 1
+
+    def update(self, site: str, entry: Dict):
+        """登记站点最新的结果"""
+        with self._lock:
+            self._refresh()
+            self._write({**self._entries, site: entry})
+
+    def replace(self, entries: Dict[str, Dict]):
+        """整体重写清单（从结果目录重建时使用）"""
+        with self._lock:
+            self._write(dict(entries))
+        logger.info(f"已重建最新结果清单: {len(entries)}个站点")
+
+    def status(self) -> Dict:
+        """获取清单状态"""
+        entries = self.entries()
+        return {
+            "path": self.path,
+            "sites": {site: {key: entry.get(key) for key in ("task_id", "version", "total_questions", "completed_at")}
+                      for site, entry in entries.items()},
+            **self.stats
+        }
@@ -0,0 +1,202 @@
+"""
+抓取失败的重试与熔断
+区分临时性错误（超时、连接失败、408/429/5xx）与永久性错误（404 等），只重试前者；
+同一站点连续出现临时性错误时熔断，冷却期内直接拒绝请求
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 4  # 单个请求最多尝试次数（含首次）
+BASE_DELAY = 1.0  # 第一次重试前的退避上限（秒），之后每次翻倍
+MAX_DELAY = 30.0  # 单次退避的上限（秒）
+
+FAILURE_THRESHOLD = 5  # 连续多少次临时性失败后熔断
+RESET_TIMEOUT = 60.0  # 熔断后多久放行一次试探请求（秒）
+
+TRANSIENT_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+) + ((httpx.TransportError,) if httpx is not None else ())
+
+
+class FetchError(Exception):
+    """请求最终失败（已用尽重试或遇到永久性错误）"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 transient: bool = True, attempts: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.transient = transient
+        self.attempts = attempts
+
+    def to_dict(self) -> Dict:
+        """转换为任务记录中的失败信息"""
+        return {
+            "error": str(self),
+            "status_code": self.status_code,
+            "transient": self.transient,
+            "attempts": self.attempts
+        }
+
+
+class CircuitOpenError(FetchError):
+    """站点处于熔断状态，请求未发出"""
+
+
+def is_transient_status(status_code: int) -> bool:
+    """408 / 429 / 5xx 视为临时性错误"""
+    return status_code in (408, 429) or status_code >= 500
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """取出异常对应的 HTTP 状态码，没有时返回 None"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code
+
+
+def is_transient(error: Exception) -> bool:
+    """判断异常是否值得重试"""
+    if isinstance(error, FetchError):
+        return error.transient
+    status_code = error_status(error)
+    if status_code is not None:
+        return is_transient_status(status_code)
+    return isinstance(error, TRANSIENT_EXCEPTIONS)
+
+
+def backoff_delay(attempt: int) -> float:
+    """第 attempt 次失败后的退避时间：指数增长的上限内均匀随机（full jitter），避免多个请求同时重试"""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """单个站点的熔断器
+
+    - closed：正常放行，连续 failure_threshold 次临时性失败后转为 open；
+    - open：拒绝所有请求，reset_timeout 秒后转为 half_open；
+    - half_open：只放行一个试探请求，成功则恢复 closed，失败则重新 open。
+    只有临时性失败计入，404 之类的永久性错误说明站点仍在正常响应。线程安全。
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats = {"trips": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """请求前检查，熔断期间抛出 CircuitOpenError"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self.probing = False
+
+            if self.state == "closed":
+                return
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return
+
+            self.stats["rejected"] += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"站点已熔断，约{retry_in:.0f}秒后重试", transient=True, attempts=0)
+
+    def record_success(self):
+        """请求成功（或站点正常返回了永久性错误）"""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        """请求遇到临时性错误"""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["trips"] += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def status(self) -> Dict:
+        """获取熔断器状态"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                **self.stats
+            }
+
+
+async def retry_async(attempt_func: Callable[[], Awaitable], breaker: Optional[CircuitBreaker] = None,
+                      label: str = "请求", max_attempts: int = MAX_ATTEMPTS):
+    """执行 attempt_func，临时性错误按指数退避重试
+
+    最终失败时抛出 FetchError（熔断时为 CircuitOpenError），attempts 为实际发出的请求次数。
+    """
+    attempt = 0
+    while True:
+        if breaker:
+            try:
+                breaker.before_request()
+            except CircuitOpenError as e:
+                e.attempts = attempt
+                raise
+
+        attempt += 1
+        try:
+            result = await attempt_func()
+        except Exception as e:
+            transient = is_transient(e)
+            if breaker:
+                breaker.record_failure() if transient else breaker.record_success()
+
+            if not transient or attempt >= max_attempts:
+                raise FetchError(f"{label}失败: {e}", error_status(e), transient, attempt) from e
+
+            delay = backoff_delay(attempt)
+            logger.warning(f"{label}第{attempt}次失败（{e}），{delay:.1f}秒后重试")
+            await asyncio.sleep(delay)
+        else:
+            if breaker:
+                breaker.record_success()
+            return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """获取 URL 所属站点的熔断器，同一站点的所有爬取共用一个"""
+    host = urlparse(url).netloc or url
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
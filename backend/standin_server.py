@@ -0,0 +1,488 @@
+"""
+问答站的本地替身服务器
+按站点的页面结构生成任意数量的合成问题（列表页、详情页、用户主页与 JSON 接口），
+也可以优先回放录制的夹具；支持固定延迟与错误注入，用于在没有网络的机器上测量抓取/解析吞吐与并发设置
+
+用法：
+    python standin_server.py --pages 200 --latency 0.05 --error-rate 0.02
+    CRAWLER_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from crawl_transport import FixtureStore, fixture_key
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_FILE = os.path.join(BASE_DIR, 'backendData', 'output', 'first_page.html')
+
+# 与 main.AnswerSiteCrawler 一致的路径与每页条数
+PAGE_SIZE = 10
+PAGINATION_WINDOW = 5  # 分页栏最多显示的页码数（与 Answer 相同）
+API_PATH = "/answer/api/v1/question/page"
+DETAIL_API_PATH = "/answer/api/v1/question/info"
+ANSWER_API_PATH = "/answer/api/v1/answer/page"
+USER_API_PATH = "/answer/api/v1/personal/user/info"
+
+FIRST_ID = 10020000000000000  # 合成问题的ID从这里开始递增，避开真实站点的ID
+USERS = 50  # 合成问题的提问用户数
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)  # 最新一个合成问题的提问时间
+TOPICS = ["开源贡献如何统计", "社区治理的实践", "基金会项目如何申请", "开源许可证的选择",
+          "工业软件与开源", "开源教育的课程设计", "代码评审的流程", "文档翻译的协作方式"]
+TAGS = ["开源激励计划", "开源教育", "社区治理", "开源许可证", "工业软件", "基金会"]
+
+ITEM_TEMPLATE = """
+          <div class="border-bottom pt-3 pb-2 px-0 list-group-item">
+            <h5 class="text-wrap text-break">
+              <a class="link-dark" href="{link}">{title}</a>
+            </h5>
+            <div class="d-flex flex-column flex-md-row align-items-md-center small text-secondary">
+              <div class="d-flex">
+                <div class="text-secondary me-1">
+                  <a href="/users/{username}"><span class="me-1 text-break">{display_name}</span></a><span class="fw-bold" title="Reputation">{reputation}</span>
+                </div>
+                <time class="text-secondary ms-1" datetime="{precise_time}">asked
+                  {asked_time}
+                </time>
+              </div>
+              <div class="ms-0 ms-md-3 mt-2 mt-md-0">
+                <span><i class="br bi-hand-thumbs-up-fill"></i><em class="fst-normal ms-1">{likes}</em></span>
+                <span class="ms-3"><i class="br bi-chat-square-text-fill"></i><em class="fst-normal ms-1">{answers}</em></span>
+                <span class="summary-stat ms-3"><i class="br bi-eye-fill"></i><em class="fst-normal ms-1">{views}</em></span>
+              </div>
+            </div>
+            <div class="question-tags mx-n1 mt-2">{tags}
+            </div>
+          </div>
+"""
+TAG_TEMPLATE = """
+              <a href="/tags/{slug}" class="badge-tag rounded-1 m-1"><span class="">{name}</span></a>"""
+ANSWER_TEMPLATE = """
+    <div class="answer-item{accepted}" id="{id}">
+      <div class="fmt"><p>{body}</p></div>
+      <a href="/users/{username}">{display_name}</a>
+      <time datetime="{precise_time}"></time>
+      <span><i class="br bi-hand-thumbs-up-fill"></i><em class="fst-normal ms-1">{likes}</em></span>
+    </div>"""
+
+# 没有保存的页面时使用的最简布局
+FALLBACK_LAYOUT = (
+    '<html><body><div class="border-top list-group">',
+    '</div><div class="mt-4">',
+    '</div></body></html>'
+)
+
+
+def load_layout(template_file: str) -> Tuple[str, str, str]:
+    """从保存的列表页切出布局：问题条目之前、条目与分页栏之间、分页栏之后"""
+    try:
+        with open(template_file, 'r', encoding='utf-8') as f:
+            page = f.read()
+    except OSError:
+        logger.warning(f"没有找到列表页模板{template_file}，使用最简布局")
+        return FALLBACK_LAYOUT
+
+    first_item = page.find('<div class="border-bottom pt-3')
+    pagination = page.find('<ul class="d-inline-flex mb-0 pagination')
+    if first_item == -1 or pagination == -1:
+        logger.warning(f"列表页模板{template_file}结构不符，使用最简布局")
+        return FALLBACK_LAYOUT
+
+    # 分页栏外层 <div> 之前的 </div> 是问题列表的结束标签
+    list_end = page.rfind('</div>', first_item, page.rfind('<div', first_item, pagination))
+    return page[:first_item], page[list_end:pagination], page[page.find('</ul>', pagination) + len('</ul>'):]
+
+
+class SyntheticSite:
+    """确定性的合成站点：同样的页数与种子总是生成同样的问题"""
+
+    def __init__(self, pages: int, seed: int = 0, template_file: str = TEMPLATE_FILE):
+        self.pages = pages
+        self.total = pages * PAGE_SIZE
+        self.seed = seed
+        self.layout = load_layout(template_file)
+
+    @lru_cache(maxsize=None)
+    def question(self, index: int) -> Dict:
+        """第 index 个问题（从 0 开始，按时间从新到旧）"""
+        number = self.total - index
+        rng = random.Random(self.seed * 1_000_003 + number)
+        user = rng.randrange(USERS)
+        answers = rng.randint(0, 5)
+        created = EPOCH - timedelta(hours=7 * index, minutes=rng.randrange(60))
+        return {
+            'id': str(FIRST_ID + number),
+            'url_title': f"synthetic-question-{number}",
+            'title': f"合成问题{number}：{rng.choice(TOPICS)}？",
+            'username': f"user{user:03d}",
+            'display_name': f"User{user:03d}",
+            'reputation': (user * 37) % 500,
+            'created': created,
+            'likes': rng.randint(0, 20),
+            'answers': answers,
+            'views': rng.randint(answers * 5, 500),
+            'tags': rng.sample(TAGS, rng.randint(1, 3))
+        }
+
+    def find(self, question_id: str) -> Optional[Dict]:
+        """按问题ID查找"""
+        try:
+            index = self.total - (int(question_id) - FIRST_ID)
+        except ValueError:
+            return None
+        return self.question(index) if 0 <= index < self.total else None
+
+    def page_questions(self, offset: int, limit: int) -> List[Dict]:
+        return [self.question(i) for i in range(offset, min(offset + limit, self.total))]
+
+    # ---------- HTML ----------
+
+    def list_page(self, page: int) -> str:
+        """列表页：超出总页数时没有问题条目"""
+        head, between, tail = self.layout
+        items = "".join(
+            ITEM_TEMPLATE.format(
+                link=f"/questions/{q['id']}/{q['url_title']}",
+                title=html.escape(q['title']),
+                username=q['username'],
+                display_name=q['display_name'],
+                reputation=q['reputation'],
+                precise_time=q['created'].strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                asked_time=f"{q['created']:%b} {q['created'].day}, {q['created'].year}",
+                likes=q['likes'],
+                answers=q['answers'],
+                views=q['views'],
+                tags="".join(TAG_TEMPLATE.format(slug=quote(tag), name=tag) for tag in q['tags'])
+            )
+            for q in self.page_questions((page - 1) * PAGE_SIZE, PAGE_SIZE)
+        )
+        return head + items + between + self.pagination(page) + tail
+
+    def pagination(self, page: int) -> str:
+        """分页栏：与 Answer 相同，只显示当前页附近最多 5 个页码（靠近两端时窗口不越界）和 Next，没有最后一页的链接"""
+        if self.pages <= 1:
+            return ""
+        first = max(1, min(page - 2, self.pages - PAGINATION_WINDOW + 1))
+        numbers = range(first, min(self.pages, first + PAGINATION_WINDOW - 1) + 1)
+        links = []
+        for number in numbers:
+            if number == page:
+                links.append(f'<li class="page-item active"><span class="page-link" href="?page={number}">'
+                             f'{number}<span class="visually-hidden">(current)</span></span></li>')
+            else:
+                links.append(f'<li class="page-item"><a class="page-link" href="?page={number}">{number}</a></li>')
+        if page < self.pages:
+            links.append(f'<li class="page-item"><a class="page-link" href="?page={page + 1}">'
+                         '<span aria-hidden="true">Next</span></a></li>')
+        return '<ul class="d-inline-flex mb-0 pagination pagination-sm">\n' + "\n".join(links) + '\n</ul>'
+
+    def answers(self, question: Dict) -> List[Dict]:
+        rng = random.Random(int(question['id']))
+        answers = []
+        for k in range(question['answers']):
+            user = rng.randrange(USERS)
+            answers.append({
+                'id': f"{question['id']}{k:02d}",
+                'username': f"user{user:03d}",
+                'display_name': f"User{user:03d}",
+                'body': f"这是合成问题的第{k + 1}个回答。" * rng.randint(1, 20),
+                'likes': rng.randint(0, 10),
+                'accepted': k == 0 and rng.random() < 0.5,
+                'created': question['created'] + timedelta(hours=k + 1)
+            })
+        return answers
+
+    def question_body(self, question: Dict) -> str:
+        return f"{question['title']}\n" + "合成问题的正文。" * (int(question['id']) % 30 + 1)
+
+    def detail_page(self, question: Dict) -> str:
+        """问题详情页"""
+        answers = "".join(
+            ANSWER_TEMPLATE.format(
+                accepted=" accepted" if a['accepted'] else "",
+                id=a['id'],
+                body=html.escape(a['body']),
+                username=a['username'],
+                display_name=a['display_name'],
+                precise_time=a['created'].strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                likes=a['likes']
+            )
+            for a in self.answers(question)
+        )
+        return (f"<html><body><h1>{html.escape(question['title'])}</h1>"
+                f"<div class=\"fmt\"><p>{html.escape(self.question_body(question))}</p></div>{answers}"
+                "</body></html>")
+
+    def user(self, username: str) -> Optional[Dict]:
+        """合成用户的资料"""
+        if not (username.startswith('user') and username[4:].isdigit() and int(username[4:]) < USERS):
+            return None
+        number = int(username[4:])
+        return {
+            'username': username,
+            'display_name': f"User{number:03d}",
+            'rank': (number * 37) % 500,
+            'question_count': self.total // USERS,
+            'answer_count': (number * 13) % 40,
+            'follow_count': number % 7,
+            'created_at': int((EPOCH - timedelta(days=365 + number)).timestamp())
+        }
+
+    def user_page(self, user: Dict) -> str:
+        """用户主页"""
+        return (f"<html><body><h3>{user['display_name']}</h3>"
+                f"<div>{user['rank']} reputation</div>"
+                f"<div>{user['answer_count']} answers</div>"
+                f"<div>{user['question_count']} questions</div></body></html>")
+
+    # ---------- JSON 接口 ----------
+
+    def api_question(self, q: Dict) -> Dict:
+        return {
+            'id': q['id'],
+            'url_title': q['url_title'],
+            'title': q['title'],
+            'operator': {'username': q['username'], 'display_name': q['display_name'], 'rank': q['reputation']},
+            'created_at': int(q['created'].timestamp()),
+            'vote_count': q['likes'],
+            'answer_count': q['answers'],
+            'view_count': q['views'],
+            'tags': [{'display_name': tag, 'slug_name': tag} for tag in q['tags']]
+        }
+
+    def api_answer(self, a: Dict) -> Dict:
+        return {
+            'id': a['id'],
+            'user_info': {'username': a['username'], 'display_name': a['display_name']},
+            'content': a['body'],
+            'vote_count': a['likes'],
+            'accepted': 2 if a['accepted'] else 1,
+            'created_at': int(a['created'].timestamp())
+        }
+
+    def respond(self, path: str, serve_api: bool = True) -> Tuple[int, str, bytes]:
+        """合成一个 GET 请求的响应，返回 (状态码, Content-Type, 响应体)"""
+        parts = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        def page_param(name: str, default: int) -> int:
+            try:
+                return max(1, int(query.get(name, default)))
+            except ValueError:
+                return default
+
+        if parts.path.rstrip('/') in ('', '/questions'):
+            return 200, "text/html; charset=utf-8", self.list_page(page_param('page', 1)).encode()
+
+        if parts.path.startswith('/questions/'):
+            question = self.find(parts.path.split('/')[2])
+            if question:
+                return 200, "text/html; charset=utf-8", self.detail_page(question).encode()
+
+        elif parts.path.startswith('/users/'):
+            user = self.user(unquote(parts.path.split('/')[2]))
+            if user:
+                return 200, "text/html; charset=utf-8", self.user_page(user).encode()
+
+        elif serve_api and parts.path.startswith('/answer/api/'):
+            data = self.api_data(parts.path, query, page_param)
+            if data is not None:
+                payload = {"code": 200, "reason": "base.success", "msg": "Success.", "data": data}
+                return 200, "application/json", json.dumps(payload, ensure_ascii=False).encode()
+
+        return 404, "text/plain; charset=utf-8", b"Not Found"
+
+    def api_data(self, path: str, query: Dict[str, str], page_param) -> Optional[Dict]:
+        if path == API_PATH:
+            size = page_param('page_size', PAGE_SIZE)
+            items = self.page_questions((page_param('page', 1) - 1) * size, size)
+            return {"count": self.total, "list": [self.api_question(q) for q in items]}
+
+        if path == DETAIL_API_PATH:
+            question = self.find(query.get('id', ''))
+            return {**self.api_question(question), 'content': self.question_body(question)} if question else None
+
+        if path == ANSWER_API_PATH:
+            question = self.find(query.get('question_id', ''))
+            if question is None:
+                return None
+            size = page_param('page_size', PAGE_SIZE)
+            offset = (page_param('page', 1) - 1) * size
+            answers = self.answers(question)
+            return {"count": len(answers), "list": [self.api_answer(a) for a in answers[offset:offset + size]]}
+
+        if path == USER_API_PATH:
+            return self.user(query.get('username', ''))
+        return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """替身站点的请求处理：先注入延迟与错误，再回放夹具或合成响应；支持 ETag 条件请求"""
+
+    protocol_version = "HTTP/1.1"  # 保持长连接，连接池的复用效果与真实站点一致
+
+    def do_GET(self):
+        server: StandInServer = self.server.owner
+        fault = server.inject()
+        if fault == "drop":
+            # 不返回响应直接断开，模拟连接被重置
+            self.close_connection = True
+            return
+        if fault is not None:
+            self.send_response(fault)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        status_code, content_type, body = server.respond(self.path)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if status_code == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if status_code == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """在后台线程中运行的替身服务器
+
+    - latency / jitter：每个请求先等待 latency 秒，上下浮动 jitter 比例；
+    - error_rate / error_statuses：按比例返回错误状态码（带 Retry-After）；
+    - drop_rate：按比例不返回响应直接断开连接；
+    - fixture_dir：录制的夹具优先于合成页面；serve_api=False 时 JSON 接口返回 404，爬虫退回 HTML。
+    错误注入使用固定种子，同样的请求序列得到同样的错误。
+    """
+
+    def __init__(self, pages: int = 50, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Sequence[int] = (503,), drop_rate: float = 0.0,
+                 fixture_dir: Optional[str] = None, serve_api: bool = True, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0, template_file: str = TEMPLATE_FILE):
+        self.site = SyntheticSite(pages, seed, template_file)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.drop_rate = drop_rate
+        self.fixtures = FixtureStore(fixture_dir) if fixture_dir else None
+        self.serve_api = serve_api
+        self.stats = {"requests": 0, "errors_injected": 0, "dropped": 0, "fixtures_served": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def inject(self):
+        """决定本次请求的故障：None 表示正常，"drop" 表示断开连接，整数为返回的错误状态码"""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            roll = self._rng.random()
+            fault = None
+            if roll < self.drop_rate:
+                fault = "drop"
+                self.stats["dropped"] += 1
+            elif roll < self.drop_rate + self.error_rate:
+                fault = self._rng.choice(self.error_statuses)
+                self.stats["errors_injected"] += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fault
+
+    def respond(self, path: str) -> Tuple[int, str, bytes]:
+        if self.fixtures and fixture_key(path) in self.fixtures.entries:
+            found = self.fixtures.lookup(path)
+            if found:
+                with self._lock:
+                    self.stats["fixtures_served"] += 1
+                return found
+        return self.site.respond(path, self.serve_api)
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"替身服务器已启动: {self.url}，{self.site.pages}页共{self.site.total}个问题")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {"url": self.url, "pages": self.site.pages, **self.stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="问答站的本地替身服务器")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--pages", type=int, default=50, help="合成的列表页数（每页10个问题）")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的浮动比例，0-1")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回错误状态码的比例")
+    parser.add_argument("--error-status", type=int, nargs="+", default=[503], help="注入的错误状态码")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="直接断开连接的比例")
+    parser.add_argument("--fixtures", help="优先回放的夹具目录（CRAWLER_TRANSPORT=record 录制）")
+    parser.add_argument("--no-api", action="store_true", help="不提供 JSON 接口")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = StandInServer(
+        pages=args.pages, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_statuses=args.error_status, drop_rate=args.drop_rate, fixture_dir=args.fixtures,
+        serve_api=not args.no_api, seed=args.seed, host=args.host, port=args.port
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(f"替身服务器已停止: {server.status()}")
+
+
+if __name__ == "__main__":
+    main()
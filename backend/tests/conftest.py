@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# 后端模块按顶层模块导入（与 main.py 相同）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入 main 时会创建输出目录与数据集，测试中写到临时目录
+os.environ.setdefault('CRAWLER_OUTPUT_DIR', tempfile.mkdtemp(prefix='crawler-test-'))
+os.environ.setdefault('CRAWLER_RECRAWL_INTERVAL', '0')
@@ -0,0 +1,67 @@
+import asyncio
+
+from crawl_scheduler import CrawlScheduler
+
+
+def test_global_limit_queues_extra_sites():
+    """站点数超过全局上限时，多出的爬取排队，槽位释放后才开始"""
+
+    async def scenario():
+        scheduler = CrawlScheduler(max_concurrent=2, max_total=3)
+        release = asyncio.Event()
+        started = []
+
+        async def crawl(job_id, host):
+            async with scheduler.slot(job_id, pages=1, host=host):
+                started.append(job_id)
+                await release.wait()
+
+        hosts = [f"site{i}.example" for i in range(5)]
+        tasks = [asyncio.create_task(crawl(f"job{i}", host)) for i, host in enumerate(hosts)]
+        await asyncio.sleep(0.01)
+
+        assert started == ["job0", "job1", "job2"]
+        status = scheduler.status()
+        assert status["running"] == 3
+        assert status["queued"] == 2
+        for job_id in ("job3", "job4"):
+            info = scheduler.job_info(job_id)
+            assert info["state"] == "queued"
+            assert info["starts_in_seconds"] > 0
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert sorted(started) == [f"job{i}" for i in range(5)]
+        assert scheduler.status()["running"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_per_host_limit_within_global_limit():
+    """全局还有空闲槽位时，同一站点仍然受站点槽位数限制，其他站点可以使用空闲槽位"""
+
+    async def scenario():
+        scheduler = CrawlScheduler(max_concurrent=1, max_total=3)
+        release = asyncio.Event()
+        started = []
+
+        async def crawl(job_id, host):
+            async with scheduler.slot(job_id, pages=1, host=host):
+                started.append(job_id)
+                await release.wait()
+
+        tasks = [
+            asyncio.create_task(crawl("a1", "a.example")),
+            asyncio.create_task(crawl("a2", "a.example")),
+            asyncio.create_task(crawl("b1", "b.example")),
+        ]
+        await asyncio.sleep(0.01)
+
+        assert started == ["a1", "b1"]
+        assert scheduler.job_info("a2")["state"] == "queued"
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started == ["a1", "b1", "a2"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fast_json
+
+PAYLOAD = {
+    "count": np.int64(3),
+    "ratio": np.float64(0.5),
+    "small": np.float32(1.5),
+    "flag": np.bool_(True),
+    "values": np.array([1, 2, 3]),
+    "missing": float("nan"),
+    "numpy_missing": np.float64("nan"),
+    "infinite": [math.inf, -math.inf],
+    "array_missing": np.array([1.0, np.nan]),
+    "median": pd.Series([1, 2, 4]).median(),
+    "title": "基金会问答",
+    1: "整数键",
+}
+
+EXPECTED = {
+    "count": 3,
+    "ratio": 0.5,
+    "small": 1.5,
+    "flag": True,
+    "values": [1, 2, 3],
+    "missing": None,
+    "numpy_missing": None,
+    "infinite": [None, None],
+    "array_missing": [1.0, None],
+    "median": 2.0,
+    "title": "基金会问答",
+    "1": "整数键",
+}
+
+
+@pytest.mark.parametrize("backend", sorted(fast_json.ENCODERS))
+@pytest.mark.parametrize("pretty", [False, True])
+def test_backends_encode_numpy_and_nan_alike(backend, pretty):
+    """每个已安装的编码实现都能编码 numpy 类型，NaN 与无穷统一写为 null"""
+    data = fast_json.ENCODERS[backend](PAYLOAD, pretty)
+    assert "基金会问答".encode('utf-8') in data
+    assert fast_json.loads(data) == EXPECTED
+
+
+def test_backends_produce_identical_compact_output():
+    outputs = {backend: encode(PAYLOAD, False) for backend, encode in fast_json.ENCODERS.items()}
+    assert len(set(outputs.values())) == 1, outputs
+
+
+def test_unknown_type_raises_type_error():
+    for encode in fast_json.ENCODERS.values():
+        with pytest.raises(TypeError):
+            encode({"value": object()}, False)
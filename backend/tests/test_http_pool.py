@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+from http_pool import ConnectionPool
+
+HOST = "site.example"
+
+
+class GatedClient:
+    """请求在 gate 打开前一直挂起，记录同时在途的最大请求数"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.active = 0
+        self.peak = 0
+
+    async def get(self, url, headers=None, extensions=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.gate.wait()
+        finally:
+            self.active -= 1
+        return SimpleNamespace(content=b"ok", num_bytes_downloaded=2, http_version="HTTP/1.1")
+
+
+def test_shrinking_host_budget_counts_requests_already_in_flight():
+    """预算调小后，已在途的请求计入新预算，同时在途的请求数不会超过旧预算"""
+
+    async def scenario():
+        pool = ConnectionPool({})
+        pool.configure(4, 5.0, 15.0, host=HOST)
+        client = GatedClient()
+        url = f"http://{HOST}/questions"
+
+        first = [asyncio.create_task(pool.get(client, url, {})) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert client.active == 4
+
+        pool.configure(2, 5.0, 15.0, host=HOST)
+        second = [asyncio.create_task(pool.get(client, url, {})) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        # 4 个旧请求还在途，超过了新预算 2，新请求全部排队
+        assert client.active == 4
+
+        client.gate.set()
+        await asyncio.gather(*first, *second)
+        assert client.peak == 4
+        assert pool.in_flight[HOST] == 0
+
+    asyncio.run(scenario())
+
+
+def test_growing_host_budget_wakes_queued_requests():
+    """预算调大后，排队的请求不必等在途请求结束"""
+
+    async def scenario():
+        pool = ConnectionPool({})
+        pool.configure(1, 5.0, 15.0, host=HOST)
+        client = GatedClient()
+        url = f"http://{HOST}/questions"
+
+        tasks = [asyncio.create_task(pool.get(client, url, {})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert client.active == 1
+
+        pool.configure(3, 5.0, 15.0, host=HOST)
+        tasks.append(asyncio.create_task(pool.get(client, url, {})))
+        await asyncio.sleep(0.01)
+        assert client.active == 3
+
+        client.gate.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+
+def test_reconfiguring_closes_the_replaced_sync_session(monkeypatch):
+    """配置变化后线程换用新的 Session，旧的关闭且不再保留"""
+    pool = ConnectionPool({})
+    closed = []
+    monkeypatch.setattr("requests.Session.get", lambda self, url, **kwargs: SimpleNamespace(content=b""))
+    monkeypatch.setattr("requests.Session.close", lambda self: closed.append(self))
+
+    pool.get_sync("http://site.example/", {})
+    old = pool._local.session
+    pool.configure(2, 5.0, 30.0)
+    pool.get_sync("http://site.example/", {})
+
+    assert closed == [old]
+    assert pool._sync_sessions == [pool._local.session]
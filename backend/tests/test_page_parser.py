@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from main import QuestionPageParser  # noqa: E402
+
+BASE_URL = "https://answer.chancefoundation.org.cn"
+FIRST_PAGE = os.path.join(os.path.dirname(__file__), '..', '..', 'backendData', 'output', 'first_page.html')
+
+
+def test_lxml_and_bs4_parse_first_page_identically():
+    """两种解析引擎对 first_page.html 的输出完全一致"""
+    with open(FIRST_PAGE, encoding='utf-8') as f:
+        html = f.read()
+
+    # crawled_at 是解析时刻，不参与比较
+    lxml_questions = [{**q, 'crawled_at': None} for q in QuestionPageParser(BASE_URL, engine="lxml").parse(html, 1)]
+    bs4_questions = [{**q, 'crawled_at': None} for q in QuestionPageParser(BASE_URL, engine="bs4").parse(html, 1)]
+
+    assert lxml_questions
+    assert lxml_questions == bs4_questions
+    # 第1页有 Next：分页栏中的最大页码只是下界
+    assert QuestionPageParser.pagination(html) == (4, False)
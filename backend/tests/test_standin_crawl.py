@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+import main
+import retry_policy
+from crawl_transport import CrawlTransport
+from standin_server import PAGE_SIZE, StandInServer, SyntheticSite
+
+
+def make_crawler(server: StandInServer, concurrency: int = 1, **kwargs) -> main.AnswerSiteCrawler:
+    """指向替身服务器、不限速的爬虫，kwargs 传给 AnswerSiteCrawler"""
+    crawler = main.AnswerSiteCrawler(server.url, **kwargs)
+    crawler.rate_limiter.configure(1000, 1000)
+    crawler.pool.configure(max(concurrency, 1), main.DEFAULT_CONNECT_TIMEOUT, 15.0, http2=False)
+    return crawler
+
+
+def crawl(crawler: main.AnswerSiteCrawler, **kwargs):
+    async def run():
+        try:
+            return await crawler.fetch_all_questions(**kwargs)
+        finally:
+            await crawler.pool.aclose()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_crawls_past_the_pagination_window(concurrency):
+    """分页栏只显示 5 个页码时，超过 5 页的列表也要爬完"""
+    with StandInServer(pages=20, serve_api=False) as server:
+        crawler = make_crawler(server, concurrency)
+        questions = crawl(crawler, max_pages=30, source="html", concurrency=concurrency)
+
+    assert len(questions) == 20 * PAGE_SIZE
+    assert sorted({q['source_page'] for q in questions}) == list(range(1, 21))
+    # 最后一页没有 Next，分页栏中的最大页码就是总页数
+    assert crawler.page_hints[20] == (20, True)
+    assert crawler.page_hints[1] == (5, False)
+
+
+def test_stops_at_the_last_page_without_requesting_past_it():
+    """最后一页的分页栏没有 Next 时不再请求更大的页码"""
+    with StandInServer(pages=7, serve_api=False) as server:
+        crawler = make_crawler(server)
+        questions = crawl(crawler, max_pages=30, source="html")
+        requests = server.stats["requests"]
+
+    assert len(questions) == 7 * PAGE_SIZE
+    assert requests == 7
+
+
+def test_api_records_match_html_records():
+    """JSON 接口与 HTML 列表页爬到的同一批问题字段与取值一致（operator 与 created_at 的映射与页面显示相同）"""
+    with StandInServer(pages=3) as server:
+        html_questions = crawl(make_crawler(server), max_pages=3, source="html")
+        api_crawler = make_crawler(server)
+        api_questions = crawl(api_crawler, max_pages=3, source="api")
+
+    assert api_crawler.api_available
+    assert len(api_questions) == len(html_questions) == 3 * PAGE_SIZE
+    strip = lambda questions: [{**q, 'crawled_at': None} for q in questions]  # noqa: E731
+    assert strip(api_questions) == strip(html_questions)
+    # 合成站点的显示名与用户名不同：user 取显示名，user_link 用用户名
+    first = api_questions[0]
+    assert first['user'] != first['user_link'].rsplit('/', 1)[1]
+    assert {q['source_page'] for q in api_questions} == {1, 2, 3}
+
+
+@pytest.mark.parametrize("source,concurrency", [("html", 1), ("html", 4), ("api", 1)])
+def test_record_then_replay_without_network(tmp_path, source, concurrency):
+    """录制的夹具回放出完全相同的记录，回放时不访问替身服务器"""
+    fixture_dir = str(tmp_path / "fixtures")
+    with StandInServer(pages=6) as server:
+        recorder = make_crawler(server, concurrency, transport=CrawlTransport("record", fixture_dir))
+        recorded = crawl(recorder, max_pages=10, source=source, concurrency=concurrency)
+        requests_before = server.stats["requests"]
+
+        transport = CrawlTransport("replay", fixture_dir)
+        replayed = crawl(make_crawler(server, concurrency, transport=transport),
+                         max_pages=10, source=source, concurrency=concurrency)
+        assert server.stats["requests"] == requests_before
+
+    strip = lambda questions: [{**q, 'crawled_at': None} for q in questions]  # noqa: E731
+    assert len(recorded) == 6 * PAGE_SIZE
+    assert strip(replayed) == strip(recorded)
+    assert transport.store.stats["replayed"] > 0
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    """注入的 503 按退避重试后补回，不记为失败页面"""
+    monkeypatch.setattr(retry_policy, "BASE_DELAY", 0.01)
+    task_id = "test_transient_errors"
+    main.task_manager.create_task(task_id, 8)
+    with StandInServer(pages=8, error_rate=0.3, error_statuses=(503,), seed=1, serve_api=False) as server:
+        questions = crawl(make_crawler(server), max_pages=10, source="html", task_id=task_id)
+        injected = server.stats["errors_injected"]
+
+    assert injected > 0
+    assert len(questions) == 8 * PAGE_SIZE
+    assert main.task_manager.get_failed_pages(task_id) == []
+
+
+def test_permanent_errors_become_failed_pages(monkeypatch):
+    """不可重试的错误不重试，页面记入 failed_pages，其他页面照常爬取"""
+    monkeypatch.setattr(retry_policy, "BASE_DELAY", 0.01)
+    task_id = "test_permanent_errors"
+    main.task_manager.create_task(task_id, 8)
+    with StandInServer(pages=8, error_rate=0.3, error_statuses=(404,), seed=1, serve_api=False) as server:
+        questions = crawl(make_crawler(server), max_pages=8, source="html", task_id=task_id)
+        injected = server.stats["errors_injected"]
+
+    failed = main.task_manager.get_failed_pages(task_id)
+    assert failed and len(failed) == injected
+    assert {q['source_page'] for q in questions} == set(range(1, 9)) - set(failed)
+    failure = main.task_manager.tasks[task_id]["failed_pages"][failed[0]]
+    assert failure["status_code"] == 404 and failure["attempts"] == 1
+
+
+def test_reparse_uses_a_single_crawl_segment(monkeypatch):
+    """两次爬取之间列表已经移动，重新解析只用一次爬取的分段，不把两次的列表页拼在一起"""
+    def crawl_as(crawler, crawl_id, **kwargs):
+        main.CURRENT_CRAWL.set(crawl_id)
+        return crawl(crawler, **kwargs)
+
+    def reparse(request):
+        task_id = f"reparse_{request.task_id or 'latest'}"
+        main.task_manager.create_task(task_id, 1)
+        asyncio.run(main.run_reparse(task_id, request))
+        task = main.task_manager.tasks[task_id]
+        assert task["status"] == "completed", task.get("error")
+        return task["result"]
+
+    # 保存结果时给每条记录加上 site，只比较爬取得到的字段
+    strip = lambda questions: [{**q, 'crawled_at': None, 'site': None} for q in questions]  # noqa: E731
+    with StandInServer(pages=3, serve_api=False) as server:
+        crawler = make_crawler(server, archive=main.page_archive)
+        monkeypatch.setattr(main, "crawler", crawler)
+        first = crawl_as(crawler, "test_segment_crawl1", max_pages=3, source="html")
+        # 站点新增了一页问题，原来的每一页都往后移了一页
+        server.site = SyntheticSite(4)
+        second = crawl_as(crawler, "test_segment_crawl2", max_pages=1, source="html")
+
+    latest = reparse(main.ReparseRequest(parse_workers=1))
+    assert latest["reparsed"]["task_id"] == "test_segment_crawl2"
+    assert strip(latest["questions"]) == strip(second)
+
+    earlier = reparse(main.ReparseRequest(task_id="test_segment_crawl1", parse_workers=1))
+    assert earlier["reparsed"]["list_pages"] == 3
+    assert strip(earlier["questions"]) == strip(first)
+
+
+def test_crawls_share_one_parse_pool():
+    """parse_workers > 0 的多次爬取共用同一个解析进程池，爬取结束后进程池不关闭，由服务关闭时统一关闭"""
+    strip = lambda questions: [{**q, 'crawled_at': None} for q in questions]  # noqa: E731
+    with StandInServer(pages=4, serve_api=False) as server:
+        first = crawl(make_crawler(server, 2), max_pages=4, source="html", concurrency=2, parse_workers=2)
+        pool = main.get_parse_pool()
+        second = crawl(make_crawler(server, 2), max_pages=4, source="html", concurrency=2, parse_workers=2)
+
+    assert main.get_parse_pool() is pool
+    assert len(first) == 4 * PAGE_SIZE
+    assert strip(first) == strip(second)
+
+    main.shutdown_parse_pool()
+    assert main.get_parse_pool() is not pool
+    main.shutdown_parse_pool()
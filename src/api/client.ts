@@ -23,15 +23,67 @@ export interface CrawlerStartResponse {
   status: string;
   progress: number;
   message?: string;
+  coalesced?: boolean;
+  sites?: Record<string, string> | null;
+  shared_sites?: string[] | null;
+  schedule?: CrawlerSchedule | null;
+}
+
+export interface CrawlerSiteConfig {
+  base_url: string;
+  concurrency?: number;
+  rate_limit?: number;
+  burst?: number;
+  pool_size?: number;
+}
+
+export interface CrawlerSchedule {
+  state: 'queued' | 'running';
+  host?: string;
+  eta_seconds: number;
+  position?: number;
+  queue_length?: number;
+  starts_in_seconds?: number;
 }
 
 export interface CrawlerTaskResponse {
   task_id: string;
-  status: 'running' | 'completed' | 'failed' | 'stopped';
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'stopped';
   progress: number;
   message: string;
   current_page: number;
   total_pages: number;
+  site?: string | null;
+  sites?: Record<string, string> | null;
+  shared_sites?: string[] | null;
+  schedule?: CrawlerSchedule | null;
+  rate_limit?: {
+    current_rate: number;
+    max_rate: number;
+    burst: number;
+    paused_seconds: number;
+    requests: number;
+    throttled: number;
+    backoffs: number;
+  } | null;
+  live_stats?: {
+    pages: number;
+    total_questions: number;
+    total_views: number;
+    total_likes: number;
+    total_answers: number;
+    total_users: number;
+    top_questions: Array<{ id: string; title: string; views: number; likes: number; answers: number; user: string }>;
+    top_users: Array<{ user: string; question_count: number }>;
+    top_tags: Array<{ tag: string; count: number }>;
+  } | null;
+  failed_pages?: Array<{
+    page: number;
+    error: string;
+    status_code: number | null;
+    transient: boolean;
+    attempts: number;
+  }>;
   result?: any;
   error?: string;
 }
@@ -88,6 +140,17 @@ export interface QuestionsListData {
   questions: Array<any>;
 }
 
+export interface CrawlHistoryData {
+  total: number;
+  crawls: Array<{
+    task_id: string;
+    site: string;
+    completed_at: string | null;
+    failed_pages: number[];
+    basic_stats: Record<string, number>;
+  }>;
+}
+
 export interface SystemStatus {
   status: string;
   version: string;
@@ -160,12 +223,14 @@ class ApiClient {
   async startCrawler(
     maxPages: number = 10,
     timeout: number = 30,
-    asyncMode: boolean = true
+    asyncMode: boolean = true,
+    sites?: CrawlerSiteConfig[]
   ): Promise<AxiosResponse<ApiResponse<CrawlerStartResponse>>> {
     return this.client.post('/crawler/start', {
       max_pages: maxPages,
       timeout,
       async_mode: asyncMode,
+      sites,
     });
   }
 
@@ -183,6 +248,29 @@ class ApiClient {
     return this.client.post(`/crawler/stop/${taskId}`);
   }
 
+  /**
+   * 从断点继续中断的爬虫任务
+   */
+  async resumeCrawlerTask(taskId: string): Promise<AxiosResponse<ApiResponse>> {
+    return this.client.post(`/crawler/resume/${taskId}`);
+  }
+
+  /**
+   * 只重新爬取任务中失败的页面
+   */
+  async retryFailedPages(taskId: string): Promise<AxiosResponse<ApiResponse>> {
+    return this.client.post(`/crawler/retry/${taskId}`);
+  }
+
+  /**
+   * 不访问网络，从页面归档重新解析出爬虫结果
+   */
+  async reparseArchive(
+    params: { as_of?: string; parse_workers?: number; site?: string } = {}
+  ): Promise<AxiosResponse<ApiResponse>> {
+    return this.client.post('/crawler/reparse', params);
+  }
+
   // ==================== 分析接口 ====================
 
   /**
@@ -191,13 +279,15 @@ class ApiClient {
   async getDashboard(
     useCache: boolean = true,
     cacheTtl: number = 3600,
-    autoCrawl: boolean = true
+    autoCrawl: boolean = true,
+    site?: string
   ): Promise<AxiosResponse<ApiResponse<DashboardData>>> {
     return this.client.get('/analysis/dashboard', {
       params: {
         use_cache: useCache,
         cache_ttl: cacheTtl,
         auto_crawl: autoCrawl,
+        site,
       },
     });
   }
@@ -210,7 +300,8 @@ class ApiClient {
     startDate?: string,
     endDate?: string,
     useCache: boolean = true,
-    cacheTtl: number = 7200
+    cacheTtl: number = 7200,
+    site?: string
   ): Promise<AxiosResponse<ApiResponse<TrendsData>>> {
     return this.client.get('/analysis/trends', {
       params: {
@@ -219,6 +310,7 @@ class ApiClient {
         granularity,
         use_cache: useCache,
         cache_ttl: cacheTtl,
+        site,
       },
     });
   }
@@ -230,7 +322,8 @@ class ApiClient {
     limit: number = 10,
     sortBy: string = 'question_count',
     useCache: boolean = true,
-    cacheTtl: number = 3600
+    cacheTtl: number = 3600,
+    site?: string
   ): Promise<AxiosResponse<ApiResponse<UsersData>>> {
     return this.client.get('/analysis/users', {
       params: {
@@ -238,6 +331,7 @@ class ApiClient {
         sort_by: sortBy,
         use_cache: useCache,
         cache_ttl: cacheTtl,
+        site,
       },
     });
   }
@@ -248,13 +342,15 @@ class ApiClient {
   async getTagsAnalysis(
     limit: number = 15,
     useCache: boolean = true,
-    cacheTtl: number = 7200
+    cacheTtl: number = 7200,
+    site?: string
   ): Promise<AxiosResponse<ApiResponse<TagsData>>> {
     return this.client.get('/analysis/tags', {
       params: {
         limit,
         use_cache: useCache,
         cache_ttl: cacheTtl,
+        site,
       },
     });
   }
@@ -267,7 +363,8 @@ class ApiClient {
     limit: number = 20,
     sortBy: string = 'views',
     order: string = 'desc',
-    search?: string
+    search?: string,
+    site?: string
   ): Promise<AxiosResponse<ApiResponse<QuestionsListData>>> {
     return this.client.get('/analysis/questions', {
       params: {
@@ -276,6 +373,22 @@ class ApiClient {
         sort_by: sortBy,
         order,
         search,
+        site,
+      },
+    });
+  }
+
+  /**
+   * 获取历次爬取的统计
+   */
+  async getCrawlHistory(
+    limit: number = 20,
+    site?: string
+  ): Promise<AxiosResponse<ApiResponse<CrawlHistoryData>>> {
+    return this.client.get('/analysis/history', {
+      params: {
+        limit,
+        site,
       },
     });
   }